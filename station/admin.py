@@ -8,14 +8,114 @@ from station.models import (
     Train,
     Route,
     Journey,
+    JourneySchedule,
     Ticket,
 )
+from station.journey_search import (
+    invalidate_journeys_on_commit,
+    invalidate_on_seat_change,
+)
+from station.pagination import EstimatedCountPaginator
+from station.seat_events import publish_seats_on_commit
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ("id", "first_name", "last_name")
+    search_fields = ("first_name", "last_name")
+
+
+@admin.register(Station)
+class StationAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "latitude", "longitude", "updated_at")
+    search_fields = ("name",)
+
+
+@admin.register(TrainType)
+class TrainTypeAdmin(admin.ModelAdmin):
+    list_display = ("id", "name")
+    search_fields = ("name",)
+
+
+@admin.register(Train)
+class TrainAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "train_type", "cargo_num", "places_in_cargo")
+    list_select_related = ("train_type",)
+    list_filter = ("train_type",)
+    search_fields = ("name",)
+    autocomplete_fields = ("train_type",)
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "destination", "distance")
+    list_select_related = ("source", "destination")
+    search_fields = ("source__name", "destination__name")
+    autocomplete_fields = ("source", "destination")
+
+
+@admin.register(JourneySchedule)
+class JourneyScheduleAdmin(admin.ModelAdmin):
+    list_display = ("id", "route", "train", "start_date", "end_date")
+    list_select_related = ("route__source", "route__destination", "train")
+    autocomplete_fields = ("route", "train", "workers")
+    date_hierarchy = "start_date"
+
+
+@admin.register(Journey)
+class JourneyAdmin(admin.ModelAdmin):
+    list_display = ("id", "route", "train", "departure_time", "arrival_time")
+    list_select_related = ("route__source", "route__destination", "train")
+    search_fields = ("=id", "train__name")
+    autocomplete_fields = ("route", "train", "workers")
+    raw_id_fields = ("schedule",)
+    date_hierarchy = "departure_time"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_journeys_on_commit([obj])
+
+    def delete_queryset(self, request, queryset):
+        invalidate_journeys_on_commit(queryset.select_related("route"))
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    search_fields = ("=id", "=user__email")
+    raw_id_fields = ("user",)
+    date_hierarchy = "created_at"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ("id", "journey", "order", "cargo", "seat")
+    list_select_related = (
+        "journey__route__source",
+        "journey__route__destination",
+        "journey__train",
+        "order__user",
+    )
+    search_fields = ("=id", "=order__id", "=journey__id")
+    raw_id_fields = ("journey", "order")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        publish_seats_on_commit(
+            [(obj.journey_id, obj.cargo, obj.seat)], "released"
+        )
+        invalidate_on_seat_change([obj.journey_id])
 
-admin.site.register(Crew)
-admin.site.register(Station)
-admin.site.register(TrainType)
-admin.site.register(Order)
-admin.site.register(Train)
-admin.site.register(Route)
-admin.site.register(Journey)
-admin.site.register(Ticket)
+    def delete_queryset(self, request, queryset):
+        seats = list(queryset.values_list("journey_id", "cargo", "seat"))
+        publish_seats_on_commit(seats, "released")
+        invalidate_on_seat_change(journey_id for journey_id, _, _ in seats)
+        super().delete_queryset(request, queryset)
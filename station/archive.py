@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    Journey,
+    RollupCheckpoint,
+    Ticket,
+)
+
+
+def archive_batch(cutoff, batch_size):
+    """Move one batch of journeys that arrived before ``cutoff``"""
+    rolled_up = RollupCheckpoint.objects.filter(name="tickets").values_list(
+        "last_id", flat=True
+    ).first() or 0
+
+    with transaction.atomic():
+        journeys = list(
+            Journey.objects.filter(arrival_time__lt=cutoff)
+            # tickets not yet counted by the sales rollups stay in place
+            .exclude(tickets__id__gt=rolled_up)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list(
+                "id", "route_id", "train_id", "departure_time", "arrival_time"
+            )[:batch_size]
+        )
+        if not journeys:
+            return 0
+
+        journey_ids = [journey[0] for journey in journeys]
+
+        ArchivedJourney.objects.bulk_create(
+            ArchivedJourney(
+                id=journey_id,
+                route_id=route_id,
+                train_id=train_id,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+            for journey_id, route_id, train_id, departure_time, arrival_time
+            in journeys
+        )
+        ArchivedJourney.workers.through.objects.bulk_create(
+            ArchivedJourney.workers.through(
+                archivedjourney_id=journey_id, crew_id=crew_id
+            )
+            for journey_id, crew_id in Journey.workers.through.objects.filter(
+                journey_id__in=journey_ids
+            ).values_list("journey_id", "crew_id")
+        )
+
+        tickets = Ticket.objects.filter(journey_id__in=journey_ids)
+        ArchivedTicket.objects.bulk_create(
+            (
+                ArchivedTicket(
+                    id=ticket_id,
+                    cargo=cargo,
+                    seat=seat,
+                    journey_id=journey_id,
+                    order_id=order_id,
+                )
+                for ticket_id, cargo, seat, journey_id, order_id
+                in tickets.values_list(
+                    "id", "cargo", "seat", "journey_id", "order_id"
+                ).iterator()
+            ),
+            batch_size=1000,
+        )
+
+        tickets.delete()
+        Journey.objects.filter(id__in=journey_ids).delete()
+
+    return len(journey_ids)
+
+
+def archive_completed_journeys(batch_size=None):
+    """Move journeys that arrived more than JOURNEY_ARCHIVE_AFTER_DAYS ago,
+    with their tickets and crew, into the archive tables.
+
+    Every batch runs in its own transaction. Returns the number of journeys
+    archived.
+    """
+    batch_size = batch_size or settings.JOURNEY_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(
+        days=settings.JOURNEY_ARCHIVE_AFTER_DAYS
+    )
+    archived = 0
+
+    while True:
+        batch = archive_batch(cutoff, batch_size)
+        archived += batch
+        if batch < batch_size:
+            return archived
@@ -0,0 +1,115 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+
+
+BATCH_PREFIX = "/api/stations/"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# headers of the batch request that sub-requests inherit, everything
+# else (conditional, idempotency, ...) has to be set per sub-request
+INHERITED_HEADERS = (
+    "HTTP_HOST",
+    "HTTP_USER_AGENT",
+    "HTTP_ACCEPT_LANGUAGE",
+    "HTTP_X_FORWARDED_FOR",
+    "HTTP_X_FORWARDED_PROTO",
+)
+
+
+def build_sub_request(request, item):
+    parts = urlsplit(item["url"])
+    content = b""
+    if item.get("body") is not None:
+        content = json.dumps(item["body"]).encode()
+
+    environ = {
+        key: value
+        for key, value in request.META.items()
+        if not key.startswith(("HTTP_", "CONTENT_"))
+        or key in INHERITED_HEADERS
+    }
+    environ.update(
+        {
+            "REQUEST_METHOD": item["method"],
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+            "wsgi.url_scheme": request.scheme,
+        }
+    )
+    for name, value in item.get("headers", {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+    sub_request = WSGIRequest(environ)
+    if request.user.is_authenticated:
+        # the batch was authenticated once, sub-requests reuse its user
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+
+    return sub_request
+
+
+def run_sub_request(request, item):
+    sub_request = build_sub_request(request, item)
+
+    try:
+        match = resolve(sub_request.path_info)
+    except Resolver404:
+        match = None
+
+    if match is None or match.namespace != "station":
+        return {
+            "status": status.HTTP_404_NOT_FOUND,
+            "headers": {},
+            "body": {"detail": "Not found."},
+        }
+
+    sub_request.resolver_match = match
+    response = match.func(sub_request, *match.args, **match.kwargs)
+
+    return {
+        "status": response.status_code,
+        "headers": dict(response.items()),
+        # binary responses (PDF, ...) have to be fetched directly
+        "body": getattr(response, "data", None),
+    }
+
+
+def run_sub_request_in_thread(request, item):
+    try:
+        return run_sub_request(request, item)
+    finally:
+        connections.close_all()
+
+
+def run_batch(request, items, parallel=False):
+    """Run station sub-requests in-process, in the order given.
+
+    Read-only batches run in a thread pool when ``parallel`` is set;
+    batches with writes always run sequentially.
+    """
+    if (
+        parallel
+        and len(items) > 1
+        and all(item["method"] in SAFE_METHODS for item in items)
+    ):
+        workers = min(settings.BATCH_MAX_WORKERS, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    partial(run_sub_request_in_thread, request), items
+                )
+            )
+
+    return [run_sub_request(request, item) for item in items]
@@ -0,0 +1,226 @@
+"""Great-circle distances between stations.
+
+``StationDistanceMatrix`` holds the distance of every station pair as a
+float32 matrix in ``STATION_DISTANCES_DIR`` (``distances.npy`` with the
+sorted station ids in ``ids.npy``). It is built in row blocks, so memory
+stays bounded for large station counts, and read memory-mapped, so
+processes share the pages and only touch the rows they look up. Stations
+added or moved after the build time in ``built_at.npy`` are not looked up
+in the matrix until the next build.
+"""
+
+import os
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from station.models import Route, Station
+
+
+EARTH_RADIUS_KM = 6371.0
+IDS_FILE = "ids.npy"
+DISTANCES_FILE = "distances.npy"
+BUILT_AT_FILE = "built_at.npy"
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km, element-wise over (broadcast) arrays"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def route_distance_km(source, destination):
+    """Whole km between two stations, at least 1 like Route.distance"""
+    return max(
+        1,
+        round(
+            float(
+                haversine_km(
+                    source.latitude,
+                    source.longitude,
+                    destination.latitude,
+                    destination.longitude,
+                )
+            )
+        ),
+    )
+
+
+class StationDistanceMatrix:
+    def __init__(self, ids, distances, built_at):
+        self.ids = ids
+        self.distances = distances
+        self.built_at = built_at
+
+    @classmethod
+    def build(cls, directory, block_size=512):
+        # taken before the stations are read, a station saved meanwhile is
+        # treated as edited after the build
+        built_at = timezone.now()
+        stations = np.array(
+            Station.objects.order_by("id").values_list(
+                "id", "latitude", "longitude"
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        ids = stations[:, 0].astype(np.int64)
+        lat = stations[:, 1]
+        lon = stations[:, 2]
+
+        os.makedirs(directory, exist_ok=True)
+        distances_path = os.path.join(directory, DISTANCES_FILE)
+        ids_path = os.path.join(directory, IDS_FILE)
+        built_at_path = os.path.join(directory, BUILT_AT_FILE)
+
+        # written next to the live files and swapped in, readers never see
+        # a half-built matrix
+        distances = np.lib.format.open_memmap(
+            f"{distances_path}.tmp",
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(ids), len(ids)),
+        )
+        for start in range(0, len(ids), block_size):
+            end = start + block_size
+            distances[start:end] = haversine_km(
+                lat[start:end, None], lon[start:end, None], lat, lon
+            )
+        distances.flush()
+        del distances
+
+        with open(f"{built_at_path}.tmp", "wb") as file:
+            np.save(file, np.float64(built_at.timestamp()))
+        with open(f"{ids_path}.tmp", "wb") as file:
+            np.save(file, ids)
+        os.replace(f"{built_at_path}.tmp", built_at_path)
+        os.replace(f"{ids_path}.tmp", ids_path)
+        os.replace(f"{distances_path}.tmp", distances_path)
+
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory):
+        ids = np.load(os.path.join(directory, IDS_FILE))
+        distances = np.load(
+            os.path.join(directory, DISTANCES_FILE), mmap_mode="r"
+        )
+        if distances.shape != (len(ids), len(ids)):
+            raise ValueError("Station ids do not match the distance matrix.")
+        built_at = datetime.fromtimestamp(
+            float(np.load(os.path.join(directory, BUILT_AT_FILE))),
+            tz=dt_timezone.utc,
+        )
+
+        return cls(ids, distances, built_at)
+
+    def positions(self, station_ids):
+        """Rows of ``station_ids`` and a mask of the ones in the matrix"""
+        station_ids = np.asarray(station_ids, dtype=np.int64)
+        positions = np.searchsorted(self.ids, station_ids)
+        positions = np.minimum(positions, max(len(self.ids) - 1, 0))
+        found = (
+            self.ids[positions] == station_ids
+            if len(self.ids)
+            else np.zeros(station_ids.shape, dtype=bool)
+        )
+
+        return positions, found
+
+    def edited_ids(self):
+        """Ids of the stations saved since the build, by updated_at"""
+        return np.fromiter(
+            Station.objects.filter(updated_at__gt=self.built_at).values_list(
+                "id", flat=True
+            ),
+            dtype=np.int64,
+        )
+
+    def pair_distances(self, source_ids, destination_ids):
+        """Distances of the ``(source, destination)`` pairs, NaN where a
+        station is newer than the matrix or was edited since the build"""
+        sources, sources_found = self.positions(source_ids)
+        destinations, destinations_found = self.positions(destination_ids)
+        found = sources_found & destinations_found
+        if found.any():
+            edited = self.edited_ids()
+            found &= ~(
+                np.isin(source_ids, edited) | np.isin(destination_ids, edited)
+            )
+
+        result = np.full(found.shape, np.nan, dtype=np.float32)
+        result[found] = self.distances[sources[found], destinations[found]]
+
+        return result
+
+    def distance(self, source_id, destination_id):
+        distance = self.pair_distances([source_id], [destination_id])[0]
+        return None if np.isnan(distance) else float(distance)
+
+
+@lru_cache(maxsize=1)
+def load_matrix(directory, modified):
+    return StationDistanceMatrix.load(directory)
+
+
+def get_distance_matrix():
+    """The matrix in STATION_DISTANCES_DIR, None until it is built.
+    Reloaded when ``build_station_distances`` replaces it."""
+    directory = settings.STATION_DISTANCES_DIR
+    try:
+        modified = os.stat(os.path.join(directory, DISTANCES_FILE))
+        # ids.npy is swapped in first, a mismatch means a build is finishing
+        return load_matrix(directory, modified.st_mtime_ns)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def implausible_routes(queryset=None, min_ratio=1.0, max_ratio=2.0):
+    """``(route_id, distance, great_circle_km)`` of routes shorter than
+    ``min_ratio`` or longer than ``max_ratio`` times the great-circle
+    distance of their stations"""
+    queryset = Route.objects.all() if queryset is None else queryset
+    rows = list(
+        queryset.order_by("id").values_list(
+            "id",
+            "distance",
+            "source_id",
+            "destination_id",
+            "source__latitude",
+            "source__longitude",
+            "destination__latitude",
+            "destination__longitude",
+        )
+    )
+    if not rows:
+        return []
+
+    columns = np.array(rows, dtype=np.float64).T
+    route_ids, distances = columns[0], columns[1]
+
+    matrix = get_distance_matrix()
+    great_circle = (
+        matrix.pair_distances(columns[2], columns[3]).astype(np.float64)
+        if matrix is not None
+        else np.full(len(rows), np.nan)
+    )
+    # stations created or edited after the matrix was built
+    missing = np.isnan(great_circle)
+    great_circle[missing] = haversine_km(*columns[4:8, missing])
+
+    # rounding to whole km is not an error
+    too_short = distances < great_circle * min_ratio - 1
+    too_long = distances > great_circle * max_ratio + 1
+    flagged = np.flatnonzero(too_short | too_long)
+
+    return [
+        (int(route_ids[i]), int(distances[i]), float(great_circle[i]))
+        for i in flagged
+    ]
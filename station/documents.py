@@ -0,0 +1,138 @@
+import io
+from itertools import chain
+from operator import attrgetter
+
+import qrcode
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.crypto import salted_hmac
+from PIL import Image, ImageDraw, ImageFont
+
+from station.models import ArchivedTicket, Ticket, TicketDocument
+
+
+TICKET_SIGNING_SALT = "station.ticket"
+DOCUMENTS_FOLDER = "uploads/tickets/"
+PAGE_SIZE = (1240, 620)
+
+
+def sign_ticket(ticket):
+    """Signed QR payload that inspectors can verify offline"""
+    return signing.dumps(
+        {
+            "ticket": ticket.id,
+            "journey": ticket.journey_id,
+            "cargo": ticket.cargo,
+            "seat": ticket.seat,
+        },
+        salt=TICKET_SIGNING_SALT,
+        compress=True,
+    )
+
+
+def load_ticket_signature(payload):
+    return signing.loads(payload, salt=TICKET_SIGNING_SALT)
+
+
+def get_order_tickets(order_id):
+    """Live and archived tickets of an order, by id. Archived tickets keep
+    their ids and journey ids, so the document and QR codes stay the same
+    once a journey is archived."""
+    related = (
+        "journey__route__source",
+        "journey__route__destination",
+        "journey__train",
+    )
+
+    return sorted(
+        chain(
+            Ticket.objects.filter(order_id=order_id).select_related(*related),
+            ArchivedTicket.objects.filter(order_id=order_id).select_related(
+                *related
+            ),
+        ),
+        key=attrgetter("id"),
+    )
+
+
+def ticket_lines(ticket):
+    journey = ticket.journey
+
+    return [
+        f"Ticket #{ticket.id} / order #{ticket.order_id}",
+        f"{journey.route.source.name} -> {journey.route.destination.name}",
+        f"Train: {journey.train.name}",
+        f"Departure: {journey.departure_time:%Y-%m-%d %H:%M %Z}",
+        f"Arrival: {journey.arrival_time:%Y-%m-%d %H:%M %Z}",
+        f"Cargo: {ticket.cargo}   Seat: {ticket.seat}",
+    ]
+
+
+def tickets_fingerprint(tickets):
+    content = "\n".join(
+        "|".join(ticket_lines(ticket) + [str(ticket.journey_id)])
+        for ticket in tickets
+    )
+    return salted_hmac("station.ticket-document", content).hexdigest()
+
+
+def render_tickets_pdf(tickets):
+    """Render one PDF page with the details and a QR code per ticket"""
+    font = ImageFont.load_default(size=36)
+    pages = []
+
+    for ticket in tickets:
+        page = Image.new("RGB", PAGE_SIZE, "white")
+        draw = ImageDraw.Draw(page)
+
+        for index, line in enumerate(ticket_lines(ticket)):
+            draw.text((40, 40 + index * 60), line, fill="black", font=font)
+
+        code = qrcode.make(sign_ticket(ticket), box_size=6, border=2)
+        code = code.get_image().convert("RGB").resize(
+            (520, 520), Image.NEAREST
+        )
+        page.paste(code, (PAGE_SIZE[0] - 560, 50))
+        pages.append(page)
+
+    content = io.BytesIO()
+    pages[0].save(
+        content, "PDF", save_all=True, append_images=pages[1:], resolution=150
+    )
+
+    return content.getvalue()
+
+
+def generate_ticket_document(order_id):
+    """Render the order tickets unless an up-to-date document exists"""
+    tickets = get_order_tickets(order_id)
+    if not tickets:
+        return None
+
+    fingerprint = tickets_fingerprint(tickets)
+    document = TicketDocument.objects.filter(order_id=order_id).first()
+
+    if (
+        document is not None
+        and document.fingerprint == fingerprint
+        and default_storage.exists(document.file.name)
+    ):
+        return document
+
+    name = f"{DOCUMENTS_FOLDER}{fingerprint}.pdf"
+    if not default_storage.exists(name):
+        name = default_storage.save(
+            name, ContentFile(render_tickets_pdf(tickets))
+        )
+
+    stale_name = document.file.name if document is not None else None
+    document, _ = TicketDocument.objects.update_or_create(
+        order_id=order_id,
+        defaults={"fingerprint": fingerprint, "file": name},
+    )
+
+    if stale_name and stale_name != name:
+        default_storage.delete(stale_name)
+
+    return document
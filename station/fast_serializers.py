@@ -0,0 +1,110 @@
+from rest_framework import serializers
+
+
+class ValuesSerializer:
+    """Read-only serializer working on ``values_list`` rows.
+
+    ``columns`` pairs output keys with ORM lookups, in output order.
+    Dotted keys (``"train.name"``) build nested objects. The column plan is
+    compiled once per class, so each row costs a dict build instead of a
+    pass through DRF field objects.
+    """
+
+    columns = ()
+    converters = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.lookups = tuple(lookup for _, lookup in cls.columns)
+        cls.plan = tuple(
+            (tuple(key.split(".")), index, cls.converters.get(key))
+            for index, (key, _) in enumerate(cls.columns)
+        )
+        cls.is_flat = not any(
+            len(path) > 1 or convert for path, _, convert in cls.plan
+        )
+        cls.keys = tuple(key for key, _ in cls.columns)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_rows(cls, queryset):
+        return queryset.values_list(*cls.lookups)
+
+    def to_representation(self, row):
+        data = {}
+        for path, index, convert in self.plan:
+            value = row[index]
+            if convert is not None and value is not None:
+                value = convert(value)
+
+            target = data
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+
+        return data
+
+    @property
+    def data(self):
+        if self.is_flat:
+            keys = self.keys
+            return [dict(zip(keys, row)) for row in self.rows]
+
+        return [self.to_representation(row) for row in self.rows]
+
+
+datetime_to_representation = serializers.DateTimeField().to_representation
+
+
+class StationValuesSerializer(ValuesSerializer):
+    columns = (
+        ("id", "id"),
+        ("name", "name"),
+        ("latitude", "latitude"),
+        ("longitude", "longitude"),
+    )
+
+
+class RouteValuesSerializer(ValuesSerializer):
+    columns = (
+        ("id", "id"),
+        ("source", "source__name"),
+        ("destination", "destination__name"),
+        ("distance", "distance"),
+    )
+
+
+class JourneyListValuesSerializer(ValuesSerializer):
+    columns = (
+        ("id", "id"),
+        ("departure_place", "route__source__name"),
+        ("arrival_place", "route__destination__name"),
+        ("train.name", "train__name"),
+        ("train.train_type", "train__train_type__name"),
+        ("departure_time", "departure_time"),
+        ("arrival_time", "arrival_time"),
+        ("count_workers", "count_workers"),
+    )
+    converters = {
+        "departure_time": datetime_to_representation,
+        "arrival_time": datetime_to_representation,
+    }
+
+
+class JourneySearchValuesSerializer(ValuesSerializer):
+    columns = (
+        ("id", "id"),
+        ("departure_place", "route__source__name"),
+        ("arrival_place", "route__destination__name"),
+        ("train.name", "train__name"),
+        ("train.train_type", "train__train_type__name"),
+        ("departure_time", "departure_time"),
+        ("arrival_time", "arrival_time"),
+        ("availability", "availability"),
+    )
+    converters = {
+        "departure_time": datetime_to_representation,
+        "arrival_time": datetime_to_representation,
+    }
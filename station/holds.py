@@ -0,0 +1,176 @@
+"""Seat holds: seats reserved for a few minutes while the user pays.
+
+A hold is a row per seat in ``SeatHold``, unique per journey seat, so
+concurrent holds of a seat are settled by one ``INSERT ... ON CONFLICT DO
+NOTHING`` instead of locks. Orders claim their seats on the same table
+before inserting tickets, so a hold and a sale of one seat always collide.
+Expired holds stop blocking their seats at once, the rows are cleaned up
+by the next hold of the seat or by beat.
+"""
+
+import uuid
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from station.models import SeatHold, Ticket
+
+
+class SeatsUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Seats are sold or held by someone else."
+    default_code = "seats_unavailable"
+
+    def __init__(self, seats):
+        super().__init__()
+        # set directly, the constructor would turn the numbers into strings
+        self.detail = {
+            "detail": self.detail,
+            "seats": [
+                {"journey": journey_id, "cargo": cargo, "seat": seat}
+                for journey_id, cargo, seat in sorted(seats)
+            ],
+        }
+
+
+def seats_filter(seats):
+    """Q matching ``(journey_id, cargo, seat)`` triples"""
+    return reduce(
+        or_,
+        (
+            Q(journey_id=journey_id, cargo=cargo, seat=seat)
+            for journey_id, cargo, seat in seats
+        ),
+    )
+
+
+def insert_holds(token, user, seats, expires_at):
+    """Insert the holds that do not conflict, returns the seats held.
+
+    An insert on a seat another transaction is holding or selling waits for
+    it to commit or roll back, so no concurrent claim goes unseen.
+    """
+    SeatHold.objects.bulk_create(
+        (
+            SeatHold(
+                token=token,
+                journey_id=journey_id,
+                cargo=cargo,
+                seat=seat,
+                user=user,
+                expires_at=expires_at,
+            )
+            for journey_id, cargo, seat in seats
+        ),
+        ignore_conflicts=True,
+    )
+
+    return set(
+        SeatHold.objects.filter(token=token).values_list(
+            "journey_id", "cargo", "seat"
+        )
+    )
+
+
+def hold_seats(user, seats):
+    """Hold ``(journey_id, cargo, seat)`` triples for ``user`` for
+    ``SEAT_HOLD_MINUTES``, all or none.
+
+    Returns the token and expiry of the hold, raises ``SeatsUnavailable``
+    with the seats that are sold or held by a live hold.
+    """
+    seats = set(seats)
+    now = timezone.now()
+    token = uuid.uuid4()
+    expires_at = now + timedelta(minutes=settings.SEAT_HOLD_MINUTES)
+
+    with transaction.atomic():
+        SeatHold.objects.filter(
+            seats_filter(seats), expires_at__lte=now
+        ).delete()
+
+        # raising rolls back the seats that were held
+        held = insert_holds(token, user, seats, expires_at)
+        if held != seats:
+            raise SeatsUnavailable(seats - held)
+
+        # read after the insert, which waited for orders claiming the seats
+        sold = set(
+            Ticket.objects.filter(seats_filter(seats)).values_list(
+                "journey_id", "cargo", "seat"
+            )
+        )
+        if sold:
+            raise SeatsUnavailable(sold)
+
+    return token, expires_at
+
+
+def held_seats(user, token):
+    """Live ``(journey_id, cargo, seat)`` of a hold, locked until the
+    transaction ends so the hold cannot be confirmed twice"""
+    return list(
+        SeatHold.objects.filter(
+            token=token, user=user, expires_at__gt=timezone.now()
+        )
+        .select_for_update()
+        .values_list("journey_id", "cargo", "seat")
+    )
+
+
+def claim_seats(user, seats):
+    """Claim ``seats`` on the hold table for the transaction selling them.
+
+    Drops the holds ``user`` has on them and expired ones, then inserts
+    placeholder holds, which collide with holds of other users even
+    before those commit. Returns the claim token, to release once the
+    tickets exist, and the seats others hold, which cannot be sold.
+    """
+    seats = set(seats)
+    now = timezone.now()
+    token = uuid.uuid4()
+    if not seats:
+        return token, []
+
+    SeatHold.objects.filter(seats_filter(seats)).filter(
+        Q(user=user) | Q(expires_at__lte=now)
+    ).delete()
+    claimed = insert_holds(
+        token,
+        user,
+        seats,
+        now + timedelta(minutes=settings.SEAT_HOLD_MINUTES),
+    )
+
+    return token, sorted(seats - claimed)
+
+
+def release_hold(user, token):
+    return SeatHold.objects.filter(token=token, user=user).delete()[0]
+
+
+def release_expired_holds(batch_size=None):
+    """Delete expired holds in batches, returns how many were deleted"""
+    batch_size = batch_size or settings.SEAT_HOLD_SWEEP_BATCH_SIZE
+    now = timezone.now()
+    released = 0
+
+    while True:
+        ids = list(
+            SeatHold.objects.filter(expires_at__lte=now)
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return released
+
+        released += SeatHold.objects.filter(
+            id__in=ids, expires_at__lte=now
+        ).delete()[0]
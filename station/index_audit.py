@@ -0,0 +1,431 @@
+"""EXPLAIN-based index coverage audit of the station API.
+
+Every list endpoint is requested with each combination of its filters,
+the SQL it runs is captured and planned with ``EXPLAIN (FORMAT JSON)``.
+Sequential scans of large tables and sorts of many rows are reported with
+the index that would serve them.
+
+``strict`` mode plans with ``enable_seqscan`` and ``enable_sort`` off, so
+whatever is still scanned or sorted has no index to use. It does not depend
+on table statistics and suits the small datasets of tests.
+"""
+
+import copy
+import json
+import re
+from datetime import timedelta
+from itertools import combinations
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection, models, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from station.models import Crew, Journey, Order, Route, Station, Train
+
+
+# (url name, optional filters, filters always sent)
+AUDIT_CASES = (
+    ("station:crew-list", ("first_name", "last_name"), ()),
+    ("station:crew-available", (), ("from", "to")),
+    ("station:train-list", ("name", "journeys"), ()),
+    ("station:traintype-list", (), ()),
+    ("station:station-list", ("name", "latitude", "longitude"), ()),
+    ("station:route-list", ("source", "destination"), ()),
+    ("station:journey-list", ("route", "train"), ()),
+    (
+        "station:journey-search",
+        ("train_type",),
+        ("source", "destination", "date"),
+    ),
+    ("station:journeyschedule-list", (), ()),
+    ("station:order-list", ("date", "journey"), ()),
+    ("station:routedailysales-list", ("date_from", "date_to", "route"), ()),
+    ("station:traintypedailysales-list", ("date_from", "date_to"), ()),
+    ("station:orderhourlysales-list", ("date_from", "date_to"), ()),
+    ("user:trips", (), ()),
+)
+# filters whose sample differs per endpoint
+SAMPLE_ALIASES = {("station:journey-search", "date"): "day"}
+# lookup tables that stay small, strict mode does not report them
+REFERENCE_TABLES = {
+    "station_crew",
+    "station_station",
+    "station_traintype",
+    "station_train",
+    "station_route",
+    "station_journeyschedule",
+    "station_journeyschedule_workers",
+}
+# child rows read by parent key, a handful per parent
+BOUNDED_LOOKUPS = {
+    ("station_ticket", "order_id"),
+    ("station_archivedticket", "order_id"),
+}
+SCAN_NODES = {"Seq Scan", "Parallel Seq Scan"}
+SORT_NODES = {"Sort", "Incremental Sort"}
+# column compared with a value: "(user_id = 5)", "(x.departure_date >= ..."
+# but not with another column, as in join conditions
+COMPARISON_RE = re.compile(
+    r"(?:\b\w+\.)?\"?(\w+)\"?\s*(=|<>|>=|<=|>|<)(?!=)"
+    r"(?=\s*(?:ANY\b|['$(\d-]))(\s*ANY\b)?"
+)
+# "station_order.created_at DESC", alias and column
+SORT_KEY_RE = re.compile(r'^(?:"?(\w+)"?\.)?"?(\w+)"?(\s+DESC)?$')
+
+
+def sample_params(user):
+    """Filter values taken from the data, so plans see real selectivity"""
+    journey = (
+        Journey.objects.filter(tickets__order__user=user)
+        .select_related("route")
+        .first()
+        or Journey.objects.select_related("route").first()
+    )
+    route = journey.route if journey else Route.objects.first()
+    station = Station.objects.first()
+    crew = Crew.objects.first()
+    last_order = Order.objects.filter(user=user).first()
+    today = timezone.localdate()
+    day = timezone.localdate(journey.departure_time) if journey else today
+
+    return {
+        "first_name": crew.first_name[:3] if crew else "Jo",
+        "last_name": crew.last_name[:3] if crew else "Gre",
+        "from": (timezone.now()).isoformat(),
+        "to": (timezone.now() + timedelta(hours=12)).isoformat(),
+        "name": getattr(Train.objects.first(), "name", "a")[:3],
+        "journeys": 5,
+        "latitude": station.latitude if station else 0,
+        "longitude": station.longitude if station else 0,
+        "source": route.source_id if route else 1,
+        "destination": route.destination_id if route else 1,
+        "route": route.id if route else 1,
+        "train": journey.train_id if journey else 1,
+        "train_type": journey.train.train_type_id if journey else 1,
+        "date": (
+            timezone.localdate(last_order.created_at) if last_order else day
+        ).isoformat(),
+        "journey": journey.id if journey else 1,
+        "date_from": (day - timedelta(days=30)).isoformat(),
+        "date_to": day.isoformat(),
+        "day": day.isoformat(),
+    }
+
+
+def busiest_user():
+    busiest = (
+        Order.objects.values("user")
+        .annotate(orders=Count("id"))
+        .order_by("-orders")
+        .first()
+    )
+    users = get_user_model().objects
+    if busiest is None:
+        return users.filter(is_staff=True).first() or users.first()
+
+    return users.get(pk=busiest["user"])
+
+
+def filter_combinations(optional):
+    for size in range(len(optional) + 1):
+        yield from combinations(optional, size)
+
+
+def capture_queries(url_name, params, user, host):
+    """SELECTs run by one GET of ``url_name``, rolled back"""
+    path = reverse(url_name)
+    request = APIRequestFactory().get(path, params, HTTP_HOST=host)
+    force_authenticate(request, user=user)
+    match = resolve(path)
+
+    with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        transaction.set_rollback(True)
+
+    return response.status_code, [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].lstrip().upper().startswith("SELECT")
+    ]
+
+
+def explain(sql, strict=False):
+    with transaction.atomic(), connection.cursor() as cursor:
+        if strict:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def walk(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk(child)
+
+
+def table_rows():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind IN ('r', 'p') AND relnamespace = "
+            "'public'::regnamespace"
+        )
+        return {name: max(rows, 0) for name, rows in cursor.fetchall()}
+
+
+def model_for_table(table):
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def compared_columns(condition, columns):
+    """Columns a plan condition compares to a single value, equality
+    comparisons first. ``= ANY(...)`` lists give no usable order."""
+    equal, ranges = [], []
+    for column, operator, any_ in COMPARISON_RE.findall(condition or ""):
+        if column not in columns or any_ or column in equal + ranges:
+            continue
+        (equal if operator == "=" else ranges).append(column)
+
+    return equal, ranges
+
+
+def sorted_scan(node):
+    """The scan of the one relation a sort orders by, with its sort keys
+    as ``(column, descending)``"""
+    scans = [child for child in walk(node) if "Relation Name" in child]
+    aliases, keys = set(), []
+    for key in node.get("Sort Key", ()):
+        match = SORT_KEY_RE.match(key)
+        if match is None:
+            # an expression or aggregate
+            return None, ()
+        aliases.add(match[1])
+        keys.append((match[2], bool(match[3])))
+
+    if len(aliases) != 1:
+        return None, ()
+    alias = aliases.pop()
+    for scan in scans:
+        if alias is None and len(scans) > 1:
+            break
+        if alias in (None, scan.get("Alias"), scan["Relation Name"]):
+            if all(
+                column in column_names(scan["Relation Name"])
+                for column, _ in keys
+            ):
+                return scan, keys
+            break
+
+    return None, ()
+
+
+def index_fields(model):
+    """Leading columns of the btree indexes of ``model``, as field names"""
+    meta = model._meta
+    fields = [
+        list(index.fields)
+        for index in meta.indexes
+        if type(index) is models.Index and index.fields
+    ]
+    fields += [
+        list(constraint.fields)
+        for constraint in meta.constraints
+        if isinstance(constraint, models.UniqueConstraint)
+        and constraint.fields
+    ]
+    fields += [list(together) for together in meta.unique_together]
+    fields += [
+        [field.name]
+        for field in meta.concrete_fields
+        if field.db_index or field.unique or field.primary_key
+    ]
+
+    return [[name.lstrip("-") for name in names] for names in fields]
+
+
+def propose_index(table, columns, sort_keys=()):
+    """``(model label, fields)`` of the index serving ``columns`` then
+    ``sort_keys``, None if one already exists"""
+    model = model_for_table(table)
+    if model is None:
+        return None
+
+    names = {field.column: field.name for field in model._meta.concrete_fields}
+    fields = [names[column] for column in columns]
+    for column, descending in sort_keys:
+        if names[column] not in fields:
+            fields.append(f"-{names[column]}" if descending else names[column])
+
+    # a trailing primary key only breaks ties, an incremental sort over the
+    # leading columns handles it
+    if fields and fields[-1].lstrip("-") == model._meta.pk.name:
+        fields.pop()
+
+    wanted = [name.lstrip("-") for name in fields]
+    if not fields or any(
+        existing[: len(wanted)] == wanted for existing in index_fields(model)
+    ):
+        return None
+
+    return model._meta.label, tuple(fields)
+
+
+def column_names(table):
+    model = model_for_table(table)
+    if model is None:
+        return set()
+    return {field.column for field in model._meta.concrete_fields}
+
+
+def analyze_plan(plan, rows, min_rows, strict):
+    findings = []
+
+    for node in walk(plan):
+        node_type = node["Node Type"]
+
+        if node_type in SCAN_NODES:
+            table = node["Relation Name"]
+            size = rows.get(table, 0)
+            # reading a whole table (counts, unfiltered pages) needs no index
+            if "Filter" not in node:
+                continue
+            if strict and table in REFERENCE_TABLES:
+                continue
+            if not strict and size < min_rows:
+                continue
+
+            equal, ranges = compared_columns(
+                node["Filter"], column_names(table)
+            )
+            findings.append(
+                {
+                    "problem": f"sequential scan of {table} (~{size:.0f} rows)"
+                    f" filtering {node['Filter']}",
+                    "table": table,
+                    "index": propose_index(table, equal + ranges),
+                }
+            )
+
+        elif node_type in SORT_NODES:
+            sorted_rows = node.get("Plan Rows", 0)
+            scan, keys = sorted_scan(node)
+            table = scan["Relation Name"] if scan else None
+            condition = (
+                " ".join(
+                    scan.get(name, "")
+                    for name in ("Index Cond", "Recheck Cond", "Filter")
+                )
+                if scan
+                else ""
+            )
+            equal, _ = compared_columns(condition, column_names(table))
+            if strict and (
+                table is None
+                or table in REFERENCE_TABLES
+                # prefetch batches, bounded by the page size
+                or "ANY" in condition
+                or any((table, column) in BOUNDED_LOOKUPS for column in equal)
+            ):
+                continue
+            if not strict and sorted_rows < min_rows:
+                continue
+
+            index = propose_index(table, equal, keys) if scan else None
+
+            findings.append(
+                {
+                    "problem": (
+                        f"sort of ~{sorted_rows} rows by "
+                        f"{', '.join(node.get('Sort Key', ()))}"
+                    ),
+                    "table": table,
+                    "index": index,
+                }
+            )
+
+    return findings
+
+
+def audit(
+    user=None,
+    cases=AUDIT_CASES,
+    min_rows=10000,
+    strict=False,
+    host="localhost",
+):
+    """Findings per request: ``{"request", "sql", "problem", "table",
+    "index"}``. Every query reaches the database, caches are off."""
+    # a staff copy, for the sales dashboards
+    user = copy.copy(user or busiest_user())
+    user.is_staff = True
+    rows = table_rows()
+    findings = []
+
+    dummy_cache = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }
+    with override_settings(CACHES=dummy_cache):
+        params = sample_params(user)
+        for url_name, optional, required in cases:
+            for names in filter_combinations(optional):
+                query = {"limit": 25}
+                for name in (*required, *names):
+                    query[name] = params[
+                        SAMPLE_ALIASES.get((url_name, name), name)
+                    ]
+
+                request = f"{reverse(url_name)}?{urlencode(query)}"
+                status, queries = capture_queries(url_name, query, user, host)
+                if status >= 400:
+                    findings.append(
+                        {
+                            "request": request,
+                            "sql": None,
+                            "problem": f"request failed with {status}",
+                            "table": None,
+                            "index": None,
+                        }
+                    )
+                    continue
+
+                for sql in dict.fromkeys(queries):
+                    for finding in analyze_plan(
+                        explain(sql, strict), rows, min_rows, strict
+                    ):
+                        findings.append(
+                            {"request": request, "sql": sql, **finding}
+                        )
+
+    return findings
+
+
+class IndexAuditMixin:
+    """TestCase mixin failing on API queries that need an index the models
+    do not declare. Plans in strict mode, so a small dataset is enough."""
+
+    def assertIndexesCover(self, cases=AUDIT_CASES, user=None):
+        missing = [
+            f"{finding['request']}: {finding['problem']} -> "
+            f"{finding['index']}"
+            for finding in audit(
+                user=user, cases=cases, strict=True, host="testserver"
+            )
+            if finding["index"] or finding["sql"] is None
+        ]
+        self.assertEqual(missing, [])
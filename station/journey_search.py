@@ -0,0 +1,219 @@
+"""Cached "journeys from A to B on day D" searches.
+
+Entries are keyed by the station pair, the day, the filters and a version
+per (source, destination, day). Invalidating bumps that version, so a change
+on one journey drops every filter variant of its pair and day and nothing
+else; the orphaned entries expire with ``JOURNEY_SEARCH_CACHE_TTL``.
+
+Results show an availability level instead of a seat count, so a sale only
+invalidates when it moves a journey to another level.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Sum, Value, When
+from django.utils import timezone
+
+from station.fast_serializers import JourneySearchValuesSerializer
+from station.models import Journey, RouteDailySales
+
+
+AVAILABLE = "available"
+FEW_SEATS = "few"
+SOLD_OUT = "sold_out"
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    end = timezone.make_aware(
+        datetime.combine(day + timedelta(days=1), datetime.min.time())
+    )
+
+    return start, end
+
+
+def with_availability(queryset):
+    return queryset.annotate(
+        seats_left=F("train__cargo_num") * F("train__places_in_cargo")
+        - Count("tickets")
+    ).annotate(
+        availability=Case(
+            When(seats_left__lte=0, then=Value(SOLD_OUT)),
+            When(
+                seats_left__lte=settings.JOURNEY_SEARCH_FEW_SEATS,
+                then=Value(FEW_SEATS),
+            ),
+            default=Value(AVAILABLE),
+            output_field=CharField(),
+        )
+    )
+
+
+def search_queryset(source_id, destination_id, day, train_type_ids=()):
+    # a range on departure_time keeps journey_departure_idx usable
+    start, end = day_bounds(day)
+    queryset = Journey.objects.filter(
+        route__source_id=source_id,
+        route__destination_id=destination_id,
+        departure_time__gte=start,
+        departure_time__lt=end,
+    )
+    if train_type_ids:
+        queryset = queryset.filter(train__train_type_id__in=train_type_ids)
+
+    return with_availability(queryset).order_by("departure_time", "id")
+
+
+def version_key(source_id, destination_id, day):
+    return f"journey-search-version:{source_id}:{destination_id}:{day}"
+
+
+def level_key(journey_id):
+    return f"journey-search-level:{journey_id}"
+
+
+def get_version(source_id, destination_id, day):
+    key = version_key(source_id, destination_id, day)
+    version = cache.get(key)
+    if version is None:
+        # starts from the clock, so a version evicted from the cache never
+        # comes back with a number older entries were stored under
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def search_key(source_id, destination_id, day, train_type_ids, version):
+    train_types = ",".join(map(str, sorted(set(train_type_ids))))
+    return (
+        f"journey-search:{source_id}:{destination_id}:{day}:{version}:"
+        f"train_type={train_types}"
+    )
+
+
+def search_journeys(
+    source_id, destination_id, day, train_type_ids=(), refresh=False
+):
+    """Journeys of a station pair departing on ``day``, from the cache when
+    the pair and day have not changed since they were stored"""
+    # read before the query: a change committed meanwhile bumps the version
+    # and the result is stored under the old one, where nobody reads it
+    version = get_version(source_id, destination_id, day)
+    key = search_key(source_id, destination_id, day, train_type_ids, version)
+
+    data = None if refresh else cache.get(key)
+    if data is None:
+        serializer = JourneySearchValuesSerializer(
+            JourneySearchValuesSerializer.get_rows(
+                search_queryset(
+                    source_id, destination_id, day, train_type_ids
+                )
+            )
+        )
+        data = serializer.data
+        cache.set(key, data, settings.JOURNEY_SEARCH_CACHE_TTL)
+        # what sales are compared against, see invalidate_on_seat_change
+        cache.set_many(
+            {level_key(row["id"]): row["availability"] for row in data},
+            settings.JOURNEY_SEARCH_CACHE_TTL,
+        )
+
+    return data
+
+
+def search_slot(source_id, destination_id, departure_time):
+    return (
+        source_id,
+        destination_id,
+        timezone.localdate(departure_time),
+    )
+
+
+def invalidate_searches(slots):
+    """Drop the cached searches of ``(source_id, destination_id, day)``"""
+    for source_id, destination_id, day in set(slots):
+        try:
+            cache.incr(version_key(source_id, destination_id, day))
+        except ValueError:
+            # no version, nothing was cached under it
+            pass
+
+
+def invalidate_journeys_on_commit(journeys):
+    """Drop the searches listing ``journeys`` (with their routes loaded)
+    once the current transaction commits"""
+    slots = [
+        search_slot(
+            journey.route.source_id,
+            journey.route.destination_id,
+            journey.departure_time,
+        )
+        for journey in journeys
+    ]
+
+    if slots:
+        transaction.on_commit(
+            lambda: invalidate_searches(slots), robust=True
+        )
+
+
+def invalidate_on_seat_change(journey_ids):
+    """After commit, drop the searches of journeys whose availability level
+    no longer matches the one last served"""
+    journey_ids = set(journey_ids)
+
+    def invalidate():
+        journeys = with_availability(
+            Journey.objects.filter(pk__in=journey_ids)
+        ).values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "availability",
+        )
+        served = cache.get_many([level_key(pk) for pk in journey_ids])
+
+        changed = {}
+        slots = []
+        for pk, source_id, destination_id, departure_time, level in journeys:
+            if served.get(level_key(pk)) != level:
+                changed[level_key(pk)] = level
+                slots.append(
+                    search_slot(source_id, destination_id, departure_time)
+                )
+
+        invalidate_searches(slots)
+        cache.set_many(changed, settings.JOURNEY_SEARCH_CACHE_TTL)
+
+    if journey_ids:
+        transaction.on_commit(invalidate, robust=True)
+
+
+def warm_popular_searches(limit=None):
+    """Cache tomorrow's searches of the station pairs that sold the most
+    tickets over the last week"""
+    limit = settings.JOURNEY_SEARCH_WARM_PAIRS if limit is None else limit
+    tomorrow = timezone.localdate() + timedelta(days=1)
+
+    pairs = (
+        RouteDailySales.objects.filter(
+            departure_date__gte=tomorrow - timedelta(days=8),
+            departure_date__lte=tomorrow,
+        )
+        .values_list("route__source_id", "route__destination_id")
+        .annotate(sold=Sum("tickets_sold"))
+        .order_by("-sold", "route__source_id", "route__destination_id")
+    )[:limit]
+
+    warmed = 0
+    for source_id, destination_id, _ in pairs:
+        search_journeys(source_id, destination_id, tomorrow, refresh=True)
+        warmed += 1
+
+    return warmed
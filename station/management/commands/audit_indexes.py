@@ -0,0 +1,66 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from station.index_audit import audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every list endpoint with each combination of its filters, "
+        "EXPLAIN the SQL and report sequential scans and sorts above "
+        "--min-rows, with the indexes that would serve them. Run it on a "
+        "seeded dataset (see seed_load_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-rows", type=int, default=10000)
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Plan with seqscan and sort disabled, ignores table sizes",
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the user the requests are made as, the one with "
+            "the most orders by default",
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error when an index is proposed",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.get(email=options["user"])
+
+        findings = audit(
+            user=user,
+            min_rows=options["min_rows"],
+            strict=options["strict"],
+            host=options["host"],
+        )
+
+        proposals = defaultdict(list)
+        for finding in findings:
+            self.stdout.write(f"{finding['request']}: {finding['problem']}")
+            if options["verbosity"] > 1 and finding["sql"]:
+                self.stdout.write(f"    {finding['sql']}")
+            if finding["index"]:
+                proposals[finding["index"]].append(finding["request"])
+
+        if not findings:
+            self.stdout.write("No sequential scans or sorts to report.")
+
+        for (model, fields), requests in proposals.items():
+            self.stdout.write(
+                f"Proposed: {model} models.Index(fields={list(fields)}) "
+                f"for {len(requests)} requests"
+            )
+
+        if proposals and options["fail"]:
+            raise CommandError(f"{len(proposals)} indexes are missing.")
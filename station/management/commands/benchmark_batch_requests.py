@@ -0,0 +1,120 @@
+import statistics
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.models import Journey, Route, Station, Train, TrainType
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare end-to-end latency of the trip screen requests sent one "
+        "by one and through POST /api/batch/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with (
+            transaction.atomic(),
+            # the benchmark user would run out of its daily quota
+            mock.patch.object(APIView, "throttle_classes", ()),
+        ):
+            journey = Journey.objects.select_related("route").first()
+            committed = journey is not None
+            if journey is None:
+                self.stdout.write("Creating a temporary journey")
+                journey = self.create_journey()
+
+            user = get_user_model().objects.create_user(
+                email="benchmark-batch@example.com", password="benchmark"
+            )
+            client = Client(
+                HTTP_HOST="localhost",
+                HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+            )
+            urls = [
+                reverse("station:journey-detail", args=[journey.id]),
+                reverse("station:train-detail", args=[journey.train_id]),
+                reverse("station:route-list")
+                + f"?source={journey.route.source_id}",
+                reverse("station:order-list"),
+            ]
+
+            def sequential():
+                for url in urls:
+                    client.get(url)
+
+            def batch(parallel=False):
+                client.post(
+                    reverse("batch"),
+                    {
+                        "requests": [{"url": url} for url in urls],
+                        "parallel": parallel,
+                    },
+                    content_type="application/json",
+                )
+
+            runs = [("sequential", sequential), ("batch", batch)]
+            if committed:
+                # worker threads cannot see rows of this transaction
+                runs.append(("parallel batch", lambda: batch(parallel=True)))
+
+            for name, run in runs:
+                timings = self.measure(run, options["repeat"])
+                self.stdout.write(
+                    f"{name}: median {statistics.median(timings):.2f} ms, "
+                    f"p95 {self.percentile(timings, 95):.2f} ms"
+                )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(run, repeat):
+        run()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return timings
+
+    @staticmethod
+    def percentile(timings, percent):
+        ordered = sorted(timings)
+        return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+    @staticmethod
+    def create_journey():
+        departure_time = timezone.now() + timedelta(days=1)
+
+        return Journey.objects.create(
+            route=Route.objects.create(
+                source=Station.objects.create(
+                    name="benchmark-a", latitude=50, longitude=30
+                ),
+                destination=Station.objects.create(
+                    name="benchmark-b", latitude=49, longitude=24
+                ),
+                distance=100,
+            ),
+            train=Train.objects.create(
+                name="benchmark",
+                cargo_num=10,
+                places_in_cargo=50,
+                train_type=TrainType.objects.create(name="benchmark"),
+            ),
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(minutes=50),
+        )
@@ -0,0 +1,104 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from station.models import Journey, Route, Station, Train, TrainType
+from station.views import JourneyViewSet, RouteViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows per second of the serializer and the fast values "
+        "path on JourneyViewSet.list and RouteViewSet.list"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument(
+            "--sample-rows",
+            type=int,
+            default=100,
+            help="Rows created (and rolled back) when the tables are "
+            "smaller than this",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.ensure_sample_rows(options["sample_rows"])
+
+            for name, viewset in [
+                ("journeys", JourneyViewSet),
+                ("routes", RouteViewSet),
+            ]:
+                serializer = self.rows_per_second(
+                    viewset.as_view(
+                        {"get": "list"},
+                        fast_list_serializer_class=None,
+                        throttle_classes=(),
+                    ),
+                    options,
+                )
+                fast = self.rows_per_second(
+                    viewset.as_view({"get": "list"}, throttle_classes=()),
+                    options,
+                )
+                self.stdout.write(
+                    f"{name}: serializer {serializer:,.0f} rows/s, "
+                    f"fast {fast:,.0f} rows/s "
+                    f"(x{fast / serializer:.2f})"
+                )
+
+            transaction.set_rollback(True)
+
+    def rows_per_second(self, view, options):
+        request = APIRequestFactory().get(
+            "/", {"limit": options["limit"]}, HTTP_HOST="localhost"
+        )
+        rows = 0
+
+        started = time.perf_counter()
+        for _ in range(options["repeat"]):
+            response = view(request)
+            response.render()
+            rows += len(response.data["results"])
+
+        return rows / (time.perf_counter() - started)
+
+    def ensure_sample_rows(self, sample_rows):
+        missing = sample_rows - min(
+            Route.objects.count(), Journey.objects.count()
+        )
+        if missing <= 0:
+            return
+
+        self.stdout.write(f"Creating {missing} temporary routes/journeys")
+        train = Train.objects.create(
+            name="benchmark",
+            cargo_num=10,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="benchmark"),
+        )
+        departure_time = timezone.now() + timedelta(days=1)
+
+        for index in range(missing):
+            route = Route.objects.create(
+                source=Station.objects.create(
+                    name=f"benchmark-{index}-a", latitude=50, longitude=30
+                ),
+                destination=Station.objects.create(
+                    name=f"benchmark-{index}-b", latitude=49, longitude=24
+                ),
+                distance=100 + index,
+            )
+            departure = departure_time + timedelta(hours=index)
+            Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=departure,
+                arrival_time=departure + timedelta(minutes=50),
+            )
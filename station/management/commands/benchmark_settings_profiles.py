@@ -0,0 +1,115 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import import_module
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+URLS = ("/api/stations/train-types/", "/api/schema/")
+
+
+def measure_profile(repeat):
+    """Run in a fresh interpreter, DJANGO_SETTINGS_MODULE picks the profile"""
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    from django.conf import settings
+
+    import_module(settings.ROOT_URLCONF)
+    startup = (time.perf_counter() - started) * 1000
+
+    from django.db import connection
+    from django.test import Client
+    from rest_framework.views import APIView
+
+    result = {
+        "startup_ms": startup,
+        "modules": len(sys.modules),
+        "requests": {},
+    }
+    client = Client(HTTP_HOST="localhost")
+    with mock.patch.object(APIView, "throttle_classes", ()):
+        for url in URLS:
+            client.get(url)
+            timings = []
+            for _ in range(repeat):
+                request_started = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - request_started) * 1000)
+            result["requests"][url] = statistics.median(timings)
+
+    # outside the request cycle (Celery tasks, commands) nothing resets
+    # connection.queries
+    from station.models import TrainType
+
+    connection.queries_log.clear()
+    for _ in range(repeat):
+        TrainType.objects.exists()
+    result["kept_queries"] = len(connection.queries)
+
+    print(json.dumps(result))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare import time and per-request overhead of the development "
+        "(trainipy.settings) and production settings profiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=100)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            schema_file = os.path.join(directory, "schema.yaml")
+            call_command("spectacular", file=schema_file)
+
+            for name, module, profile_schema_file in [
+                ("development", "trainipy.settings", ""),
+                ("production", "trainipy.settings_production", schema_file),
+            ]:
+                result = self.run_profile(
+                    module, profile_schema_file, options["repeat"]
+                )
+                requests = ", ".join(
+                    f"{url} {timing:.2f} ms"
+                    for url, timing in result["requests"].items()
+                )
+                self.stdout.write(
+                    f"{name}: startup {result['startup_ms']:.0f} ms, "
+                    f"{result['modules']} modules, "
+                    f"median {requests}, "
+                    f"{result['kept_queries']} of {options['repeat']} "
+                    "queries kept in memory outside requests"
+                )
+
+    @staticmethod
+    def run_profile(module, schema_file, repeat):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": module,
+            "DJANGO_ALLOWED_HOSTS": "localhost",
+            "OPENAPI_SCHEMA_FILE": schema_file,
+        }
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"from {__name__} import measure_profile; "
+                f"measure_profile({repeat})",
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+        return json.loads(output.strip().splitlines()[-1])
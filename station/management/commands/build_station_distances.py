@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from station.distances import StationDistanceMatrix
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the great-circle distance of every station pair to "
+        "STATION_DISTANCES_DIR as a memory-mapped float32 matrix"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory", help="STATION_DISTANCES_DIR by default"
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=512,
+            help="Matrix rows computed at once, bounds the memory used",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        matrix = StationDistanceMatrix.build(
+            options["directory"] or settings.STATION_DISTANCES_DIR,
+            block_size=options["block_size"],
+        )
+
+        self.stdout.write(
+            f"Wrote distances of {len(matrix.ids)} stations "
+            f"({matrix.distances.nbytes / 2**20:.1f} MiB) in "
+            f"{time.perf_counter() - started:.2f} s"
+        )
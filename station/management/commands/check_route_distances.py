@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from station.distances import implausible_routes
+
+
+class Command(BaseCommand):
+    help = (
+        "List routes whose distance is shorter than the great-circle "
+        "distance of their stations or implausibly longer, e.g. after a "
+        "bulk import. Fails when any is found."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-ratio", type=float, default=1.0)
+        parser.add_argument("--max-ratio", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        routes = implausible_routes(
+            min_ratio=options["min_ratio"], max_ratio=options["max_ratio"]
+        )
+        for route_id, distance, great_circle in routes:
+            self.stdout.write(
+                f"Route {route_id}: {distance} km, "
+                f"great-circle {great_circle:.0f} km"
+            )
+
+        if routes:
+            raise CommandError(f"{len(routes)} routes look wrong.")
+
+        self.stdout.write("All route distances are plausible.")
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the order shard queues as a -Q list for celery workers, so "
+        "they follow ORDER_QUEUE_SHARDS."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(",".join(settings.ORDER_QUEUES))
@@ -0,0 +1,338 @@
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from station.distances import route_distance_km
+from station.models import (
+    ArchivedJourney,
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.table_versions import bump_versions_on_commit
+
+
+JOURNEY_FIELDS = (
+    "id",
+    "route_id",
+    "train_id",
+    "departure_time",
+    "arrival_time",
+    "updated_at",
+)
+ORDER_FIELDS = ("id", "user_id", "created_at")
+TICKET_FIELDS = ("journey_id", "order_id", "cargo", "seat")
+TRAIN_TYPES = ("regional", "intercity", "night", "express")
+
+
+class RowLoader:
+    """Inserts plain row tuples, by COPY on PostgreSQL"""
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.use_copy = connection.vendor == "postgresql"
+        self.rows = 0
+
+    def load(self, model, fields, rows):
+        if self.use_copy:
+            columns = ", ".join(
+                connection.ops.quote_name(model._meta.get_field(name).column)
+                for name in fields
+            )
+            with connection.cursor() as cursor, cursor.copy(
+                f"COPY {connection.ops.quote_name(model._meta.db_table)} "
+                f"({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            model.objects.bulk_create(
+                (model(**dict(zip(fields, row))) for row in rows),
+                batch_size=self.chunk_size,
+            )
+
+        self.rows += len(rows)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a deterministic synthetic dataset (stations, routes, trains, "
+        "journeys, orders and tickets) for load and capacity tests. "
+        "Bypasses model validation and signals, run it on a quiet database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=200)
+        parser.add_argument("--routes", type=int, default=1000)
+        parser.add_argument("--trains", type=int, default=300)
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--journeys-per-day", type=int, default=200)
+        parser.add_argument(
+            "--occupancy",
+            type=int,
+            default=50,
+            help="Percent of the seats of every journey that are sold",
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            default=None,
+            help="First service day (YYYY-MM-DD), today by default",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        if options["stations"] < 2:
+            raise CommandError("At least two stations are needed.")
+        if not 0 <= options["occupancy"] <= 100:
+            raise CommandError("--occupancy must be between 0 and 100.")
+        max_routes = options["stations"] * (options["stations"] - 1)
+        if not 1 <= options["routes"] <= max_routes:
+            raise CommandError(
+                f"--routes must be between 1 and {max_routes}."
+            )
+        if options["trains"] < 1 or options["users"] < 1:
+            raise CommandError("At least one train and user are needed.")
+
+        self.rng = random.Random(options["seed"])
+        self.prefix = f"load-{options['seed']}"
+        self.loader = RowLoader(options["chunk_size"])
+        self.next_ids = {}
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            if self.loader.use_copy:
+                # check foreign keys row by row instead of queueing millions
+                # of deferred trigger events until commit
+                with connection.cursor() as cursor:
+                    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+            stations = self.create_stations(options["stations"])
+            routes = self.create_routes(stations, options["routes"])
+            trains = self.create_trains(options["trains"])
+            user_ids = self.create_users(options["users"])
+            journeys = self.load_journeys(routes, trains, options)
+            tickets = self.load_orders_and_tickets(
+                journeys, user_ids, options
+            )
+            self.reset_sequences()
+            # COPY and bulk inserts send no post_save
+            bump_versions_on_commit(Station, Route, TrainType, Train, Journey)
+
+        if self.loader.use_copy:
+            with connection.cursor() as cursor:
+                for model in (Journey, Order, Ticket):
+                    cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+        self.stdout.write(
+            f"Loaded {len(journeys)} journeys and {tickets} tickets "
+            f"({self.loader.rows} rows) in "
+            f"{time.perf_counter() - started:.1f} s"
+        )
+
+    def create_stations(self, count):
+        return Station.objects.bulk_create(
+            Station(
+                name=f"{self.prefix} station {index}",
+                latitude=round(self.rng.uniform(44.5, 52.3), 5),
+                longitude=round(self.rng.uniform(22.2, 40.1), 5),
+            )
+            for index in range(count)
+        )
+
+    def create_routes(self, stations, count):
+        pairs = set()
+        while len(pairs) < count:
+            source, destination = self.rng.sample(range(len(stations)), 2)
+            pairs.add((source, destination))
+
+        return Route.objects.bulk_create(
+            Route(
+                source=stations[source],
+                destination=stations[destination],
+                distance=route_distance_km(
+                    stations[source], stations[destination]
+                ),
+            )
+            for source, destination in sorted(pairs)
+        )
+
+    def create_trains(self, count):
+        train_types = TrainType.objects.bulk_create(
+            TrainType(name=f"{self.prefix} {name}") for name in TRAIN_TYPES
+        )
+
+        return Train.objects.bulk_create(
+            Train(
+                name=f"{self.prefix} train {index}",
+                cargo_num=self.rng.randint(4, 12),
+                places_in_cargo=self.rng.randint(40, 80),
+                train_type=train_types[index % len(train_types)],
+            )
+            for index in range(count)
+        )
+
+    def create_users(self, count):
+        # hashing a password per user would dominate the run time
+        password = make_password(None)
+        users = get_user_model().objects.bulk_create(
+            (
+                get_user_model()(
+                    email=f"{self.prefix}-{index}@example.com",
+                    password=password,
+                )
+                for index in range(count)
+            ),
+            batch_size=self.loader.chunk_size,
+        )
+
+        return [user.id for user in users]
+
+    def load_journeys(self, routes, trains, options):
+        """Journeys of one train never overlap: every train runs a fixed
+        number of slots a day and each journey stays inside its slot."""
+        per_day = options["journeys_per_day"]
+        slots = math.ceil(per_day / len(trains))
+        slot_minutes = 24 * 60 // slots
+        if slot_minutes < 60:
+            raise CommandError(
+                "Too few trains for --journeys-per-day, every train would "
+                "run more than 24 journeys a day."
+            )
+
+        start_date = options["start_date"] or timezone.localdate()
+        first_day = timezone.make_aware(
+            datetime.combine(start_date, datetime.min.time())
+        )
+        now = timezone.now()
+        # archived journeys keep their ids, new ones must not reuse them
+        next_id = self.first_free_id(Journey, ArchivedJourney)
+
+        journeys = []
+        taken = set()
+        for day in range(options["days"]):
+            day_start = first_day + timedelta(days=day)
+            for index in range(per_day):
+                train = trains[index % len(trains)]
+                slot_start = day_start + timedelta(
+                    minutes=index // len(trains) * slot_minutes
+                )
+                while True:
+                    route = self.rng.choice(routes)
+                    departure_time = slot_start + timedelta(
+                        minutes=self.rng.randrange(slot_minutes // 2)
+                    )
+                    arrival_time = departure_time + timedelta(
+                        minutes=self.rng.randint(30, slot_minutes // 2)
+                    )
+                    if (route.id, departure_time, arrival_time) not in taken:
+                        taken.add((route.id, departure_time, arrival_time))
+                        break
+
+                journeys.append(
+                    (
+                        next_id,
+                        route.id,
+                        train.id,
+                        departure_time,
+                        arrival_time,
+                        now,
+                    )
+                )
+                next_id += 1
+
+        self.loader.load(Journey, JOURNEY_FIELDS, journeys)
+        self.next_ids[Journey] = next_id
+
+        capacity = {train.id: train for train in trains}
+        return [
+            (journey[0], capacity[journey[2]], journey[3])
+            for journey in journeys
+        ]
+
+    def load_orders_and_tickets(self, journeys, user_ids, options):
+        """Sell ``--occupancy`` percent of distinct seats of every journey
+        in orders of one to four tickets, flushed every ``--chunk-size``
+        tickets."""
+        next_id = self.first_free_id(Order)
+        orders = []
+        tickets = []
+        total = 0
+
+        for journey_id, train, departure_time in journeys:
+            places = train.cargo_num * train.places_in_cargo
+            sold = places * options["occupancy"] // 100
+            seats = self.rng.sample(range(places), sold)
+
+            start = 0
+            while start < sold:
+                end = start + self.rng.randint(1, 4)
+                created_at = departure_time - timedelta(
+                    minutes=self.rng.randint(60, 60 * 24 * 30)
+                )
+                orders.append(
+                    (next_id, self.rng.choice(user_ids), created_at)
+                )
+                for place in seats[start:end]:
+                    cargo, seat = divmod(place, train.places_in_cargo)
+                    tickets.append((journey_id, next_id, cargo + 1, seat + 1))
+                next_id += 1
+                start = end
+
+            if len(tickets) >= self.loader.chunk_size:
+                total += self.flush(orders, tickets)
+
+        self.next_ids[Order] = next_id
+        return total + self.flush(orders, tickets)
+
+    def flush(self, orders, tickets):
+        count = len(tickets)
+        self.loader.load(Order, ORDER_FIELDS, orders)
+        self.loader.load(Ticket, TICKET_FIELDS, tickets)
+        orders.clear()
+        tickets.clear()
+
+        return count
+
+    def first_free_id(self, model, *archives):
+        """Id past every id ``model`` handed out: its rows, the rows moved
+        to ``archives`` and its id sequence"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_sequence_last_value("
+                "pg_get_serial_sequence(%s, 'id'))",
+                [model._meta.db_table],
+            )
+            last = cursor.fetchone()[0] or 0
+
+        for table in (model, *archives):
+            last = max(
+                last, table.objects.aggregate(last=Max("id"))["last"] or 0
+            )
+
+        return last + 1
+
+    def reset_sequences(self):
+        """Move the id sequences to the last loaded ids. Loading started
+        past the sequence values, so they never move backwards."""
+        with connection.cursor() as cursor:
+            for model, next_id in self.next_ids.items():
+                if next_id > 1:
+                    cursor.execute(
+                        "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)",
+                        [model._meta.db_table, next_id - 1],
+                    )
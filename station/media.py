@@ -0,0 +1,132 @@
+import mimetypes
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+
+# only these folders of MEDIA_ROOT are public, ticket documents are
+# downloaded through /orders/<id>/tickets.pdf
+PUBLIC_MEDIA_FOLDERS = ("uploads/train_images/",)
+HASHED_NAME_RE = re.compile(r"-[0-9a-f]{16}\.\w+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def public_media_path(path):
+    """Normalized storage name of ``path`` or None if it is not public"""
+    name = posixpath.normpath(path).lstrip("/")
+    if name.startswith("..") or not name.startswith(PUBLIC_MEDIA_FOLDERS):
+        return None
+
+    return name
+
+
+def media_cache_control(name):
+    if HASHED_NAME_RE.search(name):
+        return f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"
+
+    return "public, max-age=0, must-revalidate"
+
+
+def parse_range(header, size):
+    """``(start, end)`` of a single ``bytes=`` range, inclusive.
+
+    Returns None for headers that should be ignored (multiple ranges,
+    garbage) and raises ValueError for unsatisfiable ranges.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+
+    return start, end
+
+
+def offload_response(name, content_type):
+    """Empty response telling the front proxy which file to send"""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SERVE_MODE == "x-accel":
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + name
+    else:
+        response["X-Sendfile"] = default_storage.path(name)
+
+    return response
+
+
+def stream_response(request, name, content_type, size, etag):
+    """File response with single-range support, for development"""
+    response_range = None
+    if "Range" in request.headers and request.headers.get(
+        "If-Range", etag
+    ) == etag:
+        try:
+            response_range = parse_range(request.headers["Range"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = default_storage.open(name, "rb")
+    if response_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = response_range
+        file.seek(start)
+        response = HttpResponse(
+            file.read(end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        file.close()
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve public media, or only authorize it when a proxy sends files.
+
+    With ``MEDIA_SERVE_MODE`` set to ``x-accel`` (nginx) or ``x-sendfile``
+    (Apache, lighttpd) the body, ranges and conditional requests are
+    handled by the proxy.
+    """
+    name = public_media_path(path)
+    if name is None or not default_storage.exists(name):
+        raise Http404("Media file not found.")
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if settings.MEDIA_SERVE_MODE in ("x-accel", "x-sendfile"):
+        response = offload_response(name, content_type)
+    else:
+        size = default_storage.size(name)
+        modified = default_storage.get_modified_time(name).timestamp()
+        etag = quote_etag(f"{int(modified):x}-{size:x}")
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(modified)
+        )
+        if response is None:
+            response = stream_response(
+                request, name, content_type, size, etag
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(modified)
+
+    response["Cache-Control"] = media_cache_control(name)
+    return response
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0005_train_image"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journey",
+            index=models.Index(fields=["departure_time"], name="journey_departure_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["order", "journey"], name="ticket_order_journey_idx"
+            ),
+        ),
+    ]
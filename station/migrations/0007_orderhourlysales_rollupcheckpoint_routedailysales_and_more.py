@@ -0,0 +1,119 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0006_journey_departure_idx_ticket_order_journey_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderHourlySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(unique=True)),
+                ("orders_count", models.PositiveIntegerField(default=0)),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "order hourly sales",
+                "ordering": ["-hour"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("last_id", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RouteDailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("departure_date", models.DateField()),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="station.route",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "route daily sales",
+                "ordering": ["-departure_date", "route"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("route", "departure_date"),
+                        name="unique_route_daily_sales",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TrainTypeDailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("departure_date", models.DateField()),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                (
+                    "train_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="station.traintype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "train type daily sales",
+                "ordering": ["-departure_date", "train_type"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("train_type", "departure_date"),
+                        name="unique_train_type_daily_sales",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:53
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0007_orderhourlysales_rollupcheckpoint_routedailysales_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedJourney",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_journeys",
+                        to="station.route",
+                    ),
+                ),
+                (
+                    "train",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_journeys",
+                        to="station.train",
+                    ),
+                ),
+                (
+                    "workers",
+                    models.ManyToManyField(
+                        related_name="archived_trips", to="station.crew"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["departure_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("cargo", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                (
+                    "journey",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tickets",
+                        to="station.archivedjourney",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tickets",
+                        to="station.order",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["cargo", "seat"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedjourney",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["departure_time"], name="archived_journey_departure"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-19 11:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0008_archivedjourney_archivedticket_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=64)),
+                ("file", models.FileField(upload_to="uploads/tickets/")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "order",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ticket_document",
+                        to="station.order",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:40
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.operations
+import django.contrib.postgres.fields.ranges
+import station.models
+from django.db import migrations, models
+
+
+# journeys listed in the error, the rest are counted
+REPORT_LIMIT = 50
+
+
+def report(title, rows):
+    lines = [f"{title} ({len(rows)}):"]
+    lines += [f"  {row}" for row in rows[:REPORT_LIMIT]]
+    if len(rows) > REPORT_LIMIT:
+        lines.append(f"  ... and {len(rows) - REPORT_LIMIT} more")
+    return lines
+
+
+def check_existing_journeys(apps, schema_editor):
+    """Fail with the journeys the constraints below would reject.
+
+    Journey.clean used to require arrival before departure, and nothing
+    stopped overlapping journeys of a train, so such rows may exist. They
+    have to be fixed by hand, the constraints cannot skip existing rows.
+    """
+    Journey = apps.get_model("station", "Journey")
+    table = schema_editor.quote_name(Journey._meta.db_table)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, departure_time, arrival_time FROM {table} "
+            "WHERE arrival_time <= departure_time ORDER BY id"
+        )
+        inverted = [
+            f"journey {pk}: departs {departure}, arrives {arrival}"
+            for pk, departure, arrival in cursor.fetchall()
+        ]
+        cursor.execute(
+            f"SELECT a.train_id, a.id, b.id FROM {table} a "
+            f"JOIN {table} b ON b.train_id = a.train_id AND b.id > a.id "
+            "AND b.departure_time < a.arrival_time "
+            "AND a.departure_time < b.arrival_time "
+            "WHERE a.arrival_time > a.departure_time "
+            "AND b.arrival_time > b.departure_time "
+            "ORDER BY a.train_id, a.id, b.id"
+        )
+        overlapping = [
+            f"train {train_id}: journeys {first} and {second}"
+            for train_id, first, second in cursor.fetchall()
+        ]
+
+    if inverted or overlapping:
+        lines = ["Fix these journeys before migrating:"]
+        if inverted:
+            lines += report("Arrival not after departure", inverted)
+        if overlapping:
+            lines += report("Overlapping journeys of a train", overlapping)
+        raise RuntimeError("\n".join(lines))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0011_journeyschedule_journey_schedule"),
+    ]
+
+    operations = [
+        # "=" on train_id inside a GiST index
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.RunPython(
+            check_existing_journeys, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="journey",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("arrival_time__gt", models.F("departure_time"))),
+                name="journey_arrival_after_departure",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="journey",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    (
+                        station.models.TsTzRange(
+                            "departure_time",
+                            "arrival_time",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(),
+                        ),
+                        "&&",
+                    ),
+                    ("train", "="),
+                ],
+                name="journey_train_no_overlap",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("station", "0012_journey_journey_arrival_after_departure_and_more"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddIndex(
+            model_name="crew",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("first_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="crew_first_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="crew",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="crew_last_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="station",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="station_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="train",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="train_name_trgm_idx",
+            ),
+        ),
+    ]
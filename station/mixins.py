@@ -0,0 +1,310 @@
+import hashlib
+import json
+from calendar import timegm
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from station.table_versions import get_versions, models_for_lookups
+from station.utils import params_to_names
+
+
+def requested_names(request, param):
+    """Names listed in a ``?fields=`` / ``?expand=`` query parameter"""
+    if request is None or request.method not in SAFE_METHODS:
+        return set()
+
+    return params_to_names(request.query_params.get(param, ""))
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin for ``?fields=`` and ``?expand=``.
+
+    ``expandable_fields`` maps a field name to ``(serializer_class,
+    kwargs)`` used in place of the default field when it is listed in
+    ``?expand=``. ``?fields=`` keeps only the listed (and expanded)
+    fields. Both apply to the top-level serializer of safe requests only.
+    """
+
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.root not in (self, self.parent):
+            return fields
+
+        request = self.context.get("request")
+        expand = requested_names(request, "expand") & set(
+            self.expandable_fields
+        )
+        for name in expand:
+            serializer_class, kwargs = self.expandable_fields[name]
+            fields[name] = serializer_class(read_only=True, **kwargs)
+
+        requested = requested_names(request, "fields")
+        if requested:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in requested | expand
+            }
+
+        return fields
+
+
+class DynamicFieldsViewMixin:
+    """Join and prefetch only the relations the response needs.
+
+    ``select_related_fields`` / ``prefetch_related_fields`` map an action
+    to ``{field: lookups}``; lookups are applied when the field is part
+    of the response, so ``?fields=`` trims the SQL along with the payload.
+    """
+
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    def wants_field(self, name):
+        expand = requested_names(self.request, "expand")
+        serializer_class = self.get_serializer_class()
+        if name in getattr(serializer_class, "expandable_fields", {}):
+            return name in expand
+
+        fields = requested_names(self.request, "fields")
+        return not fields or name in fields or name in expand
+
+    def select_fields_related(self, queryset):
+        for name, lookups in self.select_related_fields.get(
+            self.action, {}
+        ).items():
+            if self.wants_field(name):
+                queryset = queryset.select_related(*lookups)
+
+        for name, lookups in self.prefetch_related_fields.get(
+            self.action, {}
+        ).items():
+            if self.wants_field(name):
+                queryset = queryset.prefetch_related(*lookups)
+
+        return queryset
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified validators for list and detail responses.
+
+    ``last_modified_fields`` maps an action to the ``updated_at`` lookups
+    of every model its representation reads from. A detail gets both
+    validators from one ``COUNT`` / ``MAX`` aggregate over its row. A list
+    gets only an ETag, built from the versions of those models' tables
+    (see station.table_versions), so it costs no query and follows
+    deletions; ``Last-Modified`` could not. A matching ``If-None-Match`` /
+    ``If-Modified-Since`` gets 304 without serializing anything. Actions
+    opt in by wrapping their handler with ``conditional_response``.
+    """
+
+    last_modified_fields = {}
+    cache_control = {"public": True, "max_age": 0, "must_revalidate": True}
+
+    def get_conditional_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def get_etag(self, *parts):
+        # the representation also depends on the query string and format
+        etag = hashlib.md5(
+            "|".join(
+                [
+                    self.request.get_full_path(),
+                    str(self.request.accepted_media_type),
+                    *map(str, parts),
+                ]
+            ).encode()
+        ).hexdigest()
+
+        return quote_etag(etag)
+
+    def get_validators(self):
+        lookups = self.last_modified_fields.get(self.action)
+        if lookups is None:
+            return None, None
+
+        if self.action == "list":
+            models = models_for_lookups(self.queryset.model, lookups)
+            return self.get_etag(*get_versions(models)), None
+
+        aggregates = self.get_conditional_queryset().aggregate(
+            count=Count("pk"),
+            **{f"max_{index}": Max(lookup) for index, lookup in enumerate(
+                lookups
+            )},
+        )
+        count = aggregates.pop("count")
+        timestamps = [value for value in aggregates.values() if value]
+        if not count:
+            return None, None
+
+        last_modified = max(timestamps)
+        return (
+            self.get_etag(count, last_modified.isoformat()),
+            timegm(last_modified.utctimetuple()),
+        )
+
+    def add_validators(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, **self.cache_control)
+
+        return response
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return self.add_validators(not_modified, etag, last_modified)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.add_validators(response, etag, last_modified)
+
+        return response
+
+
+class FastListMixin:
+    """Serve the list action with ``fast_list_serializer_class``.
+
+    The filtered queryset is turned into ``values_list`` rows, so the
+    response skips model instances and DRF fields while keeping the JSON
+    shape of the regular list serializer.
+    """
+
+    fast_list_serializer_class = None
+
+    def use_fast_list(self):
+        # the values rows have a fixed shape, shaped output goes
+        # through the regular serializer
+        return self.fast_list_serializer_class is not None and not (
+            requested_names(self.request, "fields")
+            or requested_names(self.request, "expand")
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        serializer_class = self.fast_list_serializer_class
+        rows = serializer_class.get_rows(
+            self.filter_queryset(self.get_queryset())
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page).data)
+
+        return Response(serializer_class(rows).data)
+
+
+class IdempotentCreateMixin:
+    """Make create requests safe to retry with an ``Idempotency-Key`` header.
+
+    The first successful response is stored in the cache per user and key
+    for ``IDEMPOTENCY_KEY_TTL`` seconds and replayed on retries without
+    running the create again. A cache lock makes concurrent duplicates
+    fail fast with 409 instead of doing the work twice.
+    """
+
+    idempotency_header = "Idempotency-Key"
+    idempotency_lock_ttl = 30
+
+    def get_idempotency_cache_key(self, request, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        basename = getattr(self, "basename", self.__class__.__name__)
+
+        return f"idempotency:{basename}:{request.user.pk}:{digest}"
+
+    @staticmethod
+    def get_request_fingerprint(request):
+        payload = json.dumps(request.data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def replay_response(self, stored, fingerprint):
+        if stored["fingerprint"] != fingerprint:
+            return Response(
+                {
+                    "detail": f"{self.idempotency_header} was already used "
+                    f"with a different payload."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        return Response(
+            stored["data"],
+            status=stored["status"],
+            headers={**stored["headers"], "Idempotent-Replayed": "true"},
+        )
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        cache_key = self.get_idempotency_cache_key(request, key)
+        fingerprint = self.get_request_fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return self.replay_response(stored, fingerprint)
+
+        lock_key = f"{cache_key}:lock"
+        if not cache.add(lock_key, fingerprint, self.idempotency_lock_ttl):
+            return Response(
+                {
+                    "detail": f"A request with this {self.idempotency_header} "
+                    f"is already in progress."
+                },
+                status=status.HTTP_409_CONFLICT,
+                headers={"Retry-After": "1"},
+            )
+
+        try:
+            # the first request may have finished right before the lock
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return self.replay_response(stored, fingerprint)
+
+            response = super().create(request, *args, **kwargs)
+
+            if status.is_success(response.status_code):
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": json.loads(
+                            JSONRenderer().render(response.data)
+                        ),
+                        "headers": {
+                            name: response[name]
+                            for name in ("Location",)
+                            if response.has_header(name)
+                        },
+                    },
+                    settings.IDEMPOTENCY_KEY_TTL,
+                )
+
+            return response
+        finally:
+            cache.delete(lock_key)
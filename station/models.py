@@ -1,12 +1,27 @@
 from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce, Upper
 
 from django.core.exceptions import ValidationError
 
 from station.utils import image_file_path
 
 
+def trigram_index(field, name):
+    """GIN index serving ``icontains`` (admin search) on ``field``"""
+    return GinIndex(
+        OpClass(Upper(field), name="gin_trgm_ops"), name=name
+    )
+
+
 class Crew(models.Model):
     first_name = models.CharField(max_length=250)
     last_name = models.CharField(max_length=250)
@@ -17,6 +32,10 @@ class Crew(models.Model):
 
     class Meta:
         verbose_name_plural = "workers"
+        indexes = [
+            trigram_index("first_name", "crew_first_name_trgm_idx"),
+            trigram_index("last_name", "crew_last_name_trgm_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -30,8 +49,10 @@ class Station(models.Model):
     longitude = models.FloatField(
         validators=[MinValueValidator(-180), MaxValueValidator(180)]
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
+        indexes = [trigram_index("name", "station_name_trgm_idx")]
         constraints = [
             models.UniqueConstraint(
                 fields=["name", "latitude", "longitude"],
@@ -45,6 +66,7 @@ class Station(models.Model):
 
 class TrainType(models.Model):
     name = models.CharField(max_length=250, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"TrainType: {self.name}"
@@ -55,11 +77,22 @@ class Order(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name="orders"
+        related_name="orders",
+        # led by order_user_created_idx
+        db_index=False,
     )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # a user's orders, newest first, without a sort
+            models.Index(
+                fields=["user", "-created_at"], name="order_user_created_idx"
+            ),
+            # the admin date hierarchy reads MIN/MAX(created_at) and ranges
+            # of it, an ordered index answers both without a scan
+            models.Index(fields=["created_at"], name="order_created_idx"),
+        ]
 
     def __str__(self):
         return f"Order, created_at: {self.created_at}, user: {self.user}"
@@ -73,12 +106,14 @@ class Train(models.Model):
         TrainType, on_delete=models.CASCADE, related_name="train_types"
     )
     image = models.ImageField(null=True, upload_to=image_file_path)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     @property
     def folder(self):
         return "uploads/train_images/"
 
     class Meta:
+        indexes = [trigram_index("name", "train_name_trgm_idx")]
         constraints = [
             models.UniqueConstraint(
                 fields=["name", "train_type"], name="unique_train_constraint"
@@ -97,6 +132,7 @@ class Route(models.Model):
         Station, on_delete=models.CASCADE, related_name="destination_routes"
     )
     distance = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         constraints = [
@@ -110,35 +146,152 @@ class Route(models.Model):
         return f"Route, source: {self.source}, destination: {self.destination}"
 
 
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+def journey_period():
+    """[departure_time, arrival_time) as a tstzrange.
+
+    Queries have to build the range exactly like the exclusion
+    constraint does for PostgreSQL to use its GiST index.
+    """
+    return TsTzRange("departure_time", "arrival_time", RangeBoundary())
+
+
+class JourneyQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        """Journeys running at some point of [start, end)"""
+        return self.alias(period=journey_period()).filter(
+            period__overlap=(start, end)
+        )
+
+    def with_workers_count(self):
+        """``count_workers`` as a correlated subquery. A GROUP BY over the
+        crew join aggregates and sorts every journey before a page is cut,
+        the subquery lets the departure_time index feed the page."""
+        counts = (
+            Journey.workers.through.objects.filter(
+                journey_id=models.OuterRef("pk")
+            )
+            .order_by()
+            .values("journey_id")
+            .annotate(count=models.Count("*"))
+            .values("count")
+        )
+
+        return self.annotate(
+            count_workers=Coalesce(models.Subquery(counts), 0)
+        )
+
+
+class JourneySchedule(models.Model):
+    """Timetable template expanded into journeys on the matching days.
+
+    Offsets are counted from midnight of each service day, so an overnight
+    train has an ``arrival_offset`` above 24 hours. ``weekdays`` is a
+    bitmask with Monday as bit 0.
+    """
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="schedules"
+    )
+    train = models.ForeignKey(
+        Train, on_delete=models.CASCADE, related_name="schedules"
+    )
+    workers = models.ManyToManyField(
+        Crew, related_name="schedules", blank=True
+    )
+    departure_offset = models.DurationField()
+    arrival_offset = models.DurationField()
+    weekdays = models.PositiveSmallIntegerField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return (
+            f"JourneySchedule, route: {self.route}, train: {self.train}, "
+            f"{self.start_date} - {self.end_date}"
+        )
+
+
 class Journey(models.Model):
+    # both foreign keys lead a (key, departure_time) index
     route = models.ForeignKey(
         Route,
         on_delete=models.CASCADE,
-        related_name="journeys"
+        related_name="journeys",
+        db_index=False,
     )
     train = models.ForeignKey(
         Train,
         on_delete=models.CASCADE,
-        related_name="journeys"
+        related_name="journeys",
+        db_index=False,
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     workers = models.ManyToManyField(Crew, related_name="trips")
+    schedule = models.ForeignKey(
+        JourneySchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="journeys",
+    )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = JourneyQuerySet.as_manager()
 
     class Meta:
         ordering = ["departure_time"]
+        indexes = [
+            models.Index(
+                fields=["departure_time"], name="journey_departure_idx"
+            ),
+            # ?route= / ?train= lists and searches, in departure order
+            models.Index(
+                fields=["route", "departure_time"],
+                name="journey_route_departure_idx",
+            ),
+            models.Index(
+                fields=["train", "departure_time"],
+                name="journey_train_departure_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["departure_time", "arrival_time", "route"],
                 name="unique_journey_constraint",
-            )
+            ),
+            models.CheckConstraint(
+                condition=models.Q(
+                    arrival_time__gt=models.F("departure_time")
+                ),
+                name="journey_arrival_after_departure",
+            ),
+            # the GiST index behind it also serves overlapping() lookups
+            # on the period alone, e.g. crew availability
+            ExclusionConstraint(
+                name="journey_train_no_overlap",
+                expressions=[
+                    (journey_period(), RangeOperators.OVERLAPS),
+                    ("train", RangeOperators.EQUAL),
+                ],
+                index_type="GIST",
+            ),
         ]
 
     def clean(self):
         super().clean()
-        if self.departure_time < self.arrival_time:
+        if self.departure_time >= self.arrival_time:
             raise ValidationError(
-                "Departure time must be greater than arrival time."
+                "Arrival time must be later than departure time."
             )
 
     def __str__(self):
@@ -200,3 +353,241 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ["journey", "cargo", "seat"]
         ordering = ["cargo", "seat"]
+        indexes = [
+            # covers the order -> ticket -> journey path of user trips
+            models.Index(
+                fields=["order", "journey"], name="ticket_order_journey_idx"
+            ),
+        ]
+
+
+class SeatHold(models.Model):
+    """Seat reserved for a user until ``expires_at``.
+
+    Seats held together share a ``token``. An expired hold no longer
+    blocks its seat; it is deleted by the next hold of that seat or by the
+    ``release_expired_holds`` beat task.
+    """
+
+    token = models.UUIDField(db_index=True)
+    journey = models.ForeignKey(
+        Journey,
+        on_delete=models.CASCADE,
+        related_name="holds",
+        # led by unique_seat_hold
+        db_index=False,
+    )
+    cargo = models.IntegerField()
+    seat = models.IntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["cargo", "seat"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["journey", "cargo", "seat"], name="unique_seat_hold"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="seat_hold_expires_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"Seat hold, journey: {self.journey_id}, "
+            f"until: {self.expires_at}"
+        )
+
+
+class QueuedOrder(models.Model):
+    """Order accepted by the API and placed later by its shard consumer.
+
+    ``payload`` is the order request as received; ``order`` is set once
+    it is placed, ``errors`` when it is rejected.
+    """
+
+    PENDING = "pending"
+    COMPLETED = "completed"
+    REJECTED = "rejected"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (COMPLETED, "Completed"),
+        (REJECTED, "Rejected"),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="queued_orders",
+    )
+    shard = models.PositiveSmallIntegerField()
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="queued_order",
+    )
+    errors = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # the backlog of a shard, oldest first
+            models.Index(
+                fields=["shard", "id"],
+                condition=models.Q(status="pending"),
+                name="queued_order_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Queued order {self.id}, {self.status}, user: {self.user_id}"
+
+
+class RouteDailySales(models.Model):
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    departure_date = models.DateField()
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "route daily sales"
+        ordering = ["-departure_date", "route"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["route", "departure_date"],
+                name="unique_route_daily_sales",
+            )
+        ]
+
+    def __str__(self):
+        return f"Sales, route: {self.route_id}, date: {self.departure_date}"
+
+
+class TrainTypeDailySales(models.Model):
+    train_type = models.ForeignKey(
+        TrainType, on_delete=models.CASCADE, related_name="daily_sales"
+    )
+    departure_date = models.DateField()
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "train type daily sales"
+        ordering = ["-departure_date", "train_type"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["train_type", "departure_date"],
+                name="unique_train_type_daily_sales",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"Sales, train type: {self.train_type_id}, "
+            f"date: {self.departure_date}"
+        )
+
+
+class OrderHourlySales(models.Model):
+    hour = models.DateTimeField(unique=True)
+    orders_count = models.PositiveIntegerField(default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "order hourly sales"
+        ordering = ["-hour"]
+
+    def __str__(self):
+        return f"Sales, hour: {self.hour}"
+
+
+class RollupCheckpoint(models.Model):
+    """High-water mark of the last row folded into the sales rollups"""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Checkpoint {self.name}: {self.last_id}"
+
+
+class ArchivedJourney(models.Model):
+    """Completed journey moved out of the hot Journey table.
+
+    Keeps the original journey id, so tickets and clients referencing it
+    stay valid.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="archived_journeys"
+    )
+    train = models.ForeignKey(
+        Train, on_delete=models.CASCADE, related_name="archived_journeys"
+    )
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    workers = models.ManyToManyField(Crew, related_name="archived_trips")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["departure_time"]
+        indexes = [
+            BrinIndex(
+                fields=["departure_time"],
+                name="archived_journey_departure",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived journey, route: {self.route}, train: {self.train}"
+
+
+class ArchivedTicket(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    cargo = models.IntegerField()
+    seat = models.IntegerField()
+    journey = models.ForeignKey(
+        ArchivedJourney, on_delete=models.CASCADE, related_name="tickets"
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+
+    class Meta:
+        ordering = ["cargo", "seat"]
+
+    def __str__(self):
+        return f"Archived ticket, journey: {self.journey_id}"
+
+
+class TicketDocument(models.Model):
+    """Pre-rendered PDF with every ticket of an order.
+
+    ``fingerprint`` is a keyed hash of the ticket data printed on the
+    document and doubles as its file name, so the file is only rendered
+    again when one of the tickets changes.
+    """
+
+    order = models.OneToOneField(
+        Order, on_delete=models.CASCADE, related_name="ticket_document"
+    )
+    fingerprint = models.CharField(max_length=64)
+    file = models.FileField(upload_to="uploads/tickets/")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Ticket document, order: {self.order_id}"
@@ -0,0 +1,97 @@
+"""Accept-then-process orders for ticket drops.
+
+The API only checks the shape of an order and stores it as a pending
+``QueuedOrder`` in the shard of its journey. Celery messages on the
+``orders.<shard>`` queues just wake the consumer of a shard, which places
+the pending orders in arrival order, a batch per transaction with a
+savepoint per order. An advisory lock per shard keeps a single consumer
+at work on it, so extra messages or workers never reorder a shard.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from station.models import QueuedOrder
+from station.serializers import OrderSerializer
+
+
+# first key of the (namespace, shard) advisory locks
+SHARD_LOCK_NAMESPACE = 5001
+
+
+def shard_for(tickets):
+    """Shard of an order, by its first journey; tickets of other journeys
+    are still guarded by the unique seat constraint"""
+    journey_id = min(ticket["journey"] for ticket in tickets)
+    return journey_id % settings.ORDER_QUEUE_SHARDS
+
+
+def queue_name(shard):
+    return f"orders.{shard}"
+
+
+def pending_shards():
+    return sorted(
+        QueuedOrder.objects.filter(status=QueuedOrder.PENDING)
+        .order_by()
+        .values_list("shard", flat=True)
+        .distinct()
+    )
+
+
+def place_order(queued):
+    serializer = OrderSerializer(data=queued.payload)
+    try:
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            queued.order = serializer.save(user=queued.user)
+            queued.status = QueuedOrder.COMPLETED
+    except ValidationError as error:
+        queued.status = QueuedOrder.REJECTED
+        queued.errors = error.detail
+    except (IntegrityError, DjangoValidationError):
+        # an order of another shard took a seat of this one after it was
+        # validated, Ticket.full_clean or the unique constraint catches it
+        queued.status = QueuedOrder.REJECTED
+        queued.errors = {"tickets": ["Seats were sold to another order."]}
+
+    queued.processed_at = timezone.now()
+
+
+def process_batch(shard, batch_size):
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [SHARD_LOCK_NAMESPACE, shard],
+            )
+
+        batch = list(
+            QueuedOrder.objects.filter(shard=shard, status=QueuedOrder.PENDING)
+            .select_related("user")
+            .order_by("id")[:batch_size]
+        )
+        for queued in batch:
+            place_order(queued)
+
+        QueuedOrder.objects.bulk_update(
+            batch, ["status", "order", "errors", "processed_at"]
+        )
+
+    return len(batch)
+
+
+def process_shard(shard, batch_size=None):
+    """Place the pending orders of ``shard``, oldest first, until none are
+    left. Returns how many were processed."""
+    batch_size = batch_size or settings.ORDER_QUEUE_BATCH_SIZE
+    processed = 0
+
+    while True:
+        count = process_batch(shard, batch_size)
+        processed += count
+        if count < batch_size:
+            return processed
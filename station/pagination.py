@@ -1,7 +1,115 @@
-from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+
+
+def estimated_count(queryset):
+    """Row count estimated by the PostgreSQL planner, None elsewhere.
+
+    Unfiltered querysets read ``pg_class.reltuples``, filtered ones the
+    top-level row estimate of ``EXPLAIN``. Neither touches the rows.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    if not queryset.query.where and not queryset.query.distinct:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 until the table has been vacuumed or analyzed once
+        if row and row[0] >= 0:
+            return int(row[0])
+
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator for huge tables: counts exactly only below
+    ``exact_count_threshold`` planner-estimated rows"""
+
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+
+        return estimate
 
 
 class StationLimitOffsetPagination(LimitOffsetPagination):
     default_limit = 5
     max_limit = 25
 
+
+class EstimatedCountLimitOffsetPagination(StationLimitOffsetPagination):
+    """Limit/offset pagination that avoids exact ``COUNT(*)`` on big results.
+
+    Below ``cache_count_above`` estimated rows the count is exact. Up to
+    ``estimate_count_above`` the exact count is cached for
+    ``PAGINATION_COUNT_CACHE_TTL`` seconds per query, above it the
+    planner estimate is returned. ``count_exact`` in the response tells
+    which one the client got.
+    """
+
+    cache_count_above = 1000
+    estimate_count_above = 100000
+
+    def get_count_cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.sha256(f"{sql}|{params!r}".encode()).hexdigest()
+
+        return f"pagination-count:{digest}"
+
+    def get_count(self, queryset):
+        self.count_exact = True
+        estimate = estimated_count(queryset)
+
+        if estimate is None or estimate < self.cache_count_above:
+            return super().get_count(queryset)
+
+        if estimate >= self.estimate_count_above:
+            self.count_exact = False
+            return estimate
+
+        key = self.get_count_cache_key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = super().get_count(queryset)
+            cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TTL)
+
+        return count
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_exact": self.count_exact,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_exact"] = {
+            "type": "boolean",
+            "example": True,
+        }
+        response_schema["required"].append("count_exact")
+
+        return response_schema
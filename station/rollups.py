@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from station.models import (
+    Order,
+    OrderHourlySales,
+    RollupCheckpoint,
+    RouteDailySales,
+    Ticket,
+    TrainTypeDailySales,
+)
+
+
+def increment(model, counters, **keys):
+    """Add ``counters`` to the rollup row identified by ``keys``"""
+    updated = model.objects.filter(**keys).update(
+        **{name: F(name) + value for name, value in counters.items()}
+    )
+    if not updated:
+        model.objects.create(**keys, **counters)
+
+
+def next_batch(queryset, last_id, batch_size):
+    """Id range (last_id, upper_id] of the next batch, or None"""
+    ids = queryset.filter(id__gt=last_id).order_by("id").values_list(
+        "id", flat=True
+    )[:batch_size]
+    ids = list(ids)
+
+    return ids[-1] if ids else None
+
+
+def fold_tickets(checkpoint, cutoff, batch_size):
+    tickets = Ticket.objects.filter(order__created_at__lt=cutoff)
+    upper_id = next_batch(tickets, checkpoint.last_id, batch_size)
+    if upper_id is None:
+        return 0
+
+    batch = tickets.filter(id__gt=checkpoint.last_id, id__lte=upper_id)
+
+    for row in batch.values(
+        route_id=F("journey__route_id"),
+        departure_date=TruncDate("journey__departure_time"),
+    ).annotate(tickets=Count("id")).order_by():
+        increment(
+            RouteDailySales,
+            {"tickets_sold": row["tickets"]},
+            route_id=row["route_id"],
+            departure_date=row["departure_date"],
+        )
+
+    for row in batch.values(
+        train_type_id=F("journey__train__train_type_id"),
+        departure_date=TruncDate("journey__departure_time"),
+    ).annotate(tickets=Count("id")).order_by():
+        increment(
+            TrainTypeDailySales,
+            {"tickets_sold": row["tickets"]},
+            train_type_id=row["train_type_id"],
+            departure_date=row["departure_date"],
+        )
+
+    for row in batch.values(hour=TruncHour("order__created_at")).annotate(
+        tickets=Count("id")
+    ).order_by():
+        increment(
+            OrderHourlySales,
+            {"tickets_sold": row["tickets"]},
+            hour=row["hour"],
+        )
+
+    folded = batch.count()
+    checkpoint.last_id = upper_id
+    checkpoint.save(update_fields=["last_id"])
+
+    return folded
+
+
+def fold_orders(checkpoint, cutoff, batch_size):
+    orders = Order.objects.filter(created_at__lt=cutoff)
+    upper_id = next_batch(orders, checkpoint.last_id, batch_size)
+    if upper_id is None:
+        return 0
+
+    batch = orders.filter(id__gt=checkpoint.last_id, id__lte=upper_id)
+
+    for row in batch.values(hour=TruncHour("created_at")).annotate(
+        orders=Count("id")
+    ).order_by():
+        increment(
+            OrderHourlySales, {"orders_count": row["orders"]}, hour=row["hour"]
+        )
+
+    folded = batch.count()
+    checkpoint.last_id = upper_id
+    checkpoint.save(update_fields=["last_id"])
+
+    return folded
+
+
+def update_sales_rollups(batch_size=None):
+    """Fold tickets and orders created since the last run into the rollups.
+
+    Rows newer than ``SALES_ROLLUP_LAG`` seconds are left for the next run,
+    so transactions still in flight do not end up behind the high-water
+    mark. Returns the number of tickets and orders folded.
+    """
+    batch_size = batch_size or settings.SALES_ROLLUP_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(seconds=settings.SALES_ROLLUP_LAG)
+    folded = {}
+
+    for name, fold in [("tickets", fold_tickets), ("orders", fold_orders)]:
+        RollupCheckpoint.objects.get_or_create(name=name)
+        folded[name] = 0
+
+        while True:
+            # one transaction per batch keeps row locks short
+            with transaction.atomic():
+                checkpoint = RollupCheckpoint.objects.select_for_update().get(
+                    name=name
+                )
+                batch = fold(checkpoint, cutoff, batch_size)
+
+            folded[name] += batch
+            if batch < batch_size:
+                break
+
+    return folded
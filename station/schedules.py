@@ -0,0 +1,119 @@
+from bisect import bisect_left
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from station.journey_search import invalidate_journeys_on_commit
+from station.models import Journey
+from station.table_versions import bump_versions_on_commit
+
+
+MAX_SCHEDULE_DAYS = 366
+
+
+def weekdays_to_mask(weekdays):
+    return sum(1 << weekday for weekday in set(weekdays))
+
+
+def mask_to_weekdays(mask):
+    return [weekday for weekday in range(7) if mask & (1 << weekday)]
+
+
+def expand_schedule(schedule):
+    """(departure_time, arrival_time) of every journey of the schedule"""
+    tz = timezone.get_current_timezone()
+    slots = []
+
+    day = schedule.start_date
+    while day <= schedule.end_date:
+        if schedule.weekdays & (1 << day.weekday()):
+            midnight = timezone.make_aware(datetime.combine(day, time()), tz)
+            slots.append(
+                (
+                    midnight + schedule.departure_offset,
+                    midnight + schedule.arrival_offset,
+                )
+            )
+        day += timedelta(days=1)
+
+    return slots
+
+
+def find_conflicts(schedule, slots, worker_ids=()):
+    """Slots overlapping another journey of the train or the crew (or the
+    previous slot) or duplicating one on the route, from one query over
+    the whole schedule window"""
+    if not slots:
+        return []
+
+    existing = (
+        Journey.objects.overlapping(slots[0][0], slots[-1][1])
+        .filter(
+            Q(train_id=schedule.train_id)
+            | Q(route_id=schedule.route_id)
+            | Q(workers__in=worker_ids)
+        )
+        .values_list(
+            "train_id", "route_id", "workers", "departure_time", "arrival_time"
+        )
+    )
+    busy = set()
+    route_journeys = set()
+    for train_id, route_id, crew_id, departure, arrival in existing:
+        if train_id == schedule.train_id or crew_id in worker_ids:
+            busy.add((departure, arrival))
+        if route_id == schedule.route_id:
+            route_journeys.add((departure, arrival))
+
+    busy = sorted(busy)
+    departures = [departure for departure, _ in busy]
+    # only journeys departing less than the longest one before a slot
+    # can still be running when it starts
+    longest = max(
+        (arrival - departure for departure, arrival in busy),
+        default=timedelta(),
+    )
+
+    conflicts = []
+    previous_arrival = None
+    for departure, arrival in slots:
+        start = bisect_left(departures, departure - longest)
+        end = bisect_left(departures, arrival)
+        if (
+            (departure, arrival) in route_journeys
+            or (previous_arrival and previous_arrival > departure)
+            or any(
+                other_arrival > departure
+                for _, other_arrival in busy[start:end]
+            )
+        ):
+            conflicts.append((departure, arrival))
+        previous_arrival = arrival
+
+    return conflicts
+
+
+def create_schedule_journeys(schedule, slots, worker_ids):
+    """Insert the journeys and their crew with two bulk inserts"""
+    journeys = Journey.objects.bulk_create(
+        Journey(
+            route=schedule.route,
+            train_id=schedule.train_id,
+            schedule=schedule,
+            departure_time=departure,
+            arrival_time=arrival,
+        )
+        for departure, arrival in slots
+    )
+
+    Journey.workers.through.objects.bulk_create(
+        Journey.workers.through(journey_id=journey.id, crew_id=crew_id)
+        for journey in journeys
+        for crew_id in worker_ids
+    )
+    # bulk inserts send no post_save
+    invalidate_journeys_on_commit(journeys)
+    bump_versions_on_commit(Journey)
+
+    return journeys
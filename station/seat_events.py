@@ -0,0 +1,305 @@
+import asyncio
+import json
+import re
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import cached_property, lru_cache
+
+import redis
+import redis.asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.http import Http404, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from station.models import Journey, Ticket
+
+
+CHANNEL_PREFIX = "seats:journey:"
+STREAM_PATH = re.compile(r"^/api/stations/journeys/(\d+)/seats/stream/$")
+STREAM_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    # nginx would buffer the stream otherwise
+    (b"x-accel-buffering", b"no"),
+]
+# replaces the queue of a subscriber that fell behind, it gets a new
+# snapshot instead of the deltas it missed
+RESYNC = object()
+
+
+class Subscription:
+    def __init__(self, journey_id):
+        self.journey_id = journey_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=settings.SEAT_EVENTS_QUEUE_SIZE)
+
+    def deliver(self, message):
+        """Runs on the loop of the subscriber"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class InMemorySeatBroker:
+    """Fans seat events out to the subscribers of this process.
+
+    Enough for a single ASGI process and for tests. Publishing is thread
+    safe, subscribers are woken on their own event loop.
+    """
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, journey_id):
+        subscription = Subscription(journey_id)
+        with self.lock:
+            first = not self.subscriptions[journey_id]
+            self.subscriptions[journey_id].add(subscription)
+        if first:
+            await self.on_first_subscriber(journey_id)
+
+        try:
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscriptions[journey_id].discard(subscription)
+                last = not self.subscriptions[journey_id]
+                if last:
+                    del self.subscriptions[journey_id]
+            if last:
+                await self.on_last_subscriber(journey_id)
+
+    async def on_first_subscriber(self, journey_id):
+        pass
+
+    async def on_last_subscriber(self, journey_id):
+        pass
+
+    def dispatch(self, journey_id, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(journey_id, ()))
+
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(
+                subscription.deliver, message
+            )
+
+    def publish(self, journey_id, message):
+        self.dispatch(journey_id, message)
+
+
+class RedisSeatBroker(InMemorySeatBroker):
+    """Seat events through Redis pub/sub, for several server processes.
+
+    Every process holds one pub/sub connection subscribed to the journeys
+    its clients watch and fans messages out locally, so idle subscribers
+    cost a queue each, not a Redis connection.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.pubsub = None
+        self.reader = None
+
+    @cached_property
+    def client(self):
+        return redis.Redis.from_url(self.url)
+
+    async def on_first_subscriber(self, journey_id):
+        if self.pubsub is None:
+            self.pubsub = redis.asyncio.Redis.from_url(self.url).pubsub()
+
+        await self.pubsub.subscribe(f"{CHANNEL_PREFIX}{journey_id}")
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self.read())
+
+    async def on_last_subscriber(self, journey_id):
+        await self.pubsub.unsubscribe(f"{CHANNEL_PREFIX}{journey_id}")
+
+    async def read(self):
+        while self.pubsub.subscribed:
+            message = await self.pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=1.0
+            )
+            if message is None:
+                continue
+
+            journey_id = int(
+                message["channel"].decode().removeprefix(CHANNEL_PREFIX)
+            )
+            self.dispatch(journey_id, json.loads(message["data"]))
+
+    def publish(self, journey_id, message):
+        self.client.publish(
+            f"{CHANNEL_PREFIX}{journey_id}", json.dumps(message)
+        )
+
+
+@lru_cache(maxsize=None)
+def get_seat_broker():
+    if settings.SEAT_EVENTS_BROKER == "redis":
+        return RedisSeatBroker(settings.SEAT_EVENTS_REDIS_URL)
+
+    return InMemorySeatBroker()
+
+
+def publish_seats_on_commit(seats, kind):
+    """Announce ``(journey_id, cargo, seat)`` triples as ``sold`` or
+    ``released`` once the current transaction commits"""
+    by_journey = defaultdict(list)
+    for journey_id, cargo, seat in seats:
+        by_journey[journey_id].append([cargo, seat])
+
+    def publish():
+        broker = get_seat_broker()
+        for journey_id, journey_seats in by_journey.items():
+            broker.publish(
+                journey_id,
+                {"journey": journey_id, "event": kind, "seats": journey_seats},
+            )
+
+    if by_journey:
+        transaction.on_commit(publish, robust=True)
+
+
+def taken_seats(journey_id):
+    """Taken ``[cargo, seat]`` pairs, None for an unknown journey.
+
+    Runs on a shared executor thread that gives its connection back, so
+    idle streams do not hold a thread and a database connection each.
+    """
+    try:
+        if not Journey.objects.filter(pk=journey_id).exists():
+            return None
+
+        return [
+            list(seat)
+            for seat in Ticket.objects.filter(journey_id=journey_id)
+            .order_by("cargo", "seat")
+            .values_list("cargo", "seat")
+        ]
+    finally:
+        connections.close_all()
+
+
+load_taken_seats = sync_to_async(taken_seats, thread_sensitive=False)
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def seat_event_stream(journey_id, broker=None):
+    """Server-sent events: a ``snapshot`` of taken seats, then ``sold`` and
+    ``released`` deltas, with heartbeat comments in between"""
+    broker = broker or get_seat_broker()
+
+    # subscribed before the snapshot is read, so no sale falls in between
+    async with broker.subscribe(journey_id) as subscription:
+        message = RESYNC
+        while True:
+            if message is RESYNC:
+                seats = await load_taken_seats(journey_id)
+                yield format_event(
+                    "snapshot", {"journey": journey_id, "seats": seats}
+                )
+            elif message is not None:
+                yield format_event(message["event"], message)
+
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), settings.SEAT_EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                message = None
+                yield ": ping\n\n"
+
+
+@require_GET
+async def journey_seats_stream(request, pk):
+    """Live seat availability of a journey (text/event-stream).
+
+    Under ASGI the path is served by ``seat_stream_application`` before
+    Django's request cycle, which would keep a thread per open stream.
+    This view serves it under WSGI, e.g. runserver.
+    """
+    if await load_taken_seats(pk) is None:
+        raise Http404("Journey not found.")
+
+    response = StreamingHttpResponse(seat_event_stream(pk))
+    for name, value in STREAM_HEADERS:
+        response[name.decode()] = value.decode()
+
+    return response
+
+
+async def stream_journey_seats(journey_id, receive, send):
+    if await load_taken_seats(journey_id) is None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 404,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"Not Found"})
+        return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": STREAM_HEADERS,
+        }
+    )
+
+    async def pump():
+        async for event in seat_event_stream(journey_id):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": event.encode(),
+                    "more_body": True,
+                }
+            )
+
+    async def wait_for_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = {
+        asyncio.create_task(pump()),
+        asyncio.create_task(wait_for_disconnect()),
+    }
+    # the client left, or sending failed because it did
+    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def seat_stream_application(django_application):
+    """ASGI app answering seat streams itself, everything else goes to
+    ``django_application``. An idle stream costs one queue and no thread
+    or database connection."""
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            match = STREAM_PATH.match(scope["path"])
+            if match:
+                return await stream_journey_seats(
+                    int(match[1]), receive, send
+                )
+
+        return await django_application(scope, receive, send)
+
+    return application
@@ -1,9 +1,33 @@
-from django.db import transaction
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from station.batch import BATCH_PREFIX
+from station.distances import route_distance_km
+from station.holds import claim_seats, hold_seats, release_hold
+from station.journey_search import (
+    AVAILABLE,
+    FEW_SEATS,
+    SOLD_OUT,
+    invalidate_on_seat_change,
+)
+from station.mixins import DynamicFieldsMixin
+from station.seat_events import publish_seats_on_commit
+from station.schedules import (
+    MAX_SCHEDULE_DAYS,
+    create_schedule_journeys,
+    expand_schedule,
+    find_conflicts,
+    mask_to_weekdays,
+    weekdays_to_mask,
+)
 from station.models import (
     Crew,
     Train,
@@ -11,24 +35,29 @@ from station.models import (
     Station,
     Route,
     Journey,
+    JourneySchedule,
     Ticket,
     Order,
+    QueuedOrder,
+    RouteDailySales,
+    TrainTypeDailySales,
+    OrderHourlySales,
 )
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name")
 
 
-class TrainTypeSerializer(serializers.ModelSerializer):
+class TrainTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TrainType
         fields = ("id", "name")
 
 
-class TrainSerializer(serializers.ModelSerializer):
+class TrainSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     train_type = serializers.CharField(source="train_type.name")
 
     class Meta:
@@ -58,8 +87,9 @@ class JourneyTrainSerializer(serializers.ModelSerializer):
         )
 
 
-class TrainCreateSerializer(serializers.ModelSerializer):
+class TrainCreateSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     journeys = serializers.SerializerMethodField()
+    expandable_fields = {"train_type": (TrainTypeSerializer, {})}
 
     class Meta:
         model = Train
@@ -73,12 +103,25 @@ class TrainCreateSerializer(serializers.ModelSerializer):
         )
 
     def get_journeys(self, obj):
+        if hasattr(obj, "last_journeys"):
+            return JourneyTrainSerializer(obj.last_journeys, many=True).data
+
         last_five_journeys = obj.journeys.select_related(
             "route__source", "route__destination"
         ).order_by("-id")[:5]
         return JourneyTrainSerializer(last_five_journeys, many=True).data
 
 
+class TrainJourneysSerializer(TrainSerializer):
+    journeys = JourneyTrainSerializer(
+        source="last_journeys", many=True, read_only=True
+    )
+
+    class Meta:
+        model = Train
+        fields = TrainSerializer.Meta.fields + ("journeys",)
+
+
 class TrainImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Train
@@ -91,13 +134,13 @@ class TrainJourneySerializer(TrainSerializer):
         fields = ("name", "train_type")
 
 
-class StationSerializer(serializers.ModelSerializer):
+class StationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Station
         fields = ("id", "name", "latitude", "longitude")
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     source = serializers.CharField(source="source.name")
     destination = serializers.CharField(source="destination.name")
 
@@ -113,13 +156,31 @@ class RouteCreateSerializer(RouteSerializer):
     destination = serializers.SlugRelatedField(
         queryset=Station.objects.all(), slug_field="name"
     )
+    distance = serializers.IntegerField(
+        required=False,
+        help_text="Defaults to the great-circle distance of the stations",
+    )
 
+    def to_internal_value(self, data):
+        # before the validators, the unique constraint includes distance
+        attrs = super().to_internal_value(data)
+        if "distance" not in attrs:
+            attrs["distance"] = route_distance_km(
+                attrs["source"], attrs["destination"]
+            )
+
+        return attrs
 
-class JourneyListSerializer(serializers.ModelSerializer):
+
+class JourneyListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     departure_place = serializers.CharField(source="route.source.name")
     arrival_place = serializers.CharField(source="route.destination.name")
     train = TrainJourneySerializer()
     count_workers = serializers.IntegerField()
+    expandable_fields = {
+        "route": (RouteSerializer, {}),
+        "workers": (CrewSerializer, {"many": True}),
+    }
 
     class Meta:
         model = Journey
@@ -134,6 +195,29 @@ class JourneyListSerializer(serializers.ModelSerializer):
         )
 
 
+class JourneySearchSerializer(serializers.ModelSerializer):
+    """Shape of the cached /journeys/search/ rows (see journey_search)"""
+
+    departure_place = serializers.CharField(source="route.source.name")
+    arrival_place = serializers.CharField(source="route.destination.name")
+    train = TrainJourneySerializer()
+    availability = serializers.ChoiceField(
+        choices=(AVAILABLE, FEW_SEATS, SOLD_OUT)
+    )
+
+    class Meta:
+        model = Journey
+        fields = (
+            "id",
+            "departure_place",
+            "arrival_place",
+            "train",
+            "departure_time",
+            "arrival_time",
+            "availability",
+        )
+
+
 class JourneyCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Journey
@@ -176,10 +260,42 @@ class JourneyCreateSerializer(serializers.ModelSerializer):
                 "and route already exists."
             )
 
-        return attrs
+        overlapping = Journey.objects.overlapping(departure_time, arrival_time)
+        if overlapping.filter(train=attrs.get("train")).exists():
+            raise ValidationError(
+                {"train": "Train is already on an overlapping journey."}
+            )
 
+        busy_workers = Crew.objects.filter(
+            id__in=[crew.id for crew in attrs.get("workers", [])],
+            trips__in=overlapping,
+        ).distinct()
+        if busy_workers:
+            raise ValidationError(
+                {
+                    "workers": [
+                        f"{crew} is already on an overlapping journey."
+                        for crew in busy_workers
+                    ]
+                }
+            )
 
-class JourneyDetailSerializer(JourneyCreateSerializer):
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as error:
+            # a concurrent request booked the train first
+            if "journey_train_no_overlap" in str(error):
+                raise ValidationError(
+                    {"train": "Train is already on an overlapping journey."}
+                )
+            raise
+
+
+class JourneyDetailSerializer(DynamicFieldsMixin, JourneyCreateSerializer):
     route = RouteSerializer()
     train = TrainSerializer()
     workers = serializers.SlugRelatedField(
@@ -187,6 +303,105 @@ class JourneyDetailSerializer(JourneyCreateSerializer):
     )
 
 
+class WeekdaysField(serializers.ListField):
+    """Weekday numbers (Monday is 0) stored as a bitmask"""
+
+    child = serializers.IntegerField(min_value=0, max_value=6)
+
+    def to_internal_value(self, data):
+        return weekdays_to_mask(super().to_internal_value(data))
+
+    def to_representation(self, value):
+        return mask_to_weekdays(value)
+
+
+class JourneyScheduleSerializer(serializers.ModelSerializer):
+    weekdays = WeekdaysField(allow_empty=False)
+    journeys_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = JourneySchedule
+        fields = (
+            "id",
+            "route",
+            "train",
+            "workers",
+            "departure_offset",
+            "arrival_offset",
+            "weekdays",
+            "start_date",
+            "end_date",
+            "journeys_count",
+        )
+
+    def get_journeys_count(self, obj):
+        if hasattr(obj, "journeys_count"):
+            return obj.journeys_count
+        return obj.journeys.count()
+
+    def validate(self, attrs):
+        if attrs["departure_offset"] < timedelta(0):
+            raise ValidationError("Departure offset cannot be negative.")
+        if attrs["departure_offset"] >= attrs["arrival_offset"]:
+            raise ValidationError(
+                "Departure offset must be earlier than arrival offset."
+            )
+
+        start_date, end_date = attrs["start_date"], attrs["end_date"]
+        if start_date < timezone.localdate():
+            raise ValidationError("Start date cannot be in the past.")
+        if start_date > end_date:
+            raise ValidationError(
+                "Start date must not be later than end date."
+            )
+        if (end_date - start_date).days >= MAX_SCHEDULE_DAYS:
+            raise ValidationError(
+                f"A schedule can span at most {MAX_SCHEDULE_DAYS} days."
+            )
+
+        return attrs
+
+    def create(self, validated_data):
+        worker_ids = [crew.id for crew in validated_data.get("workers", [])]
+
+        with transaction.atomic():
+            schedule = super().create(validated_data)
+            slots = expand_schedule(schedule)
+            if not slots:
+                raise ValidationError(
+                    {"weekdays": "No day of the date range matches."}
+                )
+            if slots[0][0] < timezone.now():
+                raise ValidationError(
+                    "Departure time cannot be in the past."
+                )
+
+            conflicts = find_conflicts(schedule, slots, worker_ids)
+            if conflicts:
+                to_representation = (
+                    serializers.DateTimeField().to_representation
+                )
+                raise ValidationError(
+                    {
+                        "conflicts": [
+                            {
+                                "departure_time": to_representation(
+                                    departure
+                                ),
+                                "arrival_time": to_representation(arrival),
+                            }
+                            for departure, arrival in conflicts
+                        ]
+                    }
+                )
+
+            schedule.journeys_count = len(
+                create_schedule_journeys(schedule, slots, worker_ids)
+            )
+
+            return schedule
+
+
 class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -203,7 +418,32 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ("id", "cargo", "seat", "journey")  # "order"
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class TripTicketSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ticket
+        fields = ("id", "cargo", "seat", "order")
+
+
+class TripSerializer(DynamicFieldsMixin, JourneyTrainSerializer):
+    train = TrainJourneySerializer()
+    seats = TripTicketSerializer(
+        source="user_tickets", many=True, read_only=True
+    )
+
+    class Meta:
+        model = Journey
+        fields = (
+            "id",
+            "departure_place",
+            "arrival_place",
+            "train",
+            "departure_time",
+            "arrival_time",
+            "seats",
+        )
+
+
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     tickets = TicketSerializer(many=True)
 
     class Meta:
@@ -214,13 +454,199 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
+            claim, held = claim_seats(
+                validated_data["user"],
+                [
+                    (ticket["journey"].id, ticket["cargo"], ticket["seat"])
+                    for ticket in tickets_data
+                ],
+            )
+            if held:
+                raise ValidationError(
+                    {
+                        "tickets": [
+                            f"Seat {seat} in cargo {cargo} of journey "
+                            f"{journey_id} is held by another user."
+                            for journey_id, cargo, seat in held
+                        ]
+                    }
+                )
+
             order = Order.objects.create(**validated_data)
 
-            for ticket_data in tickets_data:
+            tickets = [
                 Ticket.objects.create(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            ]
+            publish_seats_on_commit(
+                (
+                    (ticket.journey_id, ticket.cargo, ticket.seat)
+                    for ticket in tickets
+                ),
+                "sold",
+            )
+            invalidate_on_seat_change(ticket.journey_id for ticket in tickets)
+            # the sold seats are guarded by the tickets from here on
+            release_hold(validated_data["user"], claim)
 
             return order
 
 
 class OrderListSerializer(OrderSerializer):
-    tickets = TicketSerializer(many=True, read_only=True)
+    tickets = serializers.SerializerMethodField()
+
+    @extend_schema_field(TicketSerializer(many=True))
+    def get_tickets(self, obj):
+        # tickets of archived journeys are listed along with the live ones
+        return TicketSerializer(
+            chain(obj.tickets.all(), obj.archived_tickets.all()), many=True
+        ).data
+
+
+class QueuedTicketSerializer(serializers.Serializer):
+    """Shape of a ticket only, checked against the journey when placed"""
+
+    journey = serializers.IntegerField(min_value=1)
+    cargo = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+
+
+class QueuedOrderSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="station:queuedorder-detail"
+    )
+    tickets = QueuedTicketSerializer(
+        many=True, allow_empty=False, write_only=True
+    )
+
+    class Meta:
+        model = QueuedOrder
+        fields = (
+            "id",
+            "url",
+            "status",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+            "tickets",
+        )
+        read_only_fields = (
+            "status",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+
+    def create(self, validated_data):
+        tickets = [dict(ticket) for ticket in validated_data.pop("tickets")]
+
+        return QueuedOrder.objects.create(
+            payload={"tickets": tickets}, **validated_data
+        )
+
+
+class HoldSeatSerializer(serializers.Serializer):
+    journey = serializers.PrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("train")
+    )
+    cargo = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+    def validate(self, attrs):
+        Ticket.validate_ticket(
+            attrs["cargo"],
+            attrs["seat"],
+            attrs["journey"].train,
+            ValidationError
+        )
+        return attrs
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    token = serializers.UUIDField(read_only=True)
+    expires_at = serializers.DateTimeField(read_only=True)
+    seats = HoldSeatSerializer(many=True, allow_empty=False)
+
+    def create(self, validated_data):
+        token, expires_at = hold_seats(
+            validated_data["user"],
+            (
+                (seat["journey"].id, seat["cargo"], seat["seat"])
+                for seat in validated_data["seats"]
+            ),
+        )
+
+        return {
+            "token": token,
+            "expires_at": expires_at,
+            "seats": validated_data["seats"],
+        }
+
+
+class RouteDailySalesSerializer(serializers.ModelSerializer):
+    source = serializers.CharField(source="route.source.name")
+    destination = serializers.CharField(source="route.destination.name")
+
+    class Meta:
+        model = RouteDailySales
+        fields = (
+            "route",
+            "source",
+            "destination",
+            "departure_date",
+            "tickets_sold",
+        )
+
+
+class TrainTypeDailySalesSerializer(serializers.ModelSerializer):
+    train_type = serializers.CharField(source="train_type.name")
+
+    class Meta:
+        model = TrainTypeDailySales
+        fields = ("train_type", "departure_date", "tickets_sold")
+
+
+class OrderHourlySalesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderHourlySales
+        fields = ("hour", "orders_count", "tickets_sold")
+
+
+class BatchSubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=("GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"),
+        default="GET",
+    )
+    url = serializers.CharField()
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(
+        child=serializers.CharField(), required=False
+    )
+
+    def validate_url(self, value):
+        if not value.startswith(BATCH_PREFIX):
+            raise ValidationError(
+                f"Only {BATCH_PREFIX} endpoints can be batched."
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    parallel = serializers.BooleanField(default=False)
+    requests = BatchSubRequestSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise ValidationError(
+                f"A batch can hold at most "
+                f"{settings.BATCH_MAX_REQUESTS} requests."
+            )
+        return value
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    status = serializers.IntegerField()
+    headers = serializers.DictField(child=serializers.CharField())
+    body = serializers.JSONField(allow_null=True)
@@ -1,10 +1,92 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
-from .models import Order
-from .tasks import send_order_email
+from django.utils import timezone
+from .journey_search import (
+    invalidate_journeys_on_commit,
+    invalidate_on_seat_change,
+)
+from .models import Journey, Order, Route, Station, Train, TrainType
+from .seat_events import publish_seats_on_commit
+from .table_versions import bump_versions_on_commit
+from .tasks import send_order_email, generate_ticket_documents
 
 
 @receiver(post_save, sender=Order)
 def send_email_on_order_creation(sender, instance, created, **kwargs):
     if created:
-        send_order_email.delay(instance.user.email, instance.id)
+        email = instance.user.email
+        transaction.on_commit(
+            lambda: send_order_email.delay(email, instance.id)
+        )
+
+
+@receiver(post_save, sender=Order)
+def generate_documents_on_order_creation(sender, instance, created, **kwargs):
+    if created:
+        # tickets are created after the order, in the same transaction
+        transaction.on_commit(
+            lambda: generate_ticket_documents.delay(instance.id)
+        )
+
+
+@receiver(pre_delete, sender=Order)
+def release_seats_on_order_deletion(sender, instance, **kwargs):
+    # read before the tickets are cascade-deleted
+    seats = list(instance.tickets.values_list("journey_id", "cargo", "seat"))
+    publish_seats_on_commit(seats, "released")
+    invalidate_on_seat_change(journey_id for journey_id, _, _ in seats)
+
+
+@receiver(pre_save, sender=Journey)
+def invalidate_searches_before_journey_change(sender, instance, **kwargs):
+    # an edit can move the journey to another route or day
+    if not instance._state.adding:
+        invalidate_journeys_on_commit(
+            Journey.objects.select_related("route").filter(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Journey)
+def invalidate_searches_on_journey_save(sender, instance, **kwargs):
+    invalidate_journeys_on_commit([instance])
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_save, sender=TrainType)
+@receiver(post_save, sender=Train)
+@receiver(post_save, sender=Route)
+@receiver(post_save, sender=Journey)
+@receiver(post_delete, sender=Station)
+@receiver(post_delete, sender=TrainType)
+@receiver(post_delete, sender=Train)
+@receiver(post_delete, sender=Route)
+@receiver(post_delete, sender=Journey)
+def bump_list_versions(sender, **kwargs):
+    # the tables behind the list ETags (see ConditionalGetMixin)
+    bump_versions_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=Journey.workers.through)
+def touch_journeys_on_workers_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # the crew is part of the journey representation (ETag/Last-Modified)
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        journeys = Journey.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        journeys = instance.trips.all()
+    else:
+        journeys = Journey.objects.filter(pk__in=pk_set)
+
+    journeys.update(updated_at=timezone.now())
+    bump_versions_on_commit(Journey)
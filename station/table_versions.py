@@ -0,0 +1,58 @@
+"""Per-table versions behind the ETag of list responses.
+
+Every committed write to a table a list is built from bumps the version of
+that table, so a list validator is a cache read instead of an aggregate
+over the filtered table, and deletions change it as well. Model signals
+bump the versions (see station.signals); bulk inserts and queryset updates
+of these tables have to call ``bump_versions_on_commit`` themselves.
+
+Like the journey search versions, they live in the cache, which has to be
+shared by the processes serving the API.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def version_key(model):
+    return f"table-version:{model._meta.label_lower}"
+
+
+def models_for_lookups(model, lookups):
+    """Models owning the last field of each ``a__b__field`` lookup"""
+    models = []
+    for lookup in lookups:
+        owner = model
+        for name in lookup.split("__")[:-1]:
+            owner = owner._meta.get_field(name).related_model
+        if owner not in models:
+            models.append(owner)
+
+    return models
+
+
+def get_versions(models):
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            # a fresh version after a cache flush never repeats an old one
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def bump_versions_on_commit(*models):
+    def bump():
+        for model in models:
+            try:
+                cache.incr(version_key(model))
+            except ValueError:
+                # never read yet, the first read starts a new version
+                pass
+
+    transaction.on_commit(bump, robust=True)
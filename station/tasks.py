@@ -2,6 +2,15 @@ from celery import shared_task
 from django.core.mail import send_mail
 from django.conf import settings
 
+from station import (
+    archive,
+    documents,
+    holds,
+    journey_search,
+    order_queue,
+    rollups,
+)
+
 
 @shared_task
 def send_order_email(user_email, order_id):
@@ -16,3 +25,51 @@ def send_order_email(user_email, order_id):
         [user_email],
         fail_silently=False,
     )
+
+
+# rollups and archiving resume from their checkpoints, so they are
+# acknowledged only after they finish and rerun if a worker dies mid-task
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def update_sales_rollups():
+    return rollups.update_sales_rollups()
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def archive_completed_journeys():
+    return archive.archive_completed_journeys()
+
+
+# a whole order is rendered in one task; reruns reuse the stored document
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def generate_ticket_documents(order_id):
+    document = documents.generate_ticket_document(order_id)
+    return document.file.name if document is not None else None
+
+
+@shared_task
+def warm_journey_searches():
+    return journey_search.warm_popular_searches()
+
+
+@shared_task
+def release_expired_holds():
+    return holds.release_expired_holds()
+
+
+# one message only wakes the consumer of a shard, pending orders are
+# rows and survive a lost worker
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def process_order_queue(shard):
+    return order_queue.process_shard(shard)
+
+
+@shared_task
+def dispatch_order_queues():
+    """Wake the consumer of every shard with pending orders"""
+    shards = order_queue.pending_shards()
+    for shard in shards:
+        process_order_queue.apply_async(
+            (shard,), queue=order_queue.queue_name(shard)
+        )
+
+    return len(shards)
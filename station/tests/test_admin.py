@@ -0,0 +1,118 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.pagination import EstimatedCountPaginator, estimated_count
+
+
+TICKET_CHANGELIST_URL = reverse("admin:station_ticket_changelist")
+
+
+@mock.patch("station.signals.send_order_email.delay")
+class StationAdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="test1234"
+        )
+        self.client.force_login(self.admin)
+
+        train_type = TrainType.objects.create(name="intercity")
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=train_type,
+        )
+        self.stations = [
+            Station.objects.create(
+                name=f"Station {index}", latitude=50, longitude=30 + index
+            )
+            for index in range(4)
+        ]
+
+    def sample_tickets(self, count):
+        order = Order.objects.create(user=self.admin)
+        for index in range(count):
+            departure_time = timezone.now() + timedelta(
+                days=Journey.objects.count() + 1
+            )
+            journey = Journey.objects.create(
+                route=Route.objects.create(
+                    source=self.stations[index % 4],
+                    destination=self.stations[(index + 1) % 4],
+                    distance=100 + Journey.objects.count(),
+                ),
+                train=self.train,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=2),
+            )
+            Ticket.objects.create(
+                order=order, journey=journey, cargo=1, seat=1
+            )
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TICKET_CHANGELIST_URL, params)
+
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_ticket_changelist_queries_do_not_grow(self, _):
+        self.sample_tickets(2)
+        few = self.changelist_queries()
+
+        self.sample_tickets(6)
+        self.assertEqual(self.changelist_queries(), few)
+
+    def test_ticket_changelist_search(self, _):
+        self.sample_tickets(1)
+
+        self.changelist_queries(q=Ticket.objects.get().order_id)
+        self.changelist_queries(q="not-a-number")
+
+    def test_paginator_uses_estimate_above_threshold(self, _):
+        self.sample_tickets(3)
+        queryset = Ticket.objects.filter(seat=1).order_by("id")
+
+        with mock.patch.object(
+            EstimatedCountPaginator, "exact_count_threshold", 0
+        ):
+            paginator = EstimatedCountPaginator(queryset, 2)
+            with CaptureQueriesContext(connection) as queries:
+                count = paginator.count
+
+        self.assertEqual(count, estimated_count(queryset))
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries)
+        )
+
+    def test_paginator_counts_small_tables_exactly(self, _):
+        self.sample_tickets(3)
+
+        paginator = EstimatedCountPaginator(Ticket.objects.order_by("id"), 2)
+
+        self.assertEqual(paginator.count, 3)
+
+    def test_station_search_uses_trigram_index(self, _):
+        queryset = Station.objects.filter(name__icontains="tion 1")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        self.assertIn("station_name_trgm_idx", plan)
@@ -0,0 +1,138 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.archive import archive_completed_journeys
+from station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    Crew,
+    Journey,
+    Order,
+    RollupCheckpoint,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+@mock.patch("station.signals.send_order_email.delay")
+class ArchiveCompletedJourneysTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=2,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        )
+        self.route = Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        )
+        self.crew = Crew.objects.create(first_name="John", last_name="Doe")
+
+    def sample_journey(self, days):
+        departure_time = timezone.now() + timedelta(days=days)
+        journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=8),
+        )
+        journey.workers.add(self.crew)
+
+        return journey
+
+    def mark_rolled_up(self):
+        RollupCheckpoint.objects.update_or_create(
+            name="tickets",
+            defaults={"last_id": Ticket.objects.order_by("-id")[0].id},
+        )
+
+    def test_completed_journeys_are_archived(self, _):
+        old_journey = self.sample_journey(days=-40)
+        new_journey = self.sample_journey(days=-1)
+        order = Order.objects.create(user=self.user)
+        old_ticket = Ticket.objects.create(
+            order=order, journey=old_journey, cargo=1, seat=1
+        )
+        Ticket.objects.create(
+            order=order, journey=new_journey, cargo=2, seat=3
+        )
+        self.mark_rolled_up()
+
+        self.assertEqual(archive_completed_journeys(batch_size=1), 1)
+
+        self.assertFalse(Journey.objects.filter(id=old_journey.id).exists())
+        self.assertTrue(Journey.objects.filter(id=new_journey.id).exists())
+
+        archived = ArchivedJourney.objects.get(id=old_journey.id)
+        self.assertEqual(archived.departure_time, old_journey.departure_time)
+        self.assertEqual(list(archived.workers.all()), [self.crew])
+
+        archived_ticket = ArchivedTicket.objects.get(id=old_ticket.id)
+        self.assertEqual(
+            (archived_ticket.order_id, archived_ticket.journey_id),
+            (order.id, old_journey.id),
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_tickets_not_rolled_up_stay_in_place(self, _):
+        journey = self.sample_journey(days=-40)
+        Ticket.objects.create(
+            order=Order.objects.create(user=self.user),
+            journey=journey,
+            cargo=1,
+            seat=1,
+        )
+
+        self.assertEqual(archive_completed_journeys(), 0)
+        self.assertTrue(Journey.objects.filter(id=journey.id).exists())
+
+    def test_order_history_includes_archived_tickets(self, _):
+        old_journey = self.sample_journey(days=-40)
+        new_journey = self.sample_journey(days=1)
+        order = Order.objects.create(user=self.user)
+        for journey, seat in [(old_journey, 1), (new_journey, 2)]:
+            Ticket.objects.create(
+                order=order, journey=journey, cargo=1, seat=seat
+            )
+        self.mark_rolled_up()
+
+        archive_completed_journeys()
+
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(
+                (ticket["journey"], ticket["seat"])
+                for ticket in res.data["results"][0]["tickets"]
+            ),
+            [(old_journey.id, 1), (new_journey.id, 2)],
+        )
+
+        res = self.client.get(ORDER_URL, {"journey": old_journey.id})
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [order.id]
+        )
@@ -0,0 +1,187 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+BATCH_URL = reverse("batch")
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+
+    return Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+def trip_screen_requests(journey):
+    return [
+        {"url": reverse("station:journey-detail", args=[journey.id])},
+        {"url": reverse("station:train-detail", args=[journey.train_id])},
+        {
+            "url": reverse("station:route-list")
+            + f"?source={journey.route.source_id}"
+        },
+        {"url": reverse("station:order-list")},
+    ]
+
+
+class BatchApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def test_trip_screen_in_one_request(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"requests": trip_screen_requests(self.journey)},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in res.data], [status.HTTP_200_OK] * 4
+        )
+        journey, train, routes, orders = [item["body"] for item in res.data]
+        self.assertEqual(journey["id"], self.journey.id)
+        self.assertEqual(train["id"], self.journey.train_id)
+        self.assertEqual(
+            [route["id"] for route in routes["results"]],
+            [self.journey.route_id],
+        )
+        self.assertEqual(orders["results"], [])
+
+    def test_sub_requests_use_batch_user(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.post(
+            BATCH_URL,
+            {"requests": [{"url": reverse("station:order-list")}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["status"], status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch("station.signals.send_order_email.delay")
+    def test_write_sub_request(self, _):
+        res = self.client.post(
+            BATCH_URL,
+            {
+                "requests": [
+                    {
+                        "method": "POST",
+                        "url": reverse("station:order-list"),
+                        "body": {
+                            "tickets": [
+                                {
+                                    "cargo": 1,
+                                    "seat": 1,
+                                    "journey": self.journey.id,
+                                }
+                            ]
+                        },
+                        "headers": {"Idempotency-Key": "batch-order"},
+                    },
+                    {"url": reverse("station:order-list")},
+                ],
+                "parallel": True,
+            },
+            format="json",
+        )
+
+        created, orders = res.data
+        self.assertEqual(created["status"], status.HTTP_201_CREATED)
+        self.assertEqual(
+            [order["id"] for order in orders["body"]["results"]],
+            [created["body"]["id"]],
+        )
+        self.assertEqual(Order.objects.get().user, self.user)
+
+    def test_only_station_endpoints(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"requests": [{"url": reverse("user:manage")}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_station_url(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"requests": [{"url": "/api/stations/unknown/"}]},
+            format="json",
+        )
+
+        self.assertEqual(res.data[0]["status"], status.HTTP_404_NOT_FOUND)
+
+    @override_settings(BATCH_MAX_REQUESTS=3)
+    def test_batch_size_is_capped(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"requests": trip_screen_requests(self.journey)},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ParallelBatchApiTests(TransactionTestCase):
+    # worker threads use their own connections, so the data is committed
+    def test_parallel_reads_keep_order(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="test1234"
+            )
+        )
+        journey = sample_journey()
+
+        res = client.post(
+            BATCH_URL,
+            {"requests": trip_screen_requests(journey), "parallel": True},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in res.data], [status.HTTP_200_OK] * 4
+        )
+        self.assertEqual(res.data[0]["body"]["id"], journey.id)
+        self.assertEqual(res.data[1]["body"]["id"], journey.train_id)
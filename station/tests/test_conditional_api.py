@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Crew,
+    Journey,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+STATION_URL = reverse("station:station-list")
+ROUTE_URL = reverse("station:route-list")
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def journey_detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+
+    return Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+class ConditionalGetApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="test1234"
+            )
+        )
+        self.journey = sample_journey()
+
+    def assertNotModified(self, url, queries=0, **headers):
+        # lists read table versions from the cache, a detail runs the
+        # validators aggregate
+        with self.assertNumQueries(queries):
+            res = self.client.get(url, **headers)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+        self.assertIn("must-revalidate", res["Cache-Control"])
+
+        return res
+
+    def test_station_list_validators(self):
+        res = self.client.get(STATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("max-age=0", res["Cache-Control"])
+        self.assertNotIn("Last-Modified", res)
+        self.assertNotModified(STATION_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+    def test_station_list_changes_etag(self):
+        etag = self.client.get(STATION_URL)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Station.objects.create(
+                name="Odesa", latitude=46.48, longitude=30.72
+            )
+
+        res = self.client.get(STATION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_route_list_follows_station_rename(self):
+        etag = self.client.get(ROUTE_URL)["ETag"]
+        self.assertNotModified(ROUTE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        station = self.journey.route.source
+        station.name = "Kyiv-Pasazhyrskyi"
+        with self.captureOnCommitCallbacks(execute=True):
+            station.save()
+
+        res = self.client.get(ROUTE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"][0]["source"], "Kyiv-Pasazhyrskyi"
+        )
+
+    def test_list_etag_follows_deletion(self):
+        station = Station.objects.create(
+            name="Odesa", latitude=46.48, longitude=30.72
+        )
+        etag = self.client.get(STATION_URL)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            station.delete()
+
+        res = self.client.get(STATION_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_journey_list_follows_workers(self):
+        etag = self.client.get(JOURNEY_URL)["ETag"]
+        self.assertNotModified(JOURNEY_URL, HTTP_IF_NONE_MATCH=etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey.workers.add(
+                Crew.objects.create(first_name="John", last_name="Doe")
+            )
+
+        res = self.client.get(JOURNEY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["count_workers"], 1)
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(STATION_URL)["ETag"]
+
+        res = self.client.get(
+            STATION_URL, {"fields": "id"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_journey_detail_follows_workers(self):
+        url = journey_detail_url(self.journey.id)
+        etag = self.client.get(url)["ETag"]
+        self.assertNotModified(url, queries=1, HTTP_IF_NONE_MATCH=etag)
+
+        self.journey.workers.add(
+            Crew.objects.create(first_name="John", last_name="Doe")
+        )
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["workers"], ["John Doe"])
+
+    def test_missing_journey_not_found(self):
+        res = self.client.get(journey_detail_url(self.journey.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
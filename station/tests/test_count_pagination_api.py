@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Journey, Route, Station, Train, TrainType
+from station.pagination import EstimatedCountLimitOffsetPagination
+
+
+JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("station:order-list")
+
+
+class EstimatedCountPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="test1234"
+            )
+        )
+        self.route = Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        )
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        )
+        for _ in range(3):
+            self.sample_journey()
+
+    def sample_journey(self):
+        departure_time = timezone.now() + timedelta(
+            days=Journey.objects.count() + 1
+        )
+        return Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=8),
+        )
+
+    def test_small_results_are_counted_exactly(self):
+        res = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 3)
+        self.assertTrue(res.data["count_exact"])
+
+    def test_exact_count_is_cached_per_filter(self):
+        with mock.patch.object(
+            EstimatedCountLimitOffsetPagination, "cache_count_above", 0
+        ):
+            self.assertEqual(self.client.get(JOURNEY_URL).data["count"], 3)
+            self.sample_journey()
+
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(JOURNEY_URL)
+            filtered = self.client.get(
+                JOURNEY_URL, {"route": self.route.id}
+            )
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertTrue(res.data["count_exact"])
+        self.assertFalse(
+            any("SELECT COUNT(*)" in query["sql"] for query in queries)
+        )
+        self.assertEqual(filtered.data["count"], 4)
+
+    def test_large_results_use_estimate(self):
+        with mock.patch.multiple(
+            EstimatedCountLimitOffsetPagination,
+            cache_count_above=0,
+            estimate_count_above=0,
+        ):
+            res = self.client.get(JOURNEY_URL)
+
+        self.assertFalse(res.data["count_exact"])
+        self.assertIsInstance(res.data["count"], int)
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_order_list_reports_exact_count(self):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 0)
+        self.assertTrue(res.data["count_exact"])
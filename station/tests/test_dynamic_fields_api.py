@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Crew,
+    Journey,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+JOURNEY_URL = reverse("station:journey-list")
+
+
+def journey_detail_url(journey_id):
+    return reverse("station:journey-detail", args=[journey_id])
+
+
+def train_detail_url(train_id):
+    return reverse("station:train-detail", args=[train_id])
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+    journey = Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+    journey.workers.add(
+        Crew.objects.create(first_name="John", last_name="Doe")
+    )
+
+    return journey
+
+
+class DynamicFieldsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="test1234"
+            )
+        )
+        self.journey = sample_journey()
+
+    def test_journey_detail_only_times(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                journey_detail_url(self.journey.id),
+                {"fields": "id,departure_time,arrival_time"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(res.data), {"id", "departure_time", "arrival_time"}
+        )
+        # ETag/Last-Modified aggregate, then the journey itself
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("JOIN", queries[-1]["sql"])
+
+    def test_journey_detail_default_shape(self):
+        with self.assertNumQueries(3):
+            res = self.client.get(journey_detail_url(self.journey.id))
+
+        self.assertEqual(res.data["route"]["source"], "Kyiv")
+        self.assertEqual(res.data["train"]["train_type"], "intercity")
+        self.assertEqual(res.data["workers"], ["John Doe"])
+
+    def test_journey_list_fields_skip_joins(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                JOURNEY_URL, {"fields": "id,departure_place"}
+            )
+
+        self.assertEqual(
+            res.data["results"],
+            [{"id": self.journey.id, "departure_place": "Kyiv"}],
+        )
+        select = queries[-1]["sql"]
+        self.assertEqual(select.count("JOIN"), 2)
+        self.assertNotIn("GROUP BY", select)
+
+    def test_journey_list_expand(self):
+        res = self.client.get(JOURNEY_URL, {"expand": "route,workers"})
+
+        journey = res.data["results"][0]
+        self.assertEqual(journey["count_workers"], 1)
+        self.assertEqual(journey["route"]["destination"], "Lviv")
+        self.assertEqual(
+            [worker["last_name"] for worker in journey["workers"]], ["Doe"]
+        )
+
+    def test_train_detail_expand_train_type(self):
+        url = train_detail_url(self.journey.train_id)
+
+        res = self.client.get(url)
+        self.assertEqual(
+            res.data["train_type"], self.journey.train.train_type_id
+        )
+
+        res = self.client.get(url, {"expand": "train_type"})
+        self.assertEqual(res.data["train_type"]["name"], "intercity")
+
+    def test_train_detail_fields_skip_journeys(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                train_detail_url(self.journey.train_id),
+                {"fields": "id,name"},
+            )
+
+        self.assertEqual(
+            res.data, {"id": self.journey.train_id, "name": "Hyundai"}
+        )
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.db.models import Count
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.fast_serializers import (
+    JourneyListValuesSerializer,
+    RouteValuesSerializer,
+    StationValuesSerializer,
+)
+from station.models import Crew, Journey, Route, Station, Train, TrainType
+from station.serializers import (
+    JourneyListSerializer,
+    RouteSerializer,
+    StationSerializer,
+)
+
+
+JOURNEY_URL = reverse("station:journey-list")
+ROUTE_URL = reverse("station:route-list")
+STATION_URL = reverse("station:station-list")
+
+
+class FastListSerializersTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        kyiv = Station.objects.create(
+            name="Kyiv", latitude=50.4501, longitude=30.5234
+        )
+        lviv = Station.objects.create(
+            name="Lviv", latitude=49.8397, longitude=24.0297
+        )
+        odesa = Station.objects.create(
+            name="Odesa", latitude=46.4825, longitude=30.7233
+        )
+        routes = [
+            Route.objects.create(source=kyiv, destination=lviv, distance=540),
+            Route.objects.create(source=lviv, destination=odesa, distance=790),
+        ]
+        train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        )
+        crew = [
+            Crew.objects.create(first_name="John", last_name="Doe"),
+            Crew.objects.create(first_name="Jane", last_name="Roe"),
+        ]
+        departure_time = timezone.now().replace(microsecond=123456)
+
+        for index, route in enumerate(routes * 2):
+            journey = Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=departure_time + timedelta(days=index),
+                arrival_time=departure_time + timedelta(days=index, hours=7),
+            )
+            journey.workers.set(crew[:index])
+
+    def assert_same_output(self, queryset, serializer_class, values_class):
+        expected = serializer_class(queryset, many=True).data
+        rows = values_class.get_rows(queryset)
+
+        self.assertEqual(values_class(rows).data, expected)
+
+    def test_station_output_is_identical(self):
+        self.assert_same_output(
+            Station.objects.all(), StationSerializer, StationValuesSerializer
+        )
+
+    def test_route_output_is_identical(self):
+        self.assert_same_output(
+            Route.objects.select_related("source", "destination"),
+            RouteSerializer,
+            RouteValuesSerializer,
+        )
+
+    def test_journey_output_is_identical(self):
+        self.assert_same_output(
+            Journey.objects.annotate(
+                count_workers=Count("workers")
+            ).order_by("departure_time"),
+            JourneyListSerializer,
+            JourneyListValuesSerializer,
+        )
+
+    def test_list_endpoints_match_serializers(self):
+        for url, queryset, serializer_class in [
+            (STATION_URL, Station.objects.all(), StationSerializer),
+            (ROUTE_URL, Route.objects.all(), RouteSerializer),
+            (
+                JOURNEY_URL,
+                Journey.objects.annotate(
+                    count_workers=Count("workers")
+                ).order_by("departure_time"),
+                JourneyListSerializer,
+            ),
+        ]:
+            res = self.client.get(url)
+            serializer = serializer_class(queryset[:5], many=True)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json()["results"], serializer.data)
@@ -0,0 +1,81 @@
+import io
+from datetime import date
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from station.index_audit import IndexAuditMixin, audit
+from station.models import Order
+
+
+ORDER_CASES = (("station:order-list", ("date",), ()),)
+
+
+class IndexAuditTests(IndexAuditMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "seed_load_data",
+            stdout=mock.Mock(),
+            stations=6,
+            routes=10,
+            trains=4,
+            users=5,
+            days=3,
+            journeys_per_day=8,
+            occupancy=20,
+            start_date=date(2030, 1, 1),
+        )
+
+    def test_api_queries_are_indexed(self):
+        self.assertIndexesCover()
+
+    def drop_order_index(self):
+        with connection.schema_editor() as editor:
+            for index in Order._meta.indexes:
+                editor.remove_index(Order, index)
+
+        return mock.patch.object(Order._meta, "indexes", [])
+
+    def test_missing_index_is_proposed(self):
+        with self.drop_order_index():
+            findings = audit(
+                cases=ORDER_CASES, strict=True, host="testserver"
+            )
+
+        self.assertIn(
+            ("station.Order", ("user", "-created_at")),
+            [finding["index"] for finding in findings],
+        )
+
+    def test_command(self):
+        stdout = io.StringIO()
+
+        call_command(
+            "audit_indexes", "--fail", "--host=testserver", stdout=stdout
+        )
+
+        self.assertEqual(
+            stdout.getvalue(), "No sequential scans or sorts to report.\n"
+        )
+
+    def test_command_proposes_missing_index(self):
+        stdout = io.StringIO()
+
+        with self.drop_order_index(), self.assertRaises(CommandError):
+            call_command(
+                "audit_indexes",
+                "--strict",
+                "--fail",
+                "--host=testserver",
+                stdout=stdout,
+            )
+
+        self.assertRegex(
+            stdout.getvalue(),
+            r"Proposed: station\.Order "
+            r"models\.Index\(fields=\['user', '-created_at'\]\) "
+            r"for \d+ requests",
+        )
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Crew,
+    Journey,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+JOURNEY_URL = reverse("station:journey-list")
+CREW_AVAILABLE_URL = reverse("station:crew-available")
+
+
+class JourneyOverlapTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test1234"
+            )
+        )
+        self.route = Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        )
+        train_type = TrainType.objects.create(name="intercity")
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=train_type,
+        )
+        self.other_train = Train.objects.create(
+            name="Skoda",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=train_type,
+        )
+        self.john = Crew.objects.create(first_name="John", last_name="Doe")
+        self.jane = Crew.objects.create(first_name="Jane", last_name="Roe")
+
+        self.departure = (timezone.now() + timedelta(days=1)).replace(
+            microsecond=0
+        )
+        self.journey = Journey.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=8),
+        )
+        self.journey.workers.add(self.john)
+
+    def payload(self, train, workers, hours=4):
+        departure_time = self.departure + timedelta(hours=hours)
+
+        return {
+            "route": self.route.id,
+            "train": train.id,
+            "departure_time": departure_time,
+            "arrival_time": departure_time + timedelta(hours=8),
+            "workers": [crew.id for crew in workers],
+        }
+
+    def test_train_overlap_rejected(self):
+        res = self.client.post(
+            JOURNEY_URL, self.payload(self.train, [self.jane])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("train", res.data)
+
+    def test_crew_overlap_rejected(self):
+        res = self.client.post(
+            JOURNEY_URL, self.payload(self.other_train, [self.john])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["workers"],
+            ["John Doe is already on an overlapping journey."],
+        )
+
+    def test_back_to_back_journey_allowed(self):
+        res = self.client.post(
+            JOURNEY_URL, self.payload(self.train, [self.john], hours=8)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_exclusion_constraint(self):
+        with self.assertRaises(IntegrityError):
+            Journey.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=self.departure + timedelta(hours=7),
+                arrival_time=self.departure + timedelta(hours=9),
+            )
+
+    def test_available_crew(self):
+        res = self.client.get(
+            CREW_AVAILABLE_URL,
+            {
+                "from": (self.departure + timedelta(hours=7)).isoformat(),
+                "to": (self.departure + timedelta(hours=10)).isoformat(),
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [crew["id"] for crew in res.data["results"]], [self.jane.id]
+        )
+
+        res = self.client.get(
+            CREW_AVAILABLE_URL,
+            {
+                "from": (self.departure + timedelta(hours=8)).isoformat(),
+                "to": (self.departure + timedelta(hours=10)).isoformat(),
+            },
+        )
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_available_crew_invalid_window(self):
+        res = self.client.get(CREW_AVAILABLE_URL, {"from": "yesterday"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_overlap_lookup_uses_gist_index(self):
+        queryset = Journey.objects.overlapping(
+            self.departure, self.departure + timedelta(hours=1)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        self.assertIn("journey_train_no_overlap", plan)
@@ -0,0 +1,171 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Crew,
+    Journey,
+    JourneySchedule,
+    Route,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+SCHEDULE_URL = reverse("station:journeyschedule-list")
+
+
+def next_monday():
+    today = timezone.localdate()
+    return today + timedelta(days=7 - today.weekday())
+
+
+class JourneyScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test1234"
+            )
+        )
+        self.route = Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        )
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        )
+        self.crew = [
+            Crew.objects.create(first_name="John", last_name="Doe"),
+            Crew.objects.create(first_name="Jane", last_name="Roe"),
+        ]
+        self.start_date = next_monday()
+        self.payload = {
+            "route": self.route.id,
+            "train": self.train.id,
+            "workers": [crew.id for crew in self.crew],
+            "departure_offset": "07:30:00",
+            "arrival_offset": "15:00:00",
+            # Monday, Wednesday, Friday for two weeks
+            "weekdays": [0, 2, 4],
+            "start_date": self.start_date,
+            "end_date": self.start_date + timedelta(days=13),
+        }
+
+    def departure(self, days, hours=7, minutes=30):
+        midnight = timezone.make_aware(
+            datetime.combine(self.start_date + timedelta(days=days), time())
+        )
+        return midnight + timedelta(hours=hours, minutes=minutes)
+
+    def test_create_schedule_expands_journeys(self):
+        # the inserts do not depend on the number of journeys
+        with self.assertNumQueries(13):
+            res = self.client.post(SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["journeys_count"], 6)
+        self.assertEqual(res.data["weekdays"], [0, 2, 4])
+
+        journeys = Journey.objects.filter(schedule_id=res.data["id"])
+        self.assertEqual(
+            [journey.departure_time for journey in journeys],
+            [self.departure(days) for days in (0, 2, 4, 7, 9, 11)],
+        )
+        self.assertEqual(
+            journeys[0].arrival_time - journeys[0].departure_time,
+            timedelta(hours=7, minutes=30),
+        )
+        self.assertEqual(
+            Journey.workers.through.objects.filter(
+                journey__schedule_id=res.data["id"]
+            ).count(),
+            12,
+        )
+
+    def test_conflicting_schedule_creates_nothing(self):
+        Journey.objects.create(
+            route=Route.objects.create(
+                source=self.route.destination,
+                destination=self.route.source,
+                distance=540,
+            ),
+            train=self.train,
+            departure_time=self.departure(9, hours=14),
+            arrival_time=self.departure(9, hours=21),
+        )
+
+        res = self.client.post(SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data["conflicts"]), 1)
+        self.assertFalse(JourneySchedule.objects.exists())
+        self.assertEqual(Journey.objects.count(), 1)
+
+    def test_busy_crew_conflicts(self):
+        journey = Journey.objects.create(
+            route=self.route,
+            train=Train.objects.create(
+                name="Skoda",
+                cargo_num=5,
+                places_in_cargo=50,
+                train_type=self.train.train_type,
+            ),
+            departure_time=self.departure(2, hours=6),
+            arrival_time=self.departure(2, hours=9),
+        )
+        journey.workers.add(self.crew[1])
+
+        res = self.client.post(SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["conflicts"][0]["departure_time"],
+            self.departure(2).isoformat().replace("+00:00", "Z"),
+        )
+
+    def test_overnight_journeys_must_not_overlap(self):
+        self.payload.update(
+            {
+                "weekdays": list(range(7)),
+                "departure_offset": "20:00:00",
+                "arrival_offset": "1 22:00:00",
+            }
+        )
+
+        res = self.client.post(SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data["conflicts"]), 13)
+
+    def test_invalid_offsets(self):
+        self.payload["arrival_offset"] = "06:00:00"
+
+        res = self.client.post(SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_schedule_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="test1234"
+            )
+        )
+
+        res = self.client.post(SCHEDULE_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
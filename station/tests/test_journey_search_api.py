@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.journey_search import version_key, warm_popular_searches
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    RouteDailySales,
+    Station,
+    Train,
+    TrainType,
+)
+
+
+SEARCH_URL = reverse("station:journey-search")
+JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("station:order-list")
+
+
+def sample_route(source, destination):
+    return Route.objects.create(
+        source=source, destination=destination, distance=540
+    )
+
+
+def sample_train(name, places=3):
+    return Train.objects.create(
+        name=name,
+        cargo_num=1,
+        places_in_cargo=places,
+        train_type=TrainType.objects.get_or_create(name="intercity")[0],
+    )
+
+
+def sample_journey(route, train, departure_time):
+    return Journey.objects.create(
+        route=route,
+        train=train,
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+@override_settings(JOURNEY_SEARCH_FEW_SEATS=1)
+@mock.patch("station.signals.send_order_email.delay")
+@mock.patch("station.signals.generate_ticket_documents.delay")
+class JourneySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = Station.objects.create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        )
+        self.lviv = Station.objects.create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        )
+        self.route = sample_route(self.kyiv, self.lviv)
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.departure = timezone.make_aware(
+            datetime.combine(self.day, datetime.min.time())
+        ) + timedelta(hours=9)
+        self.journey = sample_journey(
+            self.route, sample_train("Hyundai"), self.departure
+        )
+        self.params = {
+            "source": self.kyiv.id,
+            "destination": self.lviv.id,
+            "date": self.day.isoformat(),
+        }
+
+    def search(self, **params):
+        res = self.client.get(SEARCH_URL, {**self.params, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def buy(self, journey, seat):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"journey": journey.id, "cargo": 1, "seat": seat}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_search_is_cached(self, *_):
+        # other day and other direction
+        sample_journey(
+            self.route,
+            sample_train("Tarpan"),
+            self.departure + timedelta(days=1),
+        )
+        sample_journey(
+            sample_route(self.lviv, self.kyiv),
+            sample_train("Skoda"),
+            self.departure,
+        )
+
+        data = self.search()
+
+        self.assertEqual([row["id"] for row in data], [self.journey.id])
+        self.assertEqual(data[0]["availability"], "available")
+        self.assertEqual(
+            data[0]["train"], {"name": "Hyundai", "train_type": "intercity"}
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search(), data)
+
+    def test_sale_invalidates_only_on_level_change(self, *_):
+        self.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buy(self.journey, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search()[0]["availability"], "available")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buy(self.journey, 2)
+        self.assertEqual(self.search()[0]["availability"], "few")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buy(self.journey, 3)
+        self.assertEqual(self.search()[0]["availability"], "sold_out")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(tickets__seat=3).delete()
+        self.assertEqual(self.search()[0]["availability"], "few")
+
+    def test_sale_keeps_other_pairs_and_days(self, *_):
+        other = sample_journey(
+            self.route,
+            sample_train("Tarpan", places=1),
+            self.departure + timedelta(days=1),
+        )
+        self.search()
+        self.search(date=(self.day + timedelta(days=1)).isoformat())
+        version = cache.get(
+            version_key(self.kyiv.id, self.lviv.id, self.day)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buy(other, 1)
+
+        self.assertEqual(
+            cache.get(version_key(self.kyiv.id, self.lviv.id, self.day)),
+            version,
+        )
+        self.assertEqual(
+            self.search(date=(self.day + timedelta(days=1)).isoformat())[0][
+                "availability"
+            ],
+            "sold_out",
+        )
+
+    def test_new_journey_invalidates(self, *_):
+        self.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sample_journey(
+                self.route,
+                sample_train("Tarpan"),
+                self.departure + timedelta(hours=2),
+            )
+
+        self.assertEqual(len(self.search()), 2)
+
+    def test_moved_journey_leaves_old_day(self, *_):
+        self.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey.departure_time += timedelta(days=1)
+            self.journey.arrival_time += timedelta(days=1)
+            self.journey.save()
+
+        self.assertEqual(self.search(), [])
+
+    def test_train_type_filter(self, *_):
+        other_type = TrainType.objects.create(name="regional")
+
+        data = self.search(train_type=f"{other_type.id}")
+
+        self.assertEqual(data, [])
+        self.assertEqual(
+            len(self.search(train_type=f"{self.journey.train.train_type_id}")),
+            1,
+        )
+
+    def test_invalid_params(self, *_):
+        for params in (
+            {"source": "kyiv"},
+            {"date": "2024-02-30"},
+            {"date": ""},
+            {"train_type": "a"},
+        ):
+            res = self.client.get(SEARCH_URL, {**self.params, **params})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_warm_popular_searches(self, *_):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        Journey.objects.filter(pk=self.journey.pk).update(
+            departure_time=self.departure - timedelta(days=1),
+            arrival_time=self.departure + timedelta(hours=7),
+        )
+        RouteDailySales.objects.create(
+            route=self.route, departure_date=tomorrow, tickets_sold=5
+        )
+
+        self.assertEqual(warm_popular_searches(limit=3), 1)
+
+        with self.assertNumQueries(0):
+            data = self.search(date=tomorrow.isoformat())
+        self.assertEqual([row["id"] for row in data], [self.journey.id])
+
+
+class JourneyListTrainFilterTests(TestCase):
+    def test_filter_by_train(self):
+        kyiv = Station.objects.create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        )
+        route = sample_route(
+            kyiv,
+            Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+        )
+        departure = timezone.now() + timedelta(days=1)
+        journey = sample_journey(route, sample_train("Hyundai"), departure)
+        sample_journey(
+            route, sample_train("Tarpan"), departure + timedelta(hours=1)
+        )
+
+        res = self.client.get(JOURNEY_URL, {"train": journey.train_id})
+
+        self.assertEqual(
+            [row["id"] for row in res.data["results"]], [journey.id]
+        )
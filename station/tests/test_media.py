@@ -0,0 +1,143 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Train, TrainType
+
+
+def image_upload_url(train_id):
+    return reverse("station:train-upload-image", args=[train_id])
+
+
+def sample_image(color="red"):
+    file = io.BytesIO()
+    Image.new("RGB", (10, 10), color).save(file, "PNG")
+    file.name = "Photo.PNG"
+    file.seek(0)
+
+    return file
+
+
+class MediaDeliveryTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test1234"
+            )
+        )
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        )
+        self.client.post(
+            image_upload_url(self.train.id),
+            {"image": sample_image()},
+            format="multipart",
+        )
+        self.train.refresh_from_db()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_image_name_is_content_hashed(self):
+        other = Train.objects.create(
+            name="Hyundai 2",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=self.train.train_type,
+        )
+        self.client.post(
+            image_upload_url(other.id),
+            {"image": sample_image()},
+            format="multipart",
+        )
+        other.refresh_from_db()
+        digest = os.path.basename(self.train.image.name)[len("hyundai-"):]
+
+        self.assertRegex(self.train.image.name, r"-[0-9a-f]{16}\.png$")
+        self.assertEqual(other.image.name, f"{other.folder}hyundai-2-{digest}")
+
+    def test_image_served_as_immutable(self):
+        res = self.client.get(self.train.image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "image/png")
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertEqual(
+            b"".join(res.streaming_content), self.train.image.read()
+        )
+
+    def test_conditional_request(self):
+        etag = self.client.get(self.train.image.url)["ETag"]
+
+        res = self.client.get(self.train.image.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range_request(self):
+        content = self.train.image.read()
+
+        res = self.client.get(self.train.image.url, HTTP_RANGE="bytes=0-9")
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(res.content, content[:10])
+        self.assertEqual(res["Content-Range"], f"bytes 0-9/{len(content)}")
+
+        res = self.client.get(self.train.image.url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(res.content, content[-4:])
+
+        res = self.client.get(
+            self.train.image.url, HTTP_RANGE=f"bytes={len(content)}-"
+        )
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel")
+    def test_x_accel_redirect(self):
+        res = self.client.get(self.train.image.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{self.train.image}"
+        )
+        self.assertEqual(res.content, b"")
+
+    @override_settings(MEDIA_SERVE_MODE="x-sendfile")
+    def test_x_sendfile(self):
+        res = self.client.get(self.train.image.url)
+
+        self.assertEqual(res["X-Sendfile"], self.train.image.path)
+
+    def test_private_and_missing_media_not_served(self):
+        default_storage.save("uploads/tickets/ticket.pdf", ContentFile(b"x"))
+
+        for path in (
+            "uploads/tickets/ticket.pdf",
+            "uploads/train_images/../tickets/ticket.pdf",
+            "uploads/train_images/missing.png",
+        ):
+            res = self.client.get(f"/media/{path}")
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.post(self.train.image.url)
+        self.assertEqual(
+            res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
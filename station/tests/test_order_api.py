@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+
+    return Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+class OrderIdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+        self.payload = {
+            "tickets": [{"cargo": 1, "seat": 1, "journey": self.journey.id}]
+        }
+
+    def post_order(self, payload, key="order-key-1"):
+        return self.client.post(
+            ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_create_order_without_key(self):
+        res = self.client.post(ORDER_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.get().order_id, res.data["id"])
+
+    def test_retry_replays_first_response(self):
+        first = self.post_order(self.payload)
+
+        with self.assertNumQueries(0):
+            retry = self.post_order(self.payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_key_reused_with_other_payload(self):
+        self.post_order(self.payload)
+        self.payload["tickets"][0]["seat"] = 2
+
+        res = self.post_order(self.payload)
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post_order(self.payload)
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="other@test.com", password="test1234"
+            )
+        )
+        self.payload["tickets"][0]["seat"] = 2
+
+        res = self.post_order(self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", res)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_concurrent_duplicate_conflicts(self):
+        # another request holding the key lock makes cache.add fail
+        with mock.patch("station.mixins.cache.add", return_value=False):
+            res = self.post_order(self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+
+    def test_failed_request_is_not_stored(self):
+        self.payload["tickets"][0]["seat"] = 500
+
+        res = self.post_order(self.payload)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.payload["tickets"][0]["seat"] = 5
+        res = self.post_order(self.payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -0,0 +1,206 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.holds import claim_seats
+from station.models import (
+    Journey,
+    Order,
+    QueuedOrder,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.order_queue import process_shard
+from station.tasks import dispatch_order_queues
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+
+    return Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+@override_settings(ORDER_QUEUE_SHARDS=4)
+@mock.patch("station.views.process_order_queue.apply_async")
+@mock.patch("station.signals.send_order_email.delay")
+@mock.patch("station.signals.generate_ticket_documents.delay")
+class QueuedOrderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+        self.shard = self.journey.id % 4
+
+    def post_order(self, seat, journey=None):
+        journey = journey or self.journey
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"journey": journey.id, "cargo": 1, "seat": seat}]},
+            format="json",
+            HTTP_PREFER="respond-async",
+        )
+
+    def test_order_is_accepted_then_placed(self, *mocks):
+        apply_async = mocks[-1]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.post_order(1)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res["Location"], res.data["url"])
+        self.assertEqual(res.data["status"], QueuedOrder.PENDING)
+        self.assertFalse(Ticket.objects.exists())
+        apply_async.assert_called_once_with(
+            (self.shard,), queue=f"orders.{self.shard}"
+        )
+
+        self.assertEqual(process_shard(self.shard), 1)
+
+        placed = self.client.get(res["Location"])
+        self.assertEqual(placed.data["status"], QueuedOrder.COMPLETED)
+        self.assertEqual(Ticket.objects.get().order_id, placed.data["order"])
+        self.assertEqual(process_shard(self.shard), 0)
+
+    def test_orders_are_placed_in_arrival_order(self, *_):
+        first = self.post_order(1).data["id"]
+        second = self.post_order(1).data["id"]
+        third = self.post_order(2).data["id"]
+
+        self.assertEqual(process_shard(self.shard, batch_size=2), 3)
+
+        first, second, third = (
+            QueuedOrder.objects.get(pk=pk) for pk in (first, second, third)
+        )
+        self.assertEqual(first.status, QueuedOrder.COMPLETED)
+        self.assertEqual(second.status, QueuedOrder.REJECTED)
+        self.assertIn("non_field_errors", second.errors["tickets"][0])
+        self.assertEqual(third.status, QueuedOrder.COMPLETED)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_seat_sold_after_validation_is_rejected(self, *_):
+        self.post_order(1)
+
+        def sold_meanwhile(user, seats):
+            # an order of another shard commits between is_valid and the
+            # ticket inserts
+            Ticket.objects.create(
+                order=Order.objects.create(user=self.user),
+                journey=self.journey,
+                cargo=1,
+                seat=1,
+            )
+            return claim_seats(user, seats)
+
+        with mock.patch(
+            "station.serializers.claim_seats", side_effect=sold_meanwhile
+        ):
+            self.assertEqual(process_shard(self.shard), 1)
+
+        queued = QueuedOrder.objects.get()
+        self.assertEqual(queued.status, QueuedOrder.REJECTED)
+        self.assertEqual(
+            queued.errors, {"tickets": ["Seats were sold to another order."]}
+        )
+        self.assertEqual(process_shard(self.shard), 0)
+
+    def test_invalid_seat_is_rejected_by_consumer(self, *_):
+        self.post_order(51)
+
+        process_shard(self.shard)
+
+        self.assertEqual(
+            QueuedOrder.objects.get().status, QueuedOrder.REJECTED
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_payload_shape_is_checked(self, *_):
+        for tickets in ([], [{"journey": "a", "cargo": 1, "seat": 1}]):
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": tickets},
+                format="json",
+                HTTP_PREFER="respond-async",
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(QueuedOrder.objects.exists())
+
+    def test_status_of_other_users_is_hidden(self, *_):
+        url = self.post_order(1)["Location"]
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="other@test.com", password="test1234"
+            )
+        )
+
+        self.assertEqual(
+            self.client.get(url).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_without_preference_order_is_placed_at_once(self, *_):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"journey": self.journey.id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(QueuedOrder.objects.exists())
+
+    def test_pending_shards_are_woken_by_beat(self, *mocks):
+        apply_async = mocks[-1]
+        self.post_order(1)
+        apply_async.reset_mock()
+
+        self.assertEqual(dispatch_order_queues(), 1)
+        apply_async.assert_called_once_with(
+            (self.shard,), queue=f"orders.{self.shard}"
+        )
+
+        process_shard(self.shard)
+        self.assertEqual(dispatch_order_queues(), 0)
+
+    @override_settings(ORDER_QUEUES=["orders.0", "orders.1"])
+    def test_queue_names_for_workers(self, *_):
+        stdout = StringIO()
+
+        call_command("order_queue_names", stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), "orders.0,orders.1\n")
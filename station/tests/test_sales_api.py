@@ -0,0 +1,193 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Journey,
+    Order,
+    OrderHourlySales,
+    Route,
+    RouteDailySales,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    TrainTypeDailySales,
+)
+from station.rollups import update_sales_rollups
+
+
+ROUTE_SALES_URL = reverse("station:routedailysales-list")
+TRAIN_TYPE_SALES_URL = reverse("station:traintypedailysales-list")
+HOURLY_SALES_URL = reverse("station:orderhourlysales-list")
+
+
+def sample_journey(route, train, days):
+    departure_time = timezone.now() + timedelta(days=days)
+
+    return Journey.objects.create(
+        route=route,
+        train=train,
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+def sample_order(user, journey, *seats):
+    order = Order.objects.create(user=user)
+    for seat in seats:
+        Ticket.objects.create(order=order, journey=journey, cargo=1, seat=seat)
+
+    return order
+
+
+class SalesTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.train = Train.objects.create(
+            name="Hyundai",
+            cargo_num=1,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        )
+        self.route = Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        )
+        self.journey = sample_journey(self.route, self.train, days=1)
+
+
+@override_settings(SALES_ROLLUP_LAG=0)
+@mock.patch("station.signals.send_order_email.delay")
+class SalesRollupTests(SalesTestCase):
+    def test_rollups_are_incremental(self, _):
+        sample_order(self.user, self.journey, 1, 2)
+        sample_order(self.user, self.journey, 3)
+
+        self.assertEqual(
+            update_sales_rollups(), {"tickets": 3, "orders": 2}
+        )
+        self.assertEqual(
+            update_sales_rollups(), {"tickets": 0, "orders": 0}
+        )
+
+        other_day = sample_journey(self.route, self.train, days=2)
+        sample_order(self.user, self.journey, 4)
+        sample_order(self.user, other_day, 1, 2)
+
+        self.assertEqual(
+            update_sales_rollups(batch_size=2), {"tickets": 3, "orders": 2}
+        )
+
+        route_sales = RouteDailySales.objects.order_by("departure_date")
+        self.assertEqual(
+            [
+                (sales.departure_date, sales.tickets_sold)
+                for sales in route_sales
+            ],
+            [
+                (self.journey.departure_time.date(), 4),
+                (other_day.departure_time.date(), 2),
+            ],
+        )
+        self.assertEqual(
+            sum(
+                TrainTypeDailySales.objects.values_list(
+                    "tickets_sold", flat=True
+                )
+            ),
+            6,
+        )
+        self.assertEqual(
+            OrderHourlySales.objects.aggregate(
+                orders=Sum("orders_count"), tickets=Sum("tickets_sold")
+            ),
+            {"orders": 4, "tickets": 6},
+        )
+
+    @override_settings(SALES_ROLLUP_LAG=3600)
+    def test_recent_rows_are_left_for_next_run(self, _):
+        sample_order(self.user, self.journey, 1)
+
+        self.assertEqual(
+            update_sales_rollups(), {"tickets": 0, "orders": 0}
+        )
+        self.assertFalse(RouteDailySales.objects.exists())
+
+
+@override_settings(SALES_ROLLUP_LAG=0)
+@mock.patch("station.signals.send_order_email.delay")
+class SalesAPITests(SalesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def test_sales_forbidden_for_regular_users(self, _):
+        self.client.force_authenticate(self.user)
+
+        for url in [ROUTE_SALES_URL, TRAIN_TYPE_SALES_URL, HOURLY_SALES_URL]:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_sales_list_for_staff(self, _):
+        sample_order(self.user, self.journey, 1, 2)
+        update_sales_rollups()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test1234"
+            )
+        )
+        departure_date = self.journey.departure_time.date()
+
+        res = self.client.get(
+            ROUTE_SALES_URL,
+            {"route": self.route.id, "date_from": departure_date},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {
+                    "route": self.route.id,
+                    "source": "Kyiv",
+                    "destination": "Lviv",
+                    "departure_date": departure_date.isoformat(),
+                    "tickets_sold": 2,
+                }
+            ],
+        )
+
+        res = self.client.get(
+            TRAIN_TYPE_SALES_URL, {"date_to": departure_date}
+        )
+        self.assertEqual(res.data["results"][0]["train_type"], "intercity")
+
+        res = self.client.get(HOURLY_SALES_URL)
+        self.assertEqual(res.data["results"][0]["tickets_sold"], 2)
+
+    def test_sales_invalid_dates(self, _):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test1234"
+            )
+        )
+
+        for params in [{"date_from": "tomorrow"}, {"date_to": "2024-02-30"}]:
+            res = self.client.get(ROUTE_SALES_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from trainipy import settings_production
+
+
+SCHEMA_URL = reverse("schema")
+SCHEMA = b"openapi: 3.0.3\ninfo:\n  title: prebuilt\n"
+
+
+class PrecomputedSchemaTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.schema_file = os.path.join(self.directory, "schema.yaml")
+        with open(self.schema_file, "wb") as file:
+            file.write(SCHEMA)
+
+        self.settings_override = override_settings(
+            OPENAPI_SCHEMA_FILE=self.schema_file
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_schema_served_from_file(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.content, SCHEMA)
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi")
+        self.assertEqual(res["Cache-Control"], "public, max-age=300")
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_other_format_is_generated(self):
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("/api/stations/journeys/", res.json()["paths"])
+
+    def test_schema_generated_without_file(self):
+        with override_settings(OPENAPI_SCHEMA_FILE=""):
+            res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.content, SCHEMA)
+        self.assertNotIn("ETag", res)
+
+
+class ProductionSettingsTests(TestCase):
+    def test_debug_apps_removed(self):
+        self.assertFalse(settings_production.DEBUG)
+        self.assertNotIn("debug_toolbar", settings_production.INSTALLED_APPS)
+        self.assertFalse(
+            any(
+                middleware.startswith("debug_toolbar.")
+                for middleware in settings_production.MIDDLEWARE
+            )
+        )
@@ -0,0 +1,234 @@
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.seat_events import (
+    RESYNC,
+    InMemorySeatBroker,
+    Subscription,
+    seat_event_stream,
+    seat_stream_application,
+)
+
+
+ORDER_URL = reverse("station:order-list")
+
+
+def seats_stream_url(journey_id):
+    return reverse("station:journey-seats-stream", args=[journey_id])
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+
+    return Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+@mock.patch("station.signals.send_order_email.delay")
+@mock.patch("station.signals.generate_ticket_documents.delay")
+@mock.patch.object(InMemorySeatBroker, "publish")
+class SeatEventPublishingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def test_order_publishes_sold_seats_on_commit(self, publish, *_):
+        with self.captureOnCommitCallbacks() as callbacks:
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"journey": self.journey.id, "cargo": 1, "seat": 2},
+                        {"journey": self.journey.id, "cargo": 3, "seat": 4},
+                    ]
+                },
+                format="json",
+            )
+            publish.assert_not_called()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        for callback in callbacks:
+            callback()
+        publish.assert_called_once_with(
+            self.journey.id,
+            {
+                "journey": self.journey.id,
+                "event": "sold",
+                "seats": [[1, 2], [3, 4]],
+            },
+        )
+
+    def test_order_deletion_releases_seats(self, publish, *_):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            order=order, journey=self.journey, cargo=2, seat=7
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+
+        publish.assert_called_once_with(
+            self.journey.id,
+            {
+                "journey": self.journey.id,
+                "event": "released",
+                "seats": [[2, 7]],
+            },
+        )
+
+
+class SeatEventStreamTests(TransactionTestCase):
+    # snapshots are read on executor threads, outside a test transaction
+
+    def setUp(self):
+        for task in ("send_order_email", "generate_ticket_documents"):
+            patcher = mock.patch(f"station.signals.{task}.delay")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.journey = sample_journey()
+        Ticket.objects.create(
+            order=Order.objects.create(
+                user=get_user_model().objects.create_user(
+                    email="test@test.com", password="test1234"
+                )
+            ),
+            journey=self.journey,
+            cargo=1,
+            seat=1,
+        )
+
+    async def test_snapshot_then_deltas(self):
+        broker = InMemorySeatBroker()
+        stream = seat_event_stream(self.journey.id, broker)
+
+        snapshot = await anext(stream)
+        self.assertEqual(
+            snapshot,
+            "event: snapshot\n"
+            f'data: {{"journey": {self.journey.id}, "seats": [[1, 1]]}}\n\n',
+        )
+
+        message = {
+            "journey": self.journey.id,
+            "event": "sold",
+            "seats": [[2, 3]],
+        }
+        # published from a worker thread, like an on_commit callback
+        publisher = threading.Thread(
+            target=broker.publish, args=(self.journey.id, message)
+        )
+        publisher.start()
+        event = await anext(stream)
+        publisher.join()
+
+        self.assertTrue(event.startswith("event: sold\n"))
+        self.assertIn('"seats": [[2, 3]]', event)
+
+        await stream.aclose()
+        self.assertEqual(broker.subscriptions, {})
+
+    @override_settings(SEAT_EVENTS_HEARTBEAT=0)
+    async def test_heartbeat(self):
+        stream = seat_event_stream(self.journey.id, InMemorySeatBroker())
+
+        await anext(stream)
+        self.assertEqual(await anext(stream), ": ping\n\n")
+        await stream.aclose()
+
+    @override_settings(SEAT_EVENTS_QUEUE_SIZE=2)
+    async def test_slow_subscriber_is_resynced(self):
+        subscription = Subscription(self.journey.id)
+
+        for seat in range(3):
+            subscription.deliver({"seats": [[1, seat]]})
+
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertIs(subscription.queue.get_nowait(), RESYNC)
+
+    async def test_stream_view(self):
+        res = await self.async_client.get(seats_stream_url(self.journey.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        self.assertEqual(res["Cache-Control"], "no-cache")
+
+        res = await self.async_client.get(seats_stream_url(0))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_asgi_application(self):
+        django_application = mock.AsyncMock()
+        application = seat_stream_application(django_application)
+        sent = []
+        disconnected = asyncio.Event()
+
+        async def send(message):
+            sent.append(message)
+            if message.get("more_body"):
+                disconnected.set()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": seats_stream_url(self.journey.id),
+        }
+        await application(scope, receive, send)
+
+        self.assertEqual(sent[0]["status"], 200)
+        self.assertIn(
+            (b"content-type", b"text/event-stream"), sent[0]["headers"]
+        )
+        self.assertTrue(sent[1]["body"].startswith(b"event: snapshot\n"))
+        django_application.assert_not_called()
+
+        sent.clear()
+        await application(
+            {**scope, "path": seats_stream_url(0)}, receive, send
+        )
+        self.assertEqual(sent[0]["status"], 404)
+
+        await application({**scope, "path": "/api/"}, receive, send)
+        django_application.assert_awaited_once()
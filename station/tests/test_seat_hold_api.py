@@ -0,0 +1,281 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from station.holds import SeatsUnavailable, hold_seats, release_expired_holds
+from station.models import (
+    Journey,
+    Route,
+    SeatHold,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.serializers import OrderSerializer
+
+
+HOLD_URL = reverse("station:seathold-list")
+ORDER_URL = reverse("station:order-list")
+
+
+def hold_url(token, action=None):
+    if action:
+        return reverse(f"station:seathold-{action}", args=[token])
+
+    return reverse("station:seathold-detail", args=[token])
+
+
+def sample_journey():
+    departure_time = timezone.now() + timedelta(days=1)
+
+    return Journey.objects.create(
+        route=Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            distance=540,
+        ),
+        train=Train.objects.create(
+            name="Hyundai",
+            cargo_num=5,
+            places_in_cargo=50,
+            train_type=TrainType.objects.create(name="intercity"),
+        ),
+        departure_time=departure_time,
+        arrival_time=departure_time + timedelta(hours=8),
+    )
+
+
+def in_thread(target):
+    """Run ``target`` on its own connection, returns the thread and a dict
+    the result or error lands in"""
+    result = {}
+
+    def run():
+        try:
+            result["value"] = target()
+        except Exception as error:
+            result["error"] = error
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+def client_for(email):
+    client = APIClient()
+    client.force_authenticate(
+        get_user_model().objects.create_user(email=email, password="test1234")
+    )
+    return client
+
+
+@mock.patch("station.signals.send_order_email.delay")
+@mock.patch("station.signals.generate_ticket_documents.delay")
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = client_for("test@test.com")
+        self.other = client_for("other@test.com")
+        self.journey = sample_journey()
+
+    def seats(self, *seats):
+        return {
+            "seats": [
+                {"journey": self.journey.id, "cargo": 1, "seat": seat}
+                for seat in seats
+            ]
+        }
+
+    def hold(self, client, *seats):
+        return client.post(HOLD_URL, self.seats(*seats), format="json")
+
+    def test_held_seats_are_blocked_until_confirmed(self, *_):
+        res = self.hold(self.client, 1, 2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["seats"]), 2)
+        self.assertEqual(SeatHold.objects.count(), 2)
+
+        taken = self.hold(self.other, 2, 3)
+        self.assertEqual(taken.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            taken.data["seats"],
+            [{"journey": self.journey.id, "cargo": 1, "seat": 2}],
+        )
+        # all or none
+        self.assertFalse(SeatHold.objects.filter(seat=3).exists())
+
+        order = self.other.post(
+            ORDER_URL,
+            {"tickets": [{"journey": self.journey.id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+        self.assertEqual(order.status_code, status.HTTP_400_BAD_REQUEST)
+
+        confirmed = self.client.post(hold_url(res.data["token"], "confirm"))
+
+        self.assertEqual(confirmed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(
+                Ticket.objects.filter(
+                    order_id=confirmed.data["id"]
+                ).values_list("seat", flat=True)
+            ),
+            [1, 2],
+        )
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertEqual(
+            self.client.post(
+                hold_url(res.data["token"], "confirm")
+            ).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_sold_seat_cannot_be_held(self, *_):
+        self.client.post(
+            ORDER_URL,
+            {"tickets": [{"journey": self.journey.id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+
+        res = self.hold(self.other, 1)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_order_takes_own_hold(self, *_):
+        self.hold(self.client, 1)
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"journey": self.journey.id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_expired_hold_frees_seats(self, *_):
+        token = self.hold(self.client, 1).data["token"]
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(
+            self.client.post(hold_url(token, "confirm")).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.hold(self.other, 1).status_code, status.HTTP_201_CREATED
+        )
+        self.assertEqual(SeatHold.objects.get().user.email, "other@test.com")
+
+    def test_release_expired_holds(self, *_):
+        self.hold(self.client, 1, 2)
+        self.hold(self.other, 3)
+        SeatHold.objects.filter(seat__lt=3).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(release_expired_holds(batch_size=1), 2)
+        self.assertEqual(SeatHold.objects.get().seat, 3)
+
+    def test_release_hold(self, *_):
+        token = self.hold(self.client, 1).data["token"]
+
+        self.assertEqual(
+            self.other.delete(hold_url(token)).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.client.delete(hold_url(token)).status_code,
+            status.HTTP_204_NO_CONTENT,
+        )
+        self.assertEqual(
+            self.hold(self.other, 1).status_code, status.HTTP_201_CREATED
+        )
+
+    def test_invalid_seat(self, *_):
+        res = self.hold(self.client, 51)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.post(
+                HOLD_URL, {"seats": []}, format="json"
+            ).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class ConcurrentSeatHoldTests(TransactionTestCase):
+    # the hold and the order run on two connections, uncommitted in turn
+
+    def setUp(self):
+        for task in ("send_order_email", "generate_ticket_documents"):
+            patcher = mock.patch(f"station.signals.{task}.delay")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        cache.clear()
+        self.holder, self.buyer = (
+            get_user_model().objects.create_user(
+                email=email, password="test1234"
+            )
+            for email in ("holder@test.com", "buyer@test.com")
+        )
+        self.journey = sample_journey()
+
+    def hold(self):
+        return hold_seats(self.holder, [(self.journey.id, 1, 1)])
+
+    def place_order(self):
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {"journey": self.journey.id, "cargo": 1, "seat": 1}
+                ]
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=self.buyer)
+
+    def test_order_waits_for_uncommitted_hold(self):
+        with transaction.atomic():
+            self.hold()
+            thread, result = in_thread(self.place_order)
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+
+        thread.join()
+        self.assertIsInstance(result.get("error"), ValidationError)
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual(SeatHold.objects.get().user, self.holder)
+
+    def test_hold_waits_for_uncommitted_order(self):
+        with transaction.atomic():
+            self.place_order()
+            thread, result = in_thread(self.hold)
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+
+        thread.join()
+        self.assertIsInstance(result.get("error"), SeatsUnavailable)
+        self.assertEqual(Ticket.objects.get().order.user, self.buyer)
+        self.assertFalse(SeatHold.objects.exists())
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Count
+from django.test import TestCase
+
+from station.models import ArchivedJourney, Journey, Order, Ticket
+
+
+def seed(**options):
+    defaults = {
+        "stations": 5,
+        "routes": 8,
+        "trains": 3,
+        "users": 4,
+        "days": 2,
+        "journeys_per_day": 7,
+        "occupancy": 10,
+        "start_date": date(2030, 1, 1),
+        "chunk_size": 50,
+    }
+    call_command(
+        "seed_load_data", stdout=mock.Mock(), **{**defaults, **options}
+    )
+
+
+def snapshot():
+    return list(
+        Ticket.objects.order_by(
+            "journey__departure_time", "journey__train__name", "cargo", "seat"
+        ).values_list(
+            "journey__route__source__name",
+            "journey__train__name",
+            "journey__departure_time",
+            "cargo",
+            "seat",
+        )
+    )
+
+
+@mock.patch("station.signals.send_order_email.delay")
+class SeedLoadDataTests(TestCase):
+    def test_seats_are_unique_and_match_occupancy(self, _):
+        seed()
+
+        self.assertEqual(Journey.objects.count(), 14)
+        for journey in Journey.objects.select_related("train"):
+            places = journey.train.cargo_num * journey.train.places_in_cargo
+            self.assertEqual(journey.tickets.count(), places * 10 // 100)
+        self.assertFalse(
+            Ticket.objects.values("journey", "cargo", "seat")
+            .annotate(count=Count("id"))
+            .filter(count__gt=1)
+            .exists()
+        )
+        self.assertFalse(Order.objects.filter(tickets=None).exists())
+
+    def test_same_seed_gives_same_data(self, _):
+        with transaction.atomic():
+            seed(seed=7)
+            first = snapshot()
+            transaction.set_rollback(True)
+
+        seed(seed=7)
+
+        self.assertEqual(snapshot(), first)
+
+    def test_sequences_are_reset(self, _):
+        seed()
+
+        order = Order.objects.create(user=get_user_model().objects.first())
+
+        self.assertGreater(
+            order.id, Order.objects.exclude(id=order.id).latest("id").id
+        )
+
+    def test_archived_journey_ids_are_not_reused(self, _):
+        seed()
+        live = Journey.objects.latest("id")
+        archived = ArchivedJourney.objects.create(
+            id=live.id + 100,
+            route=live.route,
+            train=live.train,
+            departure_time=datetime(2029, 1, 1, 8, tzinfo=timezone.utc),
+            arrival_time=datetime(2029, 1, 1, 12, tzinfo=timezone.utc),
+        )
+
+        seed(seed=8, start_date=date(2031, 1, 1))
+        journey = Journey.objects.create(
+            route=live.route,
+            train=live.train,
+            departure_time=datetime(2035, 1, 1, 8, tzinfo=timezone.utc),
+            arrival_time=datetime(2035, 1, 1, 12, tzinfo=timezone.utc),
+        )
+
+        self.assertGreater(
+            Journey.objects.filter(id__gt=live.id).earliest("id").id,
+            archived.id,
+        )
+        self.assertGreater(
+            journey.id, Journey.objects.exclude(id=journey.id).latest("id").id
+        )
+
+    def test_sequences_never_move_backwards(self, _):
+        seed()
+        user = get_user_model().objects.first()
+        order = Order.objects.create(user=user)
+        deleted_id = order.id
+        order.delete()
+
+        seed(seed=8, days=0)
+
+        self.assertGreater(Order.objects.create(user=user).id, deleted_id)
+
+    def test_too_many_journeys_per_train(self, _):
+        with self.assertRaises(CommandError):
+            seed(journeys_per_day=100)
@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.distances import (
+    StationDistanceMatrix,
+    get_distance_matrix,
+    haversine_km,
+    implausible_routes,
+)
+from station.models import Route, Station
+
+
+ROUTE_URL = reverse("station:route-list")
+
+
+class StationDistanceTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.settings_override = override_settings(
+            STATION_DISTANCES_DIR=self.directory
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.kyiv = Station.objects.create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        )
+        self.lviv = Station.objects.create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        )
+        self.odesa = Station.objects.create(
+            name="Odesa", latitude=46.48, longitude=30.72
+        )
+
+    def test_haversine(self):
+        self.assertAlmostEqual(
+            float(haversine_km(50.45, 30.52, 49.84, 24.03)), 467, delta=1
+        )
+        self.assertEqual(float(haversine_km(50.45, 30.52, 50.45, 30.52)), 0)
+
+    def test_matrix_in_blocks(self):
+        matrix = StationDistanceMatrix.build(self.directory, block_size=2)
+
+        self.assertEqual(matrix.distances.shape, (3, 3))
+        self.assertEqual(str(matrix.distances.dtype), "float32")
+        self.assertAlmostEqual(
+            matrix.distance(self.kyiv.id, self.lviv.id),
+            float(haversine_km(50.45, 30.52, 49.84, 24.03)),
+            places=2,
+        )
+        self.assertEqual(
+            matrix.distance(self.odesa.id, self.lviv.id),
+            matrix.distance(self.lviv.id, self.odesa.id),
+        )
+        self.assertIsNone(matrix.distance(self.kyiv.id, 0))
+
+    def test_rebuilt_matrix_is_reloaded(self):
+        self.assertIsNone(get_distance_matrix())
+
+        call_command("build_station_distances", stdout=mock.Mock())
+        self.assertEqual(len(get_distance_matrix().ids), 3)
+
+        Station.objects.create(name="Dnipro", latitude=48.46, longitude=35.04)
+        call_command("build_station_distances", stdout=mock.Mock())
+        self.assertEqual(len(get_distance_matrix().ids), 4)
+
+    def test_route_distance_filled_in(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@test.com", password="test1234"
+            )
+        )
+
+        res = client.post(
+            ROUTE_URL,
+            {"source": "Kyiv", "destination": "Lviv"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Route.objects.get().distance, 467)
+
+    def test_implausible_routes(self):
+        StationDistanceMatrix.build(self.directory)
+        Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=540
+        )
+        too_short = Route.objects.create(
+            source=self.kyiv, destination=self.odesa, distance=100
+        )
+        # a station newer than the matrix
+        dnipro = Station.objects.create(
+            name="Dnipro", latitude=48.46, longitude=35.04
+        )
+        too_long = Route.objects.create(
+            source=self.kyiv, destination=dnipro, distance=2000
+        )
+
+        self.assertEqual(
+            [route[0] for route in implausible_routes()],
+            [too_short.id, too_long.id],
+        )
+        with self.assertRaises(CommandError):
+            call_command("check_route_distances", stdout=mock.Mock())
+
+    def test_edited_station_falls_back_to_haversine(self):
+        matrix = StationDistanceMatrix.build(self.directory)
+        route = Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=540
+        )
+        self.assertEqual(implausible_routes(), [])
+
+        # Lviv moved next to Kyiv after the build
+        self.lviv.latitude, self.lviv.longitude = 50.46, 30.53
+        self.lviv.save()
+
+        self.assertIsNone(matrix.distance(self.kyiv.id, self.lviv.id))
+        self.assertIsNotNone(matrix.distance(self.kyiv.id, self.odesa.id))
+        self.assertEqual(
+            [route_row[0] for route_row in implausible_routes()], [route.id]
+        )
@@ -0,0 +1,181 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.archive import archive_completed_journeys
+from station.documents import (
+    generate_ticket_document,
+    load_ticket_signature,
+    sign_ticket,
+)
+from station.models import (
+    Journey,
+    Order,
+    RollupCheckpoint,
+    Route,
+    Station,
+    Ticket,
+    TicketDocument,
+    Train,
+    TrainType,
+)
+
+
+def tickets_pdf_url(order_id):
+    return reverse("station:order-tickets-pdf", args=[order_id])
+
+
+class TicketDocumentTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+
+        departure_time = timezone.now() + timedelta(days=1)
+        journey = Journey.objects.create(
+            route=Route.objects.create(
+                source=Station.objects.create(
+                    name="Kyiv", latitude=50.45, longitude=30.52
+                ),
+                destination=Station.objects.create(
+                    name="Lviv", latitude=49.84, longitude=24.03
+                ),
+                distance=540,
+            ),
+            train=Train.objects.create(
+                name="Hyundai",
+                cargo_num=5,
+                places_in_cargo=50,
+                train_type=TrainType.objects.create(name="intercity"),
+            ),
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=8),
+        )
+
+        with mock.patch("station.signals.send_order_email.delay"):
+            self.order = Order.objects.create(user=self.user)
+        self.tickets = [
+            Ticket.objects.create(
+                order=self.order, journey=journey, cargo=1, seat=seat
+            )
+            for seat in (1, 2)
+        ]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_signed_payload(self):
+        ticket = self.tickets[0]
+
+        self.assertEqual(
+            load_ticket_signature(sign_ticket(ticket)),
+            {
+                "ticket": ticket.id,
+                "journey": ticket.journey_id,
+                "cargo": 1,
+                "seat": 1,
+            },
+        )
+
+    def test_document_rendered_once_per_ticket_change(self):
+        document = generate_ticket_document(self.order.id)
+
+        self.assertTrue(document.file.name.endswith(".pdf"))
+        with document.file.open("rb") as file:
+            self.assertTrue(file.read().startswith(b"%PDF"))
+
+        with mock.patch(
+            "station.documents.render_tickets_pdf"
+        ) as render_tickets_pdf:
+            self.assertEqual(
+                generate_ticket_document(self.order.id).file.name,
+                document.file.name,
+            )
+            render_tickets_pdf.assert_not_called()
+
+        ticket = self.tickets[1]
+        ticket.seat = 3
+        ticket.save()
+
+        changed_document = generate_ticket_document(self.order.id)
+        self.assertNotEqual(changed_document.file.name, document.file.name)
+        self.assertFalse(default_storage.exists(document.file.name))
+
+    def test_order_creation_enqueues_one_generation(self):
+        with (
+            mock.patch("station.signals.send_order_email.delay"),
+            mock.patch(
+                "station.signals.generate_ticket_documents.delay"
+            ) as delay,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            order = Order.objects.create(user=self.user)
+
+        delay.assert_called_once_with(order.id)
+
+    @mock.patch("station.views.generate_ticket_documents.delay")
+    def test_download_pending_then_ready(self, delay):
+        res = self.client.get(tickets_pdf_url(self.order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        delay.assert_called_once_with(self.order.id)
+
+        generate_ticket_document(self.order.id)
+        res = self.client.get(tickets_pdf_url(self.order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(res.streaming_content).startswith(b"%PDF"))
+
+    @override_settings(JOURNEY_ARCHIVE_AFTER_DAYS=-2)
+    def test_download_after_journey_is_archived(self):
+        document = generate_ticket_document(self.order.id)
+        RollupCheckpoint.objects.create(
+            name="tickets", last_id=self.tickets[-1].id
+        )
+
+        self.assertEqual(archive_completed_journeys(), 1)
+        self.assertFalse(Ticket.objects.exists())
+
+        with mock.patch(
+            "station.documents.render_tickets_pdf"
+        ) as render_tickets_pdf:
+            self.assertEqual(
+                generate_ticket_document(self.order.id).file.name,
+                document.file.name,
+            )
+            render_tickets_pdf.assert_not_called()
+
+        res = self.client.get(tickets_pdf_url(self.order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(b"".join(res.streaming_content).startswith(b"%PDF"))
+
+    def test_download_other_user_order_not_found(self):
+        generate_ticket_document(self.order.id)
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="other@test.com", password="test1234"
+            )
+        )
+
+        res = self.client.get(tickets_pdf_url(self.order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(TicketDocument.objects.exists())
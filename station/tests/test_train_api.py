@@ -1,16 +1,23 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework.test import APIClient
 from django.urls import reverse
 
-from station.models import Train, TrainType
-from station.serializers import TrainSerializer
+from station.models import Train, TrainType, Station, Route, Journey
+from station.serializers import TrainSerializer, JourneyTrainSerializer
 from rest_framework import status
 
 
 TRAIN_URL = reverse("station:train-list")
 
 
+def detail_url(train_id):
+    return reverse("station:train-detail", args=[train_id])
+
+
 def sample_train_type(name):
     defaults = {"name": name}
 
@@ -29,6 +36,32 @@ def sample_train(train_type, **params):
     return Train.objects.create(**defaults)
 
 
+def sample_journeys(train, count):
+    route, _ = Route.objects.get_or_create(
+        source=Station.objects.get_or_create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        )[0],
+        destination=Station.objects.get_or_create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        )[0],
+        distance=540,
+    )
+    departure_time = timezone.now() + timedelta(days=train.id)
+
+    journeys = []
+    for hours in range(count):
+        journeys.append(
+            Journey.objects.create(
+                route=route,
+                train=train,
+                departure_time=departure_time + timedelta(hours=hours * 10),
+                arrival_time=departure_time + timedelta(hours=hours * 10 + 8),
+            )
+        )
+
+    return journeys
+
+
 class UnauthenticatedAndAuthenticatedTrainAPITests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -56,6 +89,48 @@ class UnauthenticatedAndAuthenticatedTrainAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn(serializer_first.data, res.data["results"])
 
+    def test_train_list_with_last_journeys(self):
+        journeys = sample_journeys(self.train, 4)
+        for name in ("second", "third"):
+            sample_journeys(
+                sample_train(
+                    name=name, train_type=self.train.train_type
+                ),
+                3,
+            )
+
+        with self.assertNumQueries(3):
+            res = self.client.get(TRAIN_URL, {"journeys": 2})
+
+        serializer = JourneyTrainSerializer(
+            reversed(journeys[-2:]), many=True
+        )
+
+        trains = {train["id"]: train for train in res.data["results"]}
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(trains[self.train.id]["journeys"], serializer.data)
+        for train in res.data["results"]:
+            self.assertEqual(len(train["journeys"]), 2)
+
+    def test_train_list_invalid_journeys_limit(self):
+        res = self.client.get(TRAIN_URL, {"journeys": "many"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_train_retrieve_last_five_journeys(self):
+        journeys = sample_journeys(self.train, 7)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(detail_url(self.train.id))
+
+        serializer = JourneyTrainSerializer(
+            reversed(journeys[-5:]), many=True
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["journeys"], serializer.data)
+
 
 class AuthenticatedTrainAPITests(TestCase):
     def setUp(self):
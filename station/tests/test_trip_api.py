@@ -0,0 +1,143 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import (
+    Journey,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+
+
+TRIPS_URL = reverse("user:trips")
+ORDER_URL = reverse("station:order-list")
+
+
+def sample_journey(days, **params):
+    train_type, _ = TrainType.objects.get_or_create(name="intercity")
+    train, _ = Train.objects.get_or_create(
+        name="Hyundai",
+        cargo_num=5,
+        places_in_cargo=50,
+        train_type=train_type,
+    )
+    route, _ = Route.objects.get_or_create(
+        source=Station.objects.get_or_create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        )[0],
+        destination=Station.objects.get_or_create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        )[0],
+        distance=540,
+    )
+    departure_time = timezone.now() + timedelta(days=days)
+    defaults = {
+        "route": route,
+        "train": train,
+        "departure_time": departure_time,
+        "arrival_time": departure_time + timedelta(hours=8),
+    }
+    defaults.update(params)
+
+    return Journey.objects.create(**defaults)
+
+
+def sample_order(user, *seats):
+    order = Order.objects.create(user=user)
+    for journey, cargo, seat in seats:
+        Ticket.objects.create(
+            order=order, journey=journey, cargo=cargo, seat=seat
+        )
+
+    return order
+
+
+class UnauthenticatedTripsAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(TRIPS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@mock.patch("station.signals.send_order_email.delay")
+class AuthenticatedTripsAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_upcoming_trips_grouped_per_journey(self, _):
+        past = sample_journey(days=-2)
+        tomorrow = sample_journey(days=1)
+        next_week = sample_journey(days=7)
+        other_user = get_user_model().objects.create_user(
+            email="other@test.com", password="test1234"
+        )
+
+        sample_order(self.user, (past, 1, 1), (next_week, 2, 10))
+        first_order = sample_order(
+            self.user, (tomorrow, 1, 1), (tomorrow, 1, 2)
+        )
+        second_order = sample_order(self.user, (tomorrow, 3, 5))
+        sample_order(other_user, (tomorrow, 4, 4))
+
+        res = self.client.get(TRIPS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [trip["id"] for trip in res.data["results"]],
+            [tomorrow.id, next_week.id],
+        )
+        trip = res.data["results"][0]
+        self.assertEqual(trip["departure_place"], "Kyiv")
+        self.assertEqual(trip["arrival_place"], "Lviv")
+        self.assertEqual(trip["train"]["name"], "Hyundai")
+        self.assertEqual(
+            [
+                (seat["order"], seat["cargo"], seat["seat"])
+                for seat in trip["seats"]
+            ],
+            [
+                (first_order.id, 1, 1),
+                (first_order.id, 1, 2),
+                (second_order.id, 3, 5),
+            ],
+        )
+
+    def test_trips_query_count_does_not_grow(self, _):
+        for days in range(1, 4):
+            journey = sample_journey(days=days)
+            for seat in range(1, 4):
+                sample_order(self.user, (journey, 1, seat))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(TRIPS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 3)
+
+    def test_filter_orders_by_journey_without_duplicates(self, _):
+        journey = sample_journey(days=1)
+        order = sample_order(self.user, (journey, 1, 1), (journey, 1, 2))
+
+        res = self.client.get(ORDER_URL, {"journey": journey.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [order.id]
+        )
@@ -7,8 +7,15 @@ from station.views import (
     StationViewSet,
     RouteViewSet,
     JourneyViewSet,
+    JourneyScheduleViewSet,
     OrderViewSet,
+    QueuedOrderViewSet,
+    SeatHoldViewSet,
+    RouteSalesViewSet,
+    TrainTypeSalesViewSet,
+    HourlySalesViewSet,
 )
+from station.seat_events import journey_seats_stream
 
 router = routers.DefaultRouter()
 router.register("crew", CrewViewSet)
@@ -17,8 +24,21 @@ router.register("train-types", TrainTypeViewSet)
 router.register("stations", StationViewSet)
 router.register("routes", RouteViewSet)
 router.register("journeys", JourneyViewSet),
+router.register("journey-schedules", JourneyScheduleViewSet)
 router.register("orders", OrderViewSet),
+router.register("orders/queue", QueuedOrderViewSet)
+router.register("holds", SeatHoldViewSet)
+router.register("sales/routes", RouteSalesViewSet)
+router.register("sales/train-types", TrainTypeSalesViewSet)
+router.register("sales/hours", HourlySalesViewSet)
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "journeys/<int:pk>/seats/stream/",
+        journey_seats_stream,
+        name="journey-seats-stream",
+    ),
+    path("", include(router.urls)),
+]
 
 app_name = "station"
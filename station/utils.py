@@ -1,5 +1,5 @@
+import hashlib
 import os
-import uuid
 from django.utils.text import slugify
 
 
@@ -7,8 +7,34 @@ def params_to_ints(qs):
     return [int(str_id.strip()) for str_id in qs.split(",")]
 
 
+def params_to_names(qs):
+    return {name.strip() for name in qs.split(",") if name.strip()}
+
+
+def prefers_async(request):
+    """The request asks for ``Prefer: respond-async`` (RFC 7240)"""
+    preferences = request.headers.get("Prefer", "").split(",")
+
+    return any(
+        preference.split(";")[0].strip().lower() == "respond-async"
+        for preference in preferences
+    )
+
+
+def content_hash(file):
+    """Short sha256 of an uploaded file, the file is rewound afterwards"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+
+    return digest.hexdigest()[:16]
+
+
 def image_file_path(instance, filename):
+    """Content-hashed name, so the file can be cached as immutable"""
     _, extension = os.path.splitext(filename)
-    filename = f"{slugify(instance.name)}-{uuid.uuid4()}{extension}"
+    digest = content_hash(instance.image)
+    filename = f"{slugify(instance.name)}-{digest}{extension.lower()}"
 
     return os.path.join(instance.folder, filename)
@@ -1,11 +1,21 @@
 from drf_spectacular.types import OpenApiTypes
-from rest_framework import mixins, status
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import generics, mixins, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import (
+    AllowAny,
+    IsAuthenticated,
+    IsAdminUser,
+)
 from rest_framework.viewsets import GenericViewSet
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 from station.models import (
@@ -15,7 +25,15 @@ from station.models import (
     Station,
     Route,
     Journey,
-    Order
+    JourneySchedule,
+    Order,
+    Ticket,
+    TicketDocument,
+    RouteDailySales,
+    TrainTypeDailySales,
+    OrderHourlySales,
+    QueuedOrder,
+    SeatHold,
 )
 from station.serializers import (
     CrewSerializer,
@@ -25,14 +43,59 @@ from station.serializers import (
     StationSerializer,
     RouteSerializer,
     JourneyListSerializer,
+    JourneySearchSerializer,
     JourneyCreateSerializer,
     JourneyDetailSerializer,
+    JourneyScheduleSerializer,
     RouteCreateSerializer,
     OrderListSerializer,
     OrderSerializer,
+    QueuedOrderSerializer,
     TrainImageSerializer,
+    TrainJourneysSerializer,
+    TripSerializer,
+    RouteDailySalesSerializer,
+    TrainTypeDailySalesSerializer,
+    OrderHourlySalesSerializer,
+    SeatHoldSerializer,
+    BatchSerializer,
+    BatchResponseSerializer,
+)
+from station.batch import run_batch
+from station.holds import held_seats, release_hold
+from station.order_queue import queue_name, shard_for
+from station.documents import get_order_tickets, tickets_fingerprint
+from station.journey_search import search_journeys
+from station.fast_serializers import (
+    StationValuesSerializer,
+    RouteValuesSerializer,
+    JourneyListValuesSerializer,
+)
+from station.pagination import EstimatedCountLimitOffsetPagination
+from station.mixins import (
+    ConditionalGetMixin,
+    DynamicFieldsViewMixin,
+    FastListMixin,
+    IdempotentCreateMixin,
 )
-from station.utils import params_to_ints
+from station.renderers import PDFRenderer
+from station.tasks import generate_ticket_documents, process_order_queue
+from station.utils import params_to_ints, prefers_async
+from user.authentication import CachedUserJWTAuthentication
+
+
+DYNAMIC_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description="Only include these fields (ex. ?fields=id,name)",
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Expand related ids into objects (ex. ?expand=route)",
+    ),
+]
 
 
 class CrewViewSet(
@@ -61,6 +124,50 @@ class CrewViewSet(
 
         return queryset
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATETIME,
+                required=True,
+                description="Window start (ex. ?from=2024-10-13T08:00Z)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATETIME,
+                required=True,
+                description="Window end (ex. ?to=2024-10-13T20:00Z)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="available")
+    def available(self, request):
+        """Crew members without a journey overlapping [from, to)"""
+        window = {}
+        for name in ("from", "to"):
+            value = parse_datetime(request.query_params.get(name, ""))
+            if value is None:
+                raise ValidationError({name: "Must be an ISO 8601 datetime."})
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            window[name] = value
+
+        if window["from"] >= window["to"]:
+            raise ValidationError({"to": "Must be later than from."})
+
+        # the overlap lookup is served by the journey_train_no_overlap
+        # GiST index, only journeys inside the window are read
+        queryset = Crew.objects.exclude(
+            trips__in=Journey.objects.overlapping(window["from"], window["to"])
+        ).order_by("last_name", "first_name", "id")
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return Response(self.get_serializer(queryset, many=True).data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -81,24 +188,71 @@ class CrewViewSet(
 
 
 class TrainTypeViewSet(
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
+    last_modified_fields = {"list": ("updated_at",)}
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
 
 
 class TrainViewSet(
+    DynamicFieldsViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = Train.objects.all()
+    # pages of a paginated list need a stable order
+    queryset = Train.objects.order_by("id")
+    journeys_limit = 5
+    max_journeys_limit = 25
+    select_related_fields = {
+        "list": {"train_type": ("train_type",)},
+        "retrieve": {"train_type": ("train_type",)},
+    }
+
+    def get_journeys_limit(self):
+        """Number of last journeys to prefetch per train (0 disables it)"""
+        journeys = self.request.query_params.get("journeys")
+
+        if journeys is None:
+            return self.journeys_limit if self.action == "retrieve" else 0
+
+        try:
+            journeys_limit = int(journeys)
+        except ValueError:
+            raise ValidationError({"journeys": "Must be an integer."})
+
+        return max(0, min(journeys_limit, self.max_journeys_limit))
 
     def get_queryset(self):
-        queryset = super().get_queryset().select_related("train_type")
+        queryset = self.select_fields_related(super().get_queryset())
+
+        if self.action in ("list", "retrieve"):
+            journeys_limit = self.get_journeys_limit()
+            if (
+                journeys_limit or self.action == "retrieve"
+            ) and self.wants_field("journeys"):
+                # Django turns the sliced prefetch into a single query
+                # filtered by ROW_NUMBER() OVER (PARTITION BY train_id
+                # ORDER BY id DESC) <= journeys_limit
+                queryset = queryset.prefetch_related(
+                    Prefetch(
+                        "journeys",
+                        queryset=Journey.objects.select_related(
+                            "route__source", "route__destination"
+                        ).order_by("-id")[:journeys_limit],
+                        to_attr="last_journeys",
+                    )
+                )
 
         if self.action == "list":
             name = self.request.query_params.get("name")
@@ -111,6 +265,8 @@ class TrainViewSet(
 
     def get_serializer_class(self):
         if self.action == "list":
+            if self.get_journeys_limit():
+                return TrainJourneysSerializer
             return TrainSerializer
         if self.action == "retrieve":
             return TrainCreateSerializer
@@ -142,7 +298,14 @@ class TrainViewSet(
                 "name",
                 type=OpenApiTypes.STR,
                 description="Filter by name id (ex. ?name=qui)",
-            )
+            ),
+            OpenApiParameter(
+                "journeys",
+                type=OpenApiTypes.INT,
+                description="Include last N journeys of each train "
+                "(ex. ?journeys=3)",
+            ),
+            *DYNAMIC_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -151,12 +314,16 @@ class TrainViewSet(
 
 
 class StationViewSet(
+    ConditionalGetMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = Station.objects.all()
     serializer_class = StationSerializer
+    fast_list_serializer_class = StationValuesSerializer
+    last_modified_fields = {"list": ("updated_at",)}
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -191,22 +358,39 @@ class StationViewSet(
                 type=OpenApiTypes.FLOAT,
                 description="Filter by longitude id (ex. ?longitude=36.176)",
             ),
+            *DYNAMIC_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get list of movies"""
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
 
 
 class RouteViewSet(
+    ConditionalGetMixin,
+    DynamicFieldsViewMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
-    queryset = Route.objects.select_related("source", "destination")
+    queryset = Route.objects.all()
+    fast_list_serializer_class = RouteValuesSerializer
+    select_related_fields = {
+        "list": {"source": ("source",), "destination": ("destination",)},
+    }
+    last_modified_fields = {
+        "list": (
+            "updated_at",
+            "source__updated_at",
+            "destination__updated_at",
+        ),
+    }
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = self.select_fields_related(super().get_queryset())
 
         source = self.request.query_params.get("source")
         destination = self.request.query_params.get("destination")
@@ -238,41 +422,78 @@ class RouteViewSet(
                 type=OpenApiTypes.STR,
                 description="Filter by destination id (ex. ?destination=2,3)",
             ),
+            *DYNAMIC_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get list of movies"""
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
 
 
 class JourneyViewSet(
+    ConditionalGetMixin,
+    DynamicFieldsViewMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
     queryset = Journey.objects.all()
+    fast_list_serializer_class = JourneyListValuesSerializer
+    pagination_class = EstimatedCountLimitOffsetPagination
+    select_related_fields = {
+        "list": {
+            "departure_place": ("route__source",),
+            "arrival_place": ("route__destination",),
+            "train": ("train__train_type",),
+            "route": ("route__source", "route__destination"),
+        },
+        "retrieve": {
+            "route": ("route__source", "route__destination"),
+            "train": ("train__train_type",),
+        },
+    }
+    prefetch_related_fields = {
+        "list": {"workers": ("workers",)},
+        "retrieve": {"workers": ("workers",)},
+    }
+    # workers changes touch Journey.updated_at (see station.signals)
+    last_modified_fields = {
+        action: (
+            "updated_at",
+            "route__updated_at",
+            "route__source__updated_at",
+            "route__destination__updated_at",
+            "train__updated_at",
+            "train__train_type__updated_at",
+        )
+        for action in ("list", "retrieve")
+    }
+
+    def filter_journeys(self, queryset):
+        route = self.request.query_params.get("route")
+        train = self.request.query_params.get("train")
+
+        if route:
+            route_ids = params_to_ints(route)
+            queryset = queryset.filter(route_id__in=route_ids)
+        if train:
+            train_ids = params_to_ints(train)
+            queryset = queryset.filter(train_id__in=train_ids)
+
+        return queryset
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = self.select_fields_related(super().get_queryset())
 
         if self.action == "list":
-            queryset = queryset.select_related(
-                "route__source",
-                "route__destination",
-                "train",
-                "train__train_type"
-            ).annotate(count_workers=Count("workers"))
-
-            route = self.request.query_params.get("route")
-            train = self.request.query_params.get("train")
+            if self.wants_field("count_workers"):
+                queryset = queryset.with_workers_count()
 
-            if route:
-                route_ids = params_to_ints(route)
-                queryset = queryset.filter(route_id__in=route_ids)
-            if train:
-                train_ids = params_to_ints(train)
-                queryset = queryset.filter(route_id__in=train_ids)
+            queryset = self.filter_journeys(queryset)
 
         return queryset
 
@@ -283,6 +504,65 @@ class JourneyViewSet(
             return JourneyCreateSerializer
         if self.action == "retrieve":
             return JourneyDetailSerializer
+        if self.action == "search":
+            return JourneySearchSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "source",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Departure station id (ex. ?source=1)",
+            ),
+            OpenApiParameter(
+                "destination",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Arrival station id (ex. ?destination=2)",
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                required=True,
+                description="Departure day (ex. ?date=2024-10-13)",
+            ),
+            OpenApiParameter(
+                "train_type",
+                type=OpenApiTypes.STR,
+                description="Filter by train type id (ex. ?train_type=1,2)",
+            ),
+        ],
+        responses=JourneySearchSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="search")
+    def search(self, request):
+        """Journeys between two stations on a day, served from the cache"""
+        params = {}
+        for name in ("source", "destination"):
+            try:
+                params[name] = int(request.query_params.get(name, ""))
+            except ValueError:
+                raise ValidationError({name: "Must be a station id."})
+
+        try:
+            day = parse_date(request.query_params.get("date", ""))
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({"date": "Must be a YYYY-MM-DD date."})
+
+        train_type = request.query_params.get("train_type")
+        try:
+            train_type_ids = params_to_ints(train_type) if train_type else ()
+        except ValueError:
+            raise ValidationError({"train_type": "Must be ids (ex. 1,2)."})
+
+        return Response(
+            search_journeys(
+                params["source"], params["destination"], day, train_type_ids
+            )
+        )
 
     @extend_schema(
         parameters=[
@@ -296,29 +576,90 @@ class JourneyViewSet(
                 type=OpenApiTypes.STR,
                 description="Filter by train id (ex. ?train=2,3)",
             ),
+            *DYNAMIC_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get list of movies"""
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class JourneyScheduleViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    GenericViewSet,
+):
+    """Timetable templates, creating one expands it into journeys"""
+
+    queryset = JourneySchedule.objects.prefetch_related("workers").annotate(
+        journeys_count=Count("journeys")
+    )
+    serializer_class = JourneyScheduleSerializer
+
+
+class QueuedOrderCreateMixin:
+    """``Prefer: respond-async`` answers an order with 202 Accepted.
+
+    Only the shape of the tickets is checked, the order is queued for the
+    consumer of its journey shard and ``Location`` points at its status.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not prefers_async(request):
+            return super().create(request, *args, **kwargs)
+
+        serializer = QueuedOrderSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        queued = serializer.save(
+            user=request.user,
+            shard=shard_for(serializer.validated_data["tickets"]),
+        )
+        transaction.on_commit(
+            lambda: process_order_queue.apply_async(
+                (queued.shard,), queue=queue_name(queued.shard)
+            )
+        )
+
+        return Response(
+            serializer.data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={
+                "Location": serializer.data["url"],
+                "Preference-Applied": "respond-async",
+            },
+        )
 
 
 class OrderViewSet(
+    DynamicFieldsViewMixin,
+    IdempotentCreateMixin,
+    QueuedOrderCreateMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedUserJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
+    prefetch_related_fields = {
+        "list": {"tickets": ("tickets", "archived_tickets")},
+    }
+    pagination_class = EstimatedCountLimitOffsetPagination
 
     def get_queryset(self):
-        queryset = (
-            super()
-            .get_queryset()
-            .filter(user=self.request.user)
-            .prefetch_related("tickets")
+        queryset = self.select_fields_related(
+            super().get_queryset().filter(user=self.request.user)
         )
 
         date = self.request.query_params.get("date")
@@ -328,7 +669,10 @@ class OrderViewSet(
             queryset = queryset.filter(created_at__date=date)
         if journey:
             journey_ids = params_to_ints(journey)
-            queryset = queryset.filter(tickets__journey__id__in=journey_ids)
+            queryset = queryset.filter(
+                Q(tickets__journey__id__in=journey_ids)
+                | Q(archived_tickets__journey__id__in=journey_ids)
+            ).distinct()
 
         return queryset
 
@@ -338,9 +682,56 @@ class OrderViewSet(
 
         return OrderSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Prefer",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="respond-async to queue the order and get 202 "
+                "with its status URL",
+            ),
+        ],
+        responses={201: OrderSerializer, 202: QueuedOrderSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="tickets.pdf",
+        renderer_classes=[PDFRenderer, JSONRenderer],
+    )
+    def tickets_pdf(self, request, pk=None):
+        """Download the tickets of an order as a PDF"""
+        order = self.get_object()
+        tickets = get_order_tickets(order.id)
+        if not tickets:
+            raise NotFound("Order has no tickets.")
+
+        fingerprint = tickets_fingerprint(tickets)
+        document = TicketDocument.objects.filter(
+            order=order, fingerprint=fingerprint
+        ).first()
+
+        if document is None or not default_storage.exists(
+            document.file.name
+        ):
+            generate_ticket_documents.delay(order.id)
+            return Response(
+                status=status.HTTP_202_ACCEPTED, headers={"Retry-After": "5"}
+            )
+
+        return FileResponse(
+            document.file.open("rb"),
+            content_type="application/pdf",
+            filename=f"order-{order.id}-tickets.pdf",
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -353,8 +744,202 @@ class OrderViewSet(
                 type=OpenApiTypes.STR,
                 description="Filter by journey id (ex. ?journey=2,3)",
             ),
+            *DYNAMIC_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         """Get list of movies"""
         return super().list(request, *args, **kwargs)
+
+
+class QueuedOrderViewSet(mixins.RetrieveModelMixin, GenericViewSet):
+    """Status of an order posted with ``Prefer: respond-async``"""
+
+    queryset = QueuedOrder.objects.all()
+    serializer_class = QueuedOrderSerializer
+    authentication_classes = (CachedUserJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+
+class SeatHoldViewSet(mixins.CreateModelMixin, GenericViewSet):
+    """Seats held for ``SEAT_HOLD_MINUTES`` until confirmed as an order"""
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    authentication_classes = (CachedUserJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    lookup_field = "token"
+    lookup_value_regex = (
+        "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    )
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @extend_schema(responses={204: None})
+    def destroy(self, request, token=None):
+        """Give the held seats back before the hold expires"""
+        if not release_hold(request.user, token):
+            raise NotFound("Hold not found.")
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(request=None, responses={201: OrderSerializer})
+    @action(methods=["POST"], detail=True)
+    def confirm(self, request, token=None):
+        """Buy the held seats, the hold becomes an order"""
+        with transaction.atomic():
+            seats = held_seats(request.user, token)
+            if not seats:
+                raise NotFound("Hold not found or expired.")
+
+            serializer = OrderSerializer(
+                data={
+                    "tickets": [
+                        {"journey": journey_id, "cargo": cargo, "seat": seat}
+                        for journey_id, cargo, seat in seats
+                    ]
+                },
+                context=self.get_serializer_context(),
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=request.user)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class UpcomingTripsView(generics.ListAPIView):
+    """Upcoming journeys of the current user with their booked seats"""
+
+    serializer_class = TripSerializer
+    authentication_classes = (CachedUserJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        user_tickets = Ticket.objects.filter(order__user=self.request.user)
+
+        return (
+            Journey.objects.filter(
+                id__in=user_tickets.values("journey_id"),
+                departure_time__gte=timezone.now(),
+            )
+            .select_related(
+                "route__source",
+                "route__destination",
+                "train__train_type",
+            )
+            .prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=user_tickets,
+                    to_attr="user_tickets",
+                )
+            )
+        )
+
+
+class SalesRollupViewSet(mixins.ListModelMixin, GenericViewSet):
+    """Read-only access to pre-aggregated sales for staff dashboards"""
+
+    permission_classes = (IsAdminUser,)
+    date_field = "departure_date"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        date_from = self.get_date_param("date_from")
+        date_to = self.get_date_param("date_to")
+
+        if date_from:
+            queryset = queryset.filter(
+                **{f"{self.date_field}__gte": date_from}
+            )
+        if date_to:
+            queryset = queryset.filter(**{f"{self.date_field}__lte": date_to})
+
+        return queryset
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({name: "Must be a YYYY-MM-DD date."})
+
+        return day
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="Filter from date (ex. ?date_from=2024-10-01)",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Filter to date (ex. ?date_to=2024-10-31)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class RouteSalesViewSet(SalesRollupViewSet):
+    queryset = RouteDailySales.objects.select_related(
+        "route__source", "route__destination"
+    )
+    serializer_class = RouteDailySalesSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        route = self.request.query_params.get("route")
+        if route:
+            queryset = queryset.filter(route_id__in=params_to_ints(route))
+
+        return queryset
+
+
+class TrainTypeSalesViewSet(SalesRollupViewSet):
+    queryset = TrainTypeDailySales.objects.select_related("train_type")
+    serializer_class = TrainTypeDailySalesSerializer
+
+
+class HourlySalesViewSet(SalesRollupViewSet):
+    queryset = OrderHourlySales.objects.all()
+    serializer_class = OrderHourlySalesSerializer
+    date_field = "hour__date"
+
+
+class BatchView(generics.GenericAPIView):
+    """Run several station API requests in one round trip.
+
+    The batch is authenticated once and every sub-request runs with its
+    user, so permissions and throttles still apply per sub-request.
+    """
+
+    serializer_class = BatchSerializer
+    permission_classes = (AllowAny,)
+
+    @extend_schema(responses=BatchResponseSerializer(many=True))
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return Response(
+            run_batch(
+                request,
+                serializer.validated_data["requests"],
+                parallel=serializer.validated_data["parallel"],
+            )
+        )
@@ -3,12 +3,12 @@ import os
 from celery import Celery
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "trainipy.settings")
-app = Celery("trainipy", broker="redis://localhost:6379/0")
+app = Celery("trainipy")
 
 app.conf.enable_utc = False
 app.conf.update(timezone="Europe/Kiev")
 
-app.config_from_object("django.conf:settings")
+app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
 
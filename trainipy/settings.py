@@ -14,6 +14,7 @@ from datetime import timedelta
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from kombu import Queue
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,10 +44,12 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "debug_toolbar",
     "rest_framework",
     "drf_spectacular",
     "django_celery_results",
+    "django_celery_beat",
     "station",
     "user",
 ]
@@ -107,6 +110,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# use django.core.cache.backends.redis.RedisCache with a redis:// location
+# when running more than one process
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND")
+        or "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": os.getenv("CACHE_LOCATION") or "",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -147,6 +164,13 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = "/files/media"
 # MEDIA_ROOT = BASE_DIR / "media"
 
+# "django" streams media from the worker, "x-accel" (nginx) and
+# "x-sendfile" (Apache, lighttpd) leave the body to the front proxy
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE") or "django"
+# nginx `internal` location aliased to MEDIA_ROOT
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX") or "/protected-media/"
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -160,7 +184,7 @@ INTERNAL_IPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedUserJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("station.permissions.IsAdminOrReadOnly",),
     "DEFAULT_PAGINATION_CLASS": "station.pagination.StationLimitOffsetPagination",
@@ -178,6 +202,27 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": False,
 }
 
+# responses of POST /orders/ sent with an Idempotency-Key are replayed
+# for this many seconds
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL") or 60 * 60 * 24)
+
+# users authenticated by JWT are kept in a per-process cache
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL") or 60)
+JWT_USER_CACHE_SIZE = int(os.getenv("JWT_USER_CACHE_SIZE") or 1024)
+
+# exact counts of mid-sized paginated lists are cached for this many
+# seconds (see EstimatedCountLimitOffsetPagination)
+PAGINATION_COUNT_CACHE_TTL = int(os.getenv("PAGINATION_COUNT_CACHE_TTL") or 30)
+
+# POST /api/batch/ limits
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS") or 20)
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS") or 4)
+
+# schema file built by `manage.py spectacular --file`, served by
+# /api/schema/ instead of generating the schema per request
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE") or ""
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv("OPENAPI_SCHEMA_MAX_AGE") or 300)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Train service API",
     "DESCRIPTION": "Order tickets for your train trips",
@@ -202,5 +247,117 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_TIMEZONE = os.getenv("CELERY_TIMEZONE", "Europe/Kiev")
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+
+# Every kind of work has its own queue, so slow media or export jobs never
+# delay transactional emails. Workers pick queues with -Q (see the
+# "workers" profile in docker-compose.yaml).
+CELERY_TASK_DEFAULT_QUEUE = "default"
+# orders posted with "Prefer: respond-async" are placed by the consumers
+# of orders.0 ... orders.<ORDER_QUEUE_SHARDS - 1>, sharded by journey, at
+# most ORDER_QUEUE_BATCH_SIZE orders per transaction
+ORDER_QUEUE_SHARDS = int(os.getenv("ORDER_QUEUE_SHARDS") or 4)
+ORDER_QUEUE_BATCH_SIZE = int(os.getenv("ORDER_QUEUE_BATCH_SIZE") or 100)
+# workers take the list from `manage.py order_queue_names`
+ORDER_QUEUES = [f"orders.{shard}" for shard in range(ORDER_QUEUE_SHARDS)]
+CELERY_TASK_QUEUES = tuple(
+    Queue(name, routing_key=name)
+    for name in (
+        "default",
+        "email",
+        "media",
+        "analytics",
+        "exports",
+        *ORDER_QUEUES,
+    )
+)
+CELERY_TASK_ROUTES = {
+    "station.tasks.send_order_email": {"queue": "email", "priority": 0},
+    "station.tasks.update_sales_rollups": {"queue": "analytics"},
+    "station.tasks.archive_completed_journeys": {"queue": "exports"},
+    "station.tasks.generate_ticket_documents": {"queue": "media"},
+    "station.tasks.warm_journey_searches": {"queue": "analytics"},
+    "station.tasks.release_expired_holds": {"queue": "default"},
+    "station.tasks.dispatch_order_queues": {"queue": "default"},
+}
+# Redis emulates priorities with one list per step, 0 is the highest
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+    "visibility_timeout": 3600,
+}
+# workers reserve one task per process by default; pools serving short
+# tasks raise it with --prefetch-multiplier
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(
+    os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER") or 1
+)
+CELERY_BEAT_SCHEDULE = {
+    "update-sales-rollups": {
+        "task": "station.tasks.update_sales_rollups",
+        "schedule": timedelta(minutes=5),
+    },
+    "archive-completed-journeys": {
+        "task": "station.tasks.archive_completed_journeys",
+        "schedule": timedelta(hours=6),
+    },
+    "release-expired-holds": {
+        "task": "station.tasks.release_expired_holds",
+        "schedule": timedelta(minutes=1),
+    },
+    # wakes shards whose last message was lost
+    "dispatch-order-queues": {
+        "task": "station.tasks.dispatch_order_queues",
+        "schedule": timedelta(minutes=1),
+    },
+}
+
+# sales rollups fold at most this many rows per transaction and skip rows
+# younger than the lag (seconds) so in-flight orders are not missed
+SALES_ROLLUP_BATCH_SIZE = int(os.getenv("SALES_ROLLUP_BATCH_SIZE") or 50000)
+SALES_ROLLUP_LAG = int(os.getenv("SALES_ROLLUP_LAG") or 60)
+
+# journeys (with their tickets) that arrived more than this many days ago
+# are moved to the archive tables, in batches of journeys
+JOURNEY_ARCHIVE_AFTER_DAYS = int(os.getenv("JOURNEY_ARCHIVE_AFTER_DAYS") or 30)
+JOURNEY_ARCHIVE_BATCH_SIZE = int(
+    os.getenv("JOURNEY_ARCHIVE_BATCH_SIZE") or 500
+)
+
+# live seat events (/journeys/<id>/seats/stream/): "memory" only reaches
+# subscribers of the same process, use "redis" with more than one process
+SEAT_EVENTS_BROKER = os.getenv("SEAT_EVENTS_BROKER") or "memory"
+SEAT_EVENTS_REDIS_URL = os.getenv("SEAT_EVENTS_REDIS_URL") or CELERY_BROKER_URL
+# seconds between keep-alive comments, events buffered per subscriber
+SEAT_EVENTS_HEARTBEAT = int(os.getenv("SEAT_EVENTS_HEARTBEAT") or 15)
+SEAT_EVENTS_QUEUE_SIZE = 100
+
+# station distance matrix written by `manage.py build_station_distances`
+STATION_DISTANCES_DIR = (
+    os.getenv("STATION_DISTANCES_DIR") or "/files/station_distances"
+)
+
+# /journeys/search/ results are cached per station pair, day and filters
+# until a journey of that pair and day changes or moves to another
+# availability level; "few" means at most JOURNEY_SEARCH_FEW_SEATS left
+JOURNEY_SEARCH_CACHE_TTL = int(os.getenv("JOURNEY_SEARCH_CACHE_TTL") or 600)
+JOURNEY_SEARCH_FEW_SEATS = int(os.getenv("JOURNEY_SEARCH_FEW_SEATS") or 10)
+# station pairs whose next-day search is kept warm by celery beat, 0 is off
+JOURNEY_SEARCH_WARM_PAIRS = int(os.getenv("JOURNEY_SEARCH_WARM_PAIRS") or 0)
+if JOURNEY_SEARCH_WARM_PAIRS:
+    CELERY_BEAT_SCHEDULE["warm-journey-searches"] = {
+        "task": "station.tasks.warm_journey_searches",
+        "schedule": timedelta(seconds=JOURNEY_SEARCH_CACHE_TTL),
+    }
+
+# seats held at /holds/ stay reserved for this many minutes; expired
+# holds are deleted by beat, this many rows per statement
+SEAT_HOLD_MINUTES = int(os.getenv("SEAT_HOLD_MINUTES") or 10)
+SEAT_HOLD_SWEEP_BATCH_SIZE = int(
+    os.getenv("SEAT_HOLD_SWEEP_BATCH_SIZE") or 5000
+)
 
 # celery -A trainipy worker -l info -P solo
+# celery -A trainipy worker -l info -Q email -c 4 --prefetch-multiplier 4
+# celery -A trainipy beat -l info
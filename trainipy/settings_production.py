@@ -0,0 +1,33 @@
+"""
+Production settings: DJANGO_SETTINGS_MODULE=trainipy.settings_production
+
+Same as trainipy.settings without the debug toolbar and with DEBUG off, so
+executed SQL is not kept in ``connection.queries``, and with the OpenAPI
+schema served from a file built at deploy time.
+"""
+
+import os
+
+from trainipy.settings import *  # noqa: F401,F403
+from trainipy.settings import BASE_DIR, INSTALLED_APPS, MIDDLEWARE
+
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+
+# python manage.py spectacular --file openapi/schema.yaml
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE") or str(
+    BASE_DIR / "openapi" / "schema.yaml"
+)
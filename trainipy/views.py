@@ -0,0 +1,65 @@
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+# renderer formats of SpectacularAPIView
+SCHEMA_FILE_FORMATS = {".yaml": "yaml", ".yml": "yaml", ".json": "json"}
+
+
+@lru_cache(maxsize=4)
+def read_schema_file(path, modified):
+    """Content and ETag of a generated schema, reread when it changes"""
+    with open(path, "rb") as file:
+        content = file.read()
+
+    return content, f'"{hashlib.md5(content).hexdigest()}"'
+
+
+class PrecomputedSchemaView(SpectacularAPIView):
+    """Serve ``OPENAPI_SCHEMA_FILE`` instead of walking every viewset.
+
+    The file is built with ``manage.py spectacular --file <path>``. Without
+    it, or when the client asks for another format, language or version,
+    the schema is generated per request as before.
+    """
+
+    def get_schema_file(self, request):
+        path = settings.OPENAPI_SCHEMA_FILE
+        if not path or not os.path.isfile(path):
+            return None
+        if "lang" in request.GET or "version" in request.GET:
+            return None
+
+        extension = os.path.splitext(path)[1].lower()
+        if SCHEMA_FILE_FORMATS.get(extension) != (
+            request.accepted_renderer.format
+        ):
+            return None
+
+        return path
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        path = self.get_schema_file(request)
+        if path is None:
+            return super().get(request, *args, **kwargs)
+
+        content, etag = read_schema_file(path, os.stat(path).st_mtime_ns)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content, content_type=request.accepted_renderer.media_type
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = (
+            f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+        )
+
+        return response
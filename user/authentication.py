@@ -0,0 +1,75 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """Per-process LRU cache of users with a short time to live"""
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is None:
+                return None
+
+            expires_at, user = cached
+            if expires_at < time.monotonic():
+                del self._users[user_id]
+                return None
+
+            self._users.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._users[user_id] = (time.monotonic() + self.ttl, user)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(
+    ttl=settings.JWT_USER_CACHE_TTL,
+    max_size=settings.JWT_USER_CACHE_SIZE,
+)
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """JWT authentication that reuses recently loaded users.
+
+    The user row is fetched once per ``JWT_USER_CACHE_TTL`` seconds and
+    process instead of on every request. Saving or deleting a user drops it
+    from the cache of the current process; other processes pick up the
+    change when the entry expires.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+
+        # every request gets its own instance, so changes made while
+        # handling one request never leak into the cached user
+        return copy.copy(user)
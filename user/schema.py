@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedUserJWTScheme(SimpleJWTScheme):
+    """Documents ``CachedUserJWTAuthentication`` as the Bearer JWT scheme"""
+
+    target_class = "user.authentication.CachedUserJWTAuthentication"
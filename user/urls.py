@@ -5,6 +5,7 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from station.views import UpcomingTripsView
 from user.views import CreateUserView, ManageUserView
 
 app_name = "user"
@@ -15,4 +16,5 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("me/trips/", UpcomingTripsView.as_view(), name="trips"),
 ]